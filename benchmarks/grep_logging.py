@@ -0,0 +1,110 @@
+"""Бенчмарк ``grep -r`` с включенным и выключенным логированием.
+
+Создает дерево файлов, в котором шаблон встречается в заданном
+количестве строк, и замеряет ``grep -r`` в трех режимах: без
+логирования, с синхронным ``FileHandler`` и с очередью логов,
+которую использует оболочка.
+
+Запуск::
+
+    python3 benchmarks/grep_logging.py --matches 100000
+"""
+
+import argparse
+import contextlib
+import logging
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+
+from logger import logger_setup  # noqa: E402
+from ubuntu_commands import grep  # noqa: E402
+
+
+def make_tree(root: Path, matches: int, files: int) -> None:
+    """Создает files файлов с matches совпадающими строками в сумме.
+
+    Args:
+        root: Корень дерева
+        matches: Количество строк с шаблоном
+        files: Количество файлов
+    """
+    per_file = matches // files
+    for number in range(files):
+        directory = root / f'dir_{number % 10}'
+        directory.mkdir(exist_ok=True)
+        with open(directory / f'log_{number}.txt', 'w') as f:
+            f.write('error: disk is full\nok\n' * per_file)
+
+
+def run_grep(root: Path) -> tuple[float, float]:
+    """Запускает grep -r с выводом в /dev/null.
+
+    Args:
+        root: Корень дерева
+
+    Returns:
+        tuple[float, float]: Время до возврата из grep и время до записи
+            всех логов на диск в секундах
+    """
+    with open(os.devnull, 'w') as devnull:
+        with contextlib.redirect_stdout(devnull):
+            start = time.perf_counter()
+            grep.grep(['error', str(root)], {'r'})
+            returned = time.perf_counter() - start
+            logger_setup.terminal_logger_listener.stop()
+            drained = time.perf_counter() - start
+            logger_setup.terminal_logger_listener.start()
+    return returned, drained
+
+
+def main() -> None:
+    arguments_parser = argparse.ArgumentParser(description=__doc__)
+    arguments_parser.add_argument('--matches', type=int, default=100_000)
+    arguments_parser.add_argument('--files', type=int, default=100)
+    arguments = arguments_parser.parse_args()
+
+    logger = logger_setup.terminal_logger
+    queue_handler = logger.handlers[0]
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        root = Path(temp_dir) / 'tree'
+        root.mkdir()
+        make_tree(root, arguments.matches, arguments.files)
+        log_path = Path(temp_dir) / 'shell.log'
+
+        logging.disable(logging.CRITICAL)
+        off = run_grep(root)
+        logging.disable(logging.NOTSET)
+
+        sync_handler = logging.FileHandler(log_path)
+        logger.removeHandler(queue_handler)
+        logger.addHandler(sync_handler)
+        sync = run_grep(root)
+        logger.removeHandler(sync_handler)
+        sync_handler.close()
+        log_path.unlink()
+
+        batch_handler = logger_setup.BatchRotatingFileHandler(
+            log_path, maxBytes=logger_setup.LOG_MAX_BYTES
+        )
+        logger_setup.terminal_logger_listener.handlers = (batch_handler,)
+        logger.addHandler(queue_handler)
+        queued = run_grep(root)
+        batch_handler.close()
+
+    print(f'{"mode":>10} {"returned, s":>12} {"drained, s":>11}')
+    for mode, (returned, drained) in [
+        ('off', off),
+        ('sync', sync),
+        ('queue', queued),
+    ]:
+        print(f'{mode:>10} {returned:>12.3f} {drained:>11.3f}')
+
+
+if __name__ == '__main__':
+    main()
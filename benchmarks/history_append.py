@@ -0,0 +1,90 @@
+"""Бенчмарк дозаписи в историю команд.
+
+Показывает, что стоимость ``write_history`` не зависит от размера файла
+истории. Для каждого размера создается файл с N записями, после чего
+замеряется среднее время одного вызова ``write_history``.
+
+Запуск::
+
+    python3 benchmarks/history_append.py --sizes 1000 100000 10000000
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+
+from ubuntu_commands import helper_functions  # noqa: E402
+
+
+def make_history(history_path: Path, size: int) -> None:
+    """Создает файл истории из size записей.
+
+    Args:
+        history_path: Путь к создаваемому файлу
+        size: Количество записей
+    """
+    chunk = 100_000
+    with open(history_path, 'w') as f:
+        for start in range(1, size + 1, chunk):
+            stop = min(start + chunk, size + 1)
+            f.write(
+                ''.join(
+                    f'{number}. grep -ri error logs/{number}\n'
+                    for number in range(start, stop)
+                )
+            )
+
+
+def measure(history_path: Path, calls: int) -> tuple[float, float]:
+    """Замеряет первый и средний последующий вызов write_history.
+
+    Args:
+        history_path: Путь к файлу истории
+        calls: Количество вызовов
+
+    Returns:
+        tuple[float, float]: Время первого вызова и среднее время
+            остальных вызовов в микросекундах
+    """
+    helper_functions.HISTORY_PATH = history_path
+    helper_functions._history_size = -1
+
+    start = time.perf_counter()
+    helper_functions.write_history('ls -la')
+    first = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(calls):
+        helper_functions.write_history('ls -la')
+    steady = (time.perf_counter() - start) / calls
+
+    return first * 1e6, steady * 1e6
+
+
+def main() -> None:
+    arguments_parser = argparse.ArgumentParser(description=__doc__)
+    arguments_parser.add_argument(
+        '--sizes',
+        type=int,
+        nargs='+',
+        default=[1_000, 10_000, 100_000, 1_000_000, 10_000_000],
+    )
+    arguments_parser.add_argument('--calls', type=int, default=2_000)
+    arguments = arguments_parser.parse_args()
+
+    print(f'{"records":>12} {"first, us":>12} {"per call, us":>14}')
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for size in arguments.sizes:
+            history_path = Path(temp_dir) / f'history_{size}'
+            make_history(history_path, size)
+            first, steady = measure(history_path, arguments.calls)
+            print(f'{size:>12} {first:>12.1f} {steady:>14.1f}')
+            history_path.unlink()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""Бенчмарк вывода команд.
+
+Выводит N строк через ``print`` и через ``output.echo`` в поток с
+построчной буферизацией, как у терминала, и считает системные вызовы
+записи. ``print`` делает запись на каждую строку, ``echo`` - на каждый
+блок OUTPUT_BUFFER_SIZE.
+
+Запуск::
+
+    python3 benchmarks/output.py --lines 1000000
+"""
+
+import argparse
+import io
+import os
+import sys
+import time
+import typing
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+
+import output  # noqa: E402
+
+
+class CountingFile(io.FileIO):
+    """Файл, считающий вызовы write."""
+
+    writes = 0
+
+    def write(self, data: typing.Any) -> int:  # type: ignore[override]
+        CountingFile.writes += 1
+        return super().write(data)
+
+
+def measure(lines: int, use_echo: bool) -> tuple[float, int]:
+    """Выводит lines строк в /dev/null с построчной буферизацией.
+
+    Args:
+        lines: Количество строк
+        use_echo: Выводить через output.echo вместо print
+
+    Returns:
+        tuple[float, int]: Время в секундах и количество вызовов write
+    """
+    CountingFile.writes = 0
+    raw = CountingFile(os.devnull, 'w')
+    stream = io.TextIOWrapper(
+        io.BufferedWriter(raw), encoding='utf-8', line_buffering=True
+    )
+    original_stdout = sys.stdout
+    sys.stdout = stream
+
+    start = time.perf_counter()
+    try:
+        for number in range(lines):
+            if use_echo:
+                output.echo(f'drwxr-xr-x  4096 entry_{number}')
+            else:
+                print(f'drwxr-xr-x  4096 entry_{number}')
+        output.flush()
+    finally:
+        sys.stdout = original_stdout
+        stream.close()
+
+    return time.perf_counter() - start, CountingFile.writes
+
+
+def main() -> None:
+    arguments_parser = argparse.ArgumentParser(description=__doc__)
+    arguments_parser.add_argument('--lines', type=int, default=1_000_000)
+    arguments = arguments_parser.parse_args()
+
+    print(f'{"mode":>6} {"seconds":>10} {"writes":>10}')
+    for mode, use_echo in (('print', False), ('echo', True)):
+        elapsed, writes = measure(arguments.lines, use_echo)
+        print(f'{mode:>6} {elapsed:>10.2f} {writes:>10}')
+
+
+if __name__ == '__main__':
+    main()
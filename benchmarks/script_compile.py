@@ -0,0 +1,70 @@
+"""Бенчмарк разбора сценария.
+
+Генерирует сценарий из N строк и замеряет ``parser.compile_script``:
+со сброшенным кэшем строк, с заполненным кэшем и на сценарии из
+уникальных строк, где кэш не помогает.
+
+Запуск::
+
+    python3 benchmarks/script_compile.py --lines 100000
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+
+import parser  # noqa: E402
+
+TEMPLATES = (
+    'cd logs',
+    'grep -ri error app.log',
+    'cat README.md',
+    'ls -la',
+    'cd ..; history 10',
+)
+
+
+def measure(lines: list[str], clear_cache: bool) -> float:
+    """Замеряет разбор сценария.
+
+    Args:
+        lines: Строки сценария
+        clear_cache: Сбросить кэш compile_line перед разбором
+
+    Returns:
+        float: Время разбора в секундах
+    """
+    if clear_cache:
+        parser.compile_line.cache_clear()
+
+    start = time.perf_counter()
+    parser.compile_script(lines)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    arguments_parser = argparse.ArgumentParser(description=__doc__)
+    arguments_parser.add_argument('--lines', type=int, default=100_000)
+    arguments = arguments_parser.parse_args()
+
+    repeated = [
+        TEMPLATES[number % len(TEMPLATES)] for number in range(arguments.lines)
+    ]
+    unique = [f'cat file_{number}.txt' for number in range(arguments.lines)]
+
+    print(f'{"script":>16} {"seconds":>10} {"us per line":>12}')
+    for name, lines, clear_cache in (
+        ('repeated, cold', repeated, True),
+        ('repeated, warm', repeated, False),
+        ('unique', unique, True),
+    ):
+        elapsed = measure(lines, clear_cache)
+        per_line = elapsed / arguments.lines * 1e6
+        print(f'{name:>16} {elapsed:>10.3f} {per_line:>12.2f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+"""Бенчмарк выполнения команд из сценария и из интерактивного режима.
+
+Один и тот же набор команд выполняется через ``main.py сценарий`` и
+через стандартный ввод интерактивной оболочки, которая печатает
+приглашение со сбросом буфера и пишет историю после каждой команды.
+
+Запуск::
+
+    python3 benchmarks/script_mode.py --commands 20000
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+MAIN_PATH = Path(__file__).resolve().parent.parent / 'src' / 'main.py'
+
+
+def measure(arguments: list[str], stdin: bytes, home: str) -> float:
+    """Замеряет время выполнения оболочки.
+
+    Args:
+        arguments: Аргументы main.py
+        stdin: Данные для стандартного ввода
+        home: Домашняя директория для запускаемой оболочки
+
+    Returns:
+        float: Время в секундах
+    """
+    start = time.perf_counter()
+    subprocess.run(
+        [sys.executable, str(MAIN_PATH), *arguments],
+        input=stdin,
+        stdout=subprocess.DEVNULL,
+        env={**os.environ, 'HOME': home},
+        check=True,
+    )
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    arguments_parser = argparse.ArgumentParser(description=__doc__)
+    arguments_parser.add_argument('--commands', type=int, default=20_000)
+    arguments = arguments_parser.parse_args()
+
+    script = ''.join(
+        f'cd .; cat missing_{number}\n' for number in range(arguments.commands)
+    )
+    commands = arguments.commands * 2
+
+    with tempfile.TemporaryDirectory() as home:
+        script_path = Path(home) / 'script.sh'
+        script_path.write_text(script)
+
+        print(f'{"mode":>12} {"seconds":>10} {"commands/s":>12}')
+        for mode, elapsed in (
+            ('script', measure([str(script_path)], b'', home)),
+            (
+                'interactive',
+                measure([], script.replace('; ', '\n').encode(), home),
+            ),
+        ):
+            print(f'{mode:>12} {elapsed:>10.2f} {commands / elapsed:>12.0f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,131 @@
+"""Бенчмарк сервера оболочки против холодного запуска.
+
+Одна и та же команда выполняется через новый процесс ``main.py -c``,
+через новый процесс ``client.py -c`` к запущенному ``main.py --serve``
+и через одно открытое соединение клиента. Первые два варианта
+показывают время, которое видит пользователь, третий - чистую
+задержку запроса к прогретому серверу.
+
+Запуск::
+
+    python3 benchmarks/server.py --runs 20 --command "grep -r def ."
+"""
+
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+SRC_PATH = Path(__file__).resolve().parent.parent / 'src'
+sys.path.insert(0, str(SRC_PATH))
+
+import client  # noqa: E402
+
+
+def measure_process(arguments: list[str], env: dict[str, str]) -> float:
+    """Замеряет время выполнения нового процесса.
+
+    Args:
+        arguments: Скрипт из src и его аргументы
+        env: Переменные окружения процесса
+
+    Returns:
+        float: Время в секундах
+    """
+    start = time.perf_counter()
+    subprocess.run(
+        [sys.executable, str(SRC_PATH / arguments[0]), *arguments[1:]],
+        stdout=subprocess.DEVNULL,
+        env=env,
+        check=False,
+    )
+    return time.perf_counter() - start
+
+
+def wait_for_socket(socket_path: Path, timeout: float = 10.0) -> None:
+    """Ждет, пока сервер начнет принимать соединения.
+
+    Args:
+        socket_path: Путь к сокету сервера
+        timeout: Максимальное время ожидания в секундах
+    """
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(str(socket_path))
+            return
+        except OSError:
+            time.sleep(0.05)
+        finally:
+            probe.close()
+    raise TimeoutError(f'{socket_path}: server did not start')
+
+
+def main() -> None:
+    arguments_parser = argparse.ArgumentParser(description=__doc__)
+    arguments_parser.add_argument('--runs', type=int, default=20)
+    arguments_parser.add_argument('--command', default='ls -l')
+    arguments = arguments_parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as home:
+        socket_path = Path(home) / 'shell.sock'
+        env = {
+            **os.environ,
+            'HOME': home,
+            'TERMINAL_SOCKET_PATH': str(socket_path),
+        }
+
+        server = subprocess.Popen(
+            [sys.executable, str(SRC_PATH / 'main.py'), '--serve'],
+            stdout=subprocess.DEVNULL,
+            env=env,
+        )
+        try:
+            wait_for_socket(socket_path)
+
+            cold = [
+                measure_process(['main.py', '-c', arguments.command], env)
+                for _ in range(arguments.runs)
+            ]
+            thin = [
+                measure_process(['client.py', '-c', arguments.command], env)
+                for _ in range(arguments.runs)
+            ]
+
+            warm = []
+            connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            connection.connect(str(socket_path))
+            with connection, open(os.devnull, 'w') as devnull:
+                reader = connection.makefile('rb')
+                writer = connection.makefile('wb')
+                stdout, sys.stdout = sys.stdout, devnull
+                try:
+                    for _ in range(arguments.runs):
+                        start = time.perf_counter()
+                        client.request(
+                            reader, writer, arguments.command, os.getcwd()
+                        )
+                        warm.append(time.perf_counter() - start)
+                finally:
+                    sys.stdout = stdout
+        finally:
+            server.terminate()
+            server.wait()
+
+    print(f'{"mode":>12} {"median ms":>10}')
+    for mode, timings in (
+        ('main.py -c', cold),
+        ('client.py -c', thin),
+        ('request', warm),
+    ):
+        print(f'{mode:>12} {statistics.median(timings) * 1000:>10.2f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+"""Бенчмарк запуска оболочки.
+
+Замеряет время от запуска ``main.py`` до первого приглашения и выводит
+самые долгие импорты по данным ``python -X importtime``. Оболочка
+запускается с временной домашней директорией, чтобы не трогать
+историю и корзину пользователя.
+
+Запуск::
+
+    python3 benchmarks/startup.py --runs 20 --top 15
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+SRC_PATH = Path(__file__).resolve().parent.parent / 'src'
+
+
+def time_to_prompt(home: str) -> float:
+    """Замеряет время от запуска оболочки до первого приглашения.
+
+    Args:
+        home: Домашняя директория для запускаемой оболочки
+
+    Returns:
+        float: Время в секундах
+    """
+    start = time.perf_counter()
+    shell = subprocess.Popen(
+        [sys.executable, str(SRC_PATH / 'main.py')],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        env={**os.environ, 'HOME': home},
+    )
+    assert shell.stdout is not None and shell.stdin is not None
+
+    while shell.stdout.read(1) not in (b' ', b''):
+        pass
+    elapsed = time.perf_counter() - start
+
+    shell.stdin.close()
+    shell.wait()
+    return elapsed
+
+
+def import_breakdown(home: str) -> list[tuple[int, int, str]]:
+    """Собирает время импорта модулей оболочки.
+
+    Args:
+        home: Домашняя директория для запускаемого интерпретатора
+
+    Returns:
+        list[tuple[int, int, str]]: Собственное и суммарное время в
+            микросекундах и имя модуля, по убыванию суммарного времени
+    """
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import main'],
+        cwd=SRC_PATH,
+        env={**os.environ, 'HOME': home},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    breakdown = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, module = line[len('import time:') :].split('|')
+        breakdown.append((int(self_us), int(cumulative_us), module.rstrip()))
+
+    return sorted(breakdown, key=lambda item: item[1], reverse=True)
+
+
+def main() -> None:
+    arguments_parser = argparse.ArgumentParser(description=__doc__)
+    arguments_parser.add_argument('--runs', type=int, default=20)
+    arguments_parser.add_argument('--top', type=int, default=15)
+    arguments = arguments_parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as home:
+        timings = [time_to_prompt(home) for _ in range(arguments.runs)]
+
+        median = statistics.median(timings) * 1e3
+        print(
+            f'time to first prompt: median {median:.1f} ms,'
+            f' min {min(timings) * 1e3:.1f} ms,'
+            f' max {max(timings) * 1e3:.1f} ms ({arguments.runs} runs)'
+        )
+        print()
+        print(f'{"self, us":>10} {"cumulative, us":>15}  module')
+        for self_us, cumulative_us, module in import_breakdown(home)[
+            : arguments.top
+        ]:
+            print(f'{self_us:>10} {cumulative_us:>15}  {module}')
+
+
+if __name__ == '__main__':
+    main()
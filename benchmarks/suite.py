@@ -0,0 +1,434 @@
+"""Набор воспроизводимых бенчмарков команд оболочки.
+
+Создает синтетическое дерево (см. ``benchmarks/tree.py``) и замеряет
+``ls``, ``ls -l``, ``ls -lU``, ``ls -lR``, ``ls -lt --top``,
+``grep -r``, ``cp -r``, ``mv``, ``rm -r``, ``tar``/``untar``,
+``zip``/``unzip`` и ``history``. Каждая команда выполняется
+``--repeat`` раз через parser, вывод отбрасывается, а подготовка и
+уборка между повторами в замер не входят. После замеров каждая
+команда выполняется еще раз под accounting.measure, чтобы записать
+число открытых файлов и вызовов stat: в отличие от времени они не
+зависят от шума машины.
+
+Оболочка работает с временной домашней директорией, поэтому история и
+корзина пользователя не меняются.
+
+Результаты сохраняются в JSON и сравниваются с сохраненными ранее.
+При сравнении дерево строится с параметрами из сохраненного
+результата, а регрессией считается рост медианы времени или числа
+вызовов больше чем на ``--threshold``. Изменения времени меньше
+NOISE_FLOOR секунд не считаются регрессией: на таких временах
+относительный шум слишком велик. При регрессии код возврата - 1.
+
+Запуск::
+
+    python3 benchmarks/suite.py --files 2000 --save baseline.json
+    python3 benchmarks/suite.py --compare baseline.json --threshold 0.1
+    python3 benchmarks/suite.py --only grep-r ls-l --repeat 10
+"""
+
+import argparse
+import dataclasses
+import datetime
+import json
+import logging
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import typing
+from pathlib import Path
+
+import tree
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+
+HISTORY_SIZE = 100_000
+NOISE_FLOOR = 0.001
+
+
+class NullSink:
+    """Приемник вывода, отбрасывающий текст и отвечающий ``y``."""
+
+    def write(self, text: str) -> int:
+        return len(text)
+
+    def flush(self) -> None:
+        pass
+
+    def ask(self, prompt: str) -> str:
+        return 'y'
+
+
+@dataclasses.dataclass(frozen=True)
+class Benchmark:
+    """Команда бенчмарка с подготовкой и уборкой вокруг замера.
+
+    Строка команды может содержать ``{dirs}`` (все директории дерева),
+    ``{top}`` (директории первого уровня) и ``{files}`` (файлы в корне
+    дерева).
+    """
+
+    name: str
+    line: str
+    setup: typing.Callable[[Path], None] | None = None
+    teardown: typing.Callable[[Path], None] | None = None
+
+
+def remove(*names: str) -> typing.Callable[[Path], None]:
+    """Возвращает уборку, удаляющую пути в рабочей директории.
+
+    Args:
+        *names: Имена файлов и директорий
+
+    Returns:
+        typing.Callable[[Path], None]: Функция уборки
+    """
+
+    def cleanup(work: Path) -> None:
+        for name in names:
+            path = work / name
+            if path.is_dir():
+                shutil.rmtree(path)
+            elif path.exists():
+                path.unlink()
+
+    return cleanup
+
+
+def copy_victim(work: Path) -> None:
+    shutil.copytree(work / 'tree', work / 'victim')
+
+
+def empty_trash(work: Path) -> None:
+    import constants
+
+    shutil.rmtree(constants.TRASH_PATH, ignore_errors=True)
+
+
+def make_moved(work: Path) -> None:
+    (work / 'moved').mkdir()
+
+
+def move_back(work: Path) -> None:
+    for path in (work / 'moved').iterdir():
+        path.rename(work / 'tree' / path.name)
+    (work / 'moved').rmdir()
+
+
+def make_archives(work: Path) -> None:
+    shutil.make_archive(str(work / 'packed'), 'gztar', work / 'tree')
+    shutil.make_archive(str(work / 'packed'), 'zip', work / 'tree')
+
+
+def make_out(work: Path) -> None:
+    (work / 'out').mkdir()
+
+
+BENCHMARKS = (
+    Benchmark('ls', 'ls {dirs}'),
+    Benchmark('ls-l', 'ls -l {dirs}'),
+    Benchmark('ls-lU', 'ls -lU {dirs}'),
+    Benchmark('ls-lR', 'ls -lR tree'),
+    Benchmark('ls-top', 'ls -lt --top 20 {dirs}'),
+    Benchmark('grep-r', 'grep -r error tree'),
+    Benchmark('cp-r', 'cp -r tree copy', teardown=remove('copy')),
+    Benchmark('mv', 'mv {files} moved', make_moved, move_back),
+    Benchmark('rm-r', 'rm -r victim', copy_victim, empty_trash),
+    Benchmark('tar', 'tar bench {top}', teardown=remove('bench.tar.gz')),
+    Benchmark('untar', 'untar out packed.tar.gz', make_out, remove('out')),
+    Benchmark('zip', 'zip bench {top}', teardown=remove('bench.zip')),
+    Benchmark('unzip', 'unzip out packed.zip', make_out, remove('out')),
+    Benchmark('history', 'history'),
+    Benchmark('history-n', 'history 100'),
+    Benchmark('history-s', 'history -s grep'),
+)
+
+
+def make_history(history_path: Path, size: int) -> None:
+    """Создает файл истории из size записей.
+
+    Args:
+        history_path: Путь к файлу истории
+        size: Количество записей
+    """
+    with open(history_path, 'w') as f:
+        f.write(
+            ''.join(
+                f'{number}. {"grep -r error" if number % 10 else "ls"} '
+                f'logs/{number}\n'
+                for number in range(1, size + 1)
+            )
+        )
+
+
+def expand(line: str, work: Path) -> str:
+    """Подставляет пути дерева в строку команды.
+
+    Args:
+        line: Строка команды с ``{dirs}``, ``{top}`` или ``{files}``
+        work: Рабочая директория с деревом ``tree``
+
+    Returns:
+        str: Строка команды
+    """
+    root = work / 'tree'
+    directories = sorted(
+        str(path.relative_to(work))
+        for path in root.rglob('*')
+        if path.is_dir()
+    )
+    top = sorted(
+        str(path.relative_to(work)) for path in root.iterdir() if path.is_dir()
+    )
+    files = sorted(
+        str(path.relative_to(work))
+        for path in root.iterdir()
+        if path.is_file()
+    )
+    return line.format(
+        dirs=' '.join(['tree'] + directories),
+        top=' '.join(top),
+        files=' '.join(files),
+    )
+
+
+def run_benchmark(
+    benchmark: Benchmark, work: Path, repeat: int
+) -> dict[str, typing.Any]:
+    """Замеряет команду repeat раз.
+
+    Args:
+        benchmark: Бенчмарк
+        work: Рабочая директория с деревом
+        repeat: Число замеров
+
+    Returns:
+        dict[str, typing.Any]: Время замеров и статистика по ним
+
+    Raises:
+        RuntimeError: Если команда завершилась с ошибкой
+    """
+    import output
+    import parser
+
+    command = parser.compile_line(expand(benchmark.line, work))
+    assert command is not None
+
+    runs = []
+    with output.use_sink(NullSink()):
+        for _ in range(repeat):
+            if benchmark.setup is not None:
+                benchmark.setup(work)
+
+            started = time.perf_counter()
+            exit_code = command.run()
+            runs.append(time.perf_counter() - started)
+
+            if benchmark.teardown is not None:
+                benchmark.teardown(work)
+
+            if exit_code:
+                raise RuntimeError(f'{benchmark.name}: exit code {exit_code}')
+
+    return {
+        'line': benchmark.line,
+        'runs': runs,
+        'min': min(runs),
+        'median': statistics.median(runs),
+        'stdev': statistics.stdev(runs) if len(runs) > 1 else 0.0,
+    }
+
+
+def count_calls(benchmark: Benchmark, work: Path) -> dict[str, int]:
+    """Считает открытые файлы и вызовы stat одного выполнения команды.
+
+    Args:
+        benchmark: Бенчмарк
+        work: Рабочая директория с деревом
+
+    Returns:
+        dict[str, int]: Поля opened и stat
+    """
+    import accounting
+    import output
+    import parser
+
+    command = parser.compile_line(expand(benchmark.line, work))
+    assert command is not None
+
+    with output.use_sink(NullSink()):
+        if benchmark.setup is not None:
+            benchmark.setup(work)
+        with accounting.measure() as usage:
+            command.run()
+        if benchmark.teardown is not None:
+            benchmark.teardown(work)
+
+    return {'opened': usage.files_opened, 'stat': usage.stat_calls}
+
+
+def run_suite(
+    spec: tree.TreeSpec, repeat: int, only: list[str] | None
+) -> dict[str, typing.Any]:
+    """Создает дерево и выполняет бенчмарки.
+
+    Args:
+        spec: Параметры дерева
+        repeat: Число замеров каждой команды
+        only: Имена бенчмарков или None для всех
+
+    Returns:
+        dict[str, typing.Any]: Параметры запуска и результаты
+    """
+    selected = [
+        benchmark
+        for benchmark in BENCHMARKS
+        if only is None or benchmark.name in only
+    ]
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        home = Path(temp_dir) / 'home'
+        work = Path(temp_dir) / 'work'
+        home.mkdir()
+        work.mkdir()
+        os.environ['HOME'] = str(home)
+
+        import constants
+
+        make_history(constants.HISTORY_PATH, HISTORY_SIZE)
+        tree.make_tree(work / 'tree', spec)
+        make_archives(work)
+
+        logging.disable(logging.CRITICAL)
+        os.chdir(work)
+
+        results = {}
+        for benchmark in selected:
+            result = run_benchmark(benchmark, work, repeat)
+            results[benchmark.name] = result
+            print(f'{benchmark.name:>12} {result["median"]:>9.4f}')
+
+        for benchmark in selected:
+            results[benchmark.name].update(count_calls(benchmark, work))
+
+        os.chdir(Path(temp_dir).parent)
+
+    return {
+        'meta': {
+            'date': datetime.datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'repeat': repeat,
+            'tree': dataclasses.asdict(spec),
+        },
+        'results': results,
+    }
+
+
+def compare(
+    baseline: dict[str, typing.Any],
+    current: dict[str, typing.Any],
+    threshold: float,
+) -> list[str]:
+    """Сравнивает результаты с сохраненными и выводит таблицу.
+
+    Args:
+        baseline: Сохраненные результаты
+        current: Новые результаты
+        threshold: Допустимый относительный рост, например 0.1
+
+    Returns:
+        list[str]: Описания регрессий
+    """
+    regressions = []
+    print(
+        f'{"benchmark":>12} {"base, s":>9} {"now, s":>9} {"change":>8}'
+        f' {"stat":>12} {"opened":>12}'
+    )
+
+    for name, result in current['results'].items():
+        base = baseline['results'].get(name)
+        if base is None:
+            print(f'{name:>12} {"-":>9} {result["median"]:>9.4f}')
+            continue
+
+        change = result['median'] / base['median'] - 1
+        flag = ''
+        if (
+            change > threshold
+            and result['median'] - base['median'] > NOISE_FLOOR
+        ):
+            flag = '  REGRESSION'
+            regressions.append(f'{name}: time {change:+.1%}')
+
+        counts = []
+        for field in ('stat', 'opened'):
+            counts.append(f'{base[field]}->{result[field]}')
+            if result[field] > base[field] * (1 + threshold):
+                flag = '  REGRESSION'
+                regressions.append(
+                    f'{name}: {field} {base[field]} -> {result[field]}'
+                )
+
+        print(
+            f'{name:>12} {base["median"]:>9.4f} {result["median"]:>9.4f}'
+            f' {change:>+8.1%} {counts[0]:>12} {counts[1]:>12}{flag}'
+        )
+
+    return regressions
+
+
+def main() -> int:
+    arguments_parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    tree.add_arguments(arguments_parser)
+    arguments_parser.add_argument('--repeat', type=int, default=5)
+    arguments_parser.add_argument(
+        '--only',
+        nargs='+',
+        choices=[benchmark.name for benchmark in BENCHMARKS],
+        metavar='NAME',
+        help='выполнить только указанные бенчмарки',
+    )
+    arguments_parser.add_argument(
+        '--save', type=Path, help='сохранить результаты в JSON'
+    )
+    arguments_parser.add_argument(
+        '--compare', type=Path, help='сравнить с результатами из JSON'
+    )
+    arguments_parser.add_argument('--threshold', type=float, default=0.1)
+    arguments = arguments_parser.parse_args()
+
+    baseline = None
+    base_spec = tree.TreeSpec()
+    if arguments.compare is not None:
+        baseline = json.loads(arguments.compare.read_text())
+        base_spec = tree.TreeSpec(**baseline['meta']['tree'])
+
+    spec = tree.spec_from_arguments(arguments, base_spec)
+    current = run_suite(spec, arguments.repeat, arguments.only)
+
+    if arguments.save is not None:
+        arguments.save.write_text(json.dumps(current, indent=2) + '\n')
+        print(f'saved to {arguments.save}')
+
+    if baseline is None:
+        return 0
+
+    if spec != base_spec:
+        print('warning: tree parameters differ from the baseline')
+
+    regressions = compare(baseline, current, arguments.threshold)
+    for regression in regressions:
+        print(f'regression: {regression}')
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,211 @@
+"""Генератор синтетического дерева файлов для бенчмарков.
+
+Дерево задается числом файлов, глубиной и ветвлением директорий,
+распределением размеров файлов и длиной строк. Генератор
+детерминирован: при одинаковых параметрах и ``--seed`` получается
+одинаковое дерево, поэтому результаты бенчмарков можно сравнивать
+между запусками и машинами.
+
+Запуск::
+
+    python3 benchmarks/tree.py /tmp/tree --files 2000 --depth 3
+"""
+
+import argparse
+import dataclasses
+import random
+from pathlib import Path
+
+WORDS = (
+    'disk',
+    'network',
+    'request',
+    'timeout',
+    'user',
+    'session',
+    'cache',
+    'queue',
+    'worker',
+    'config',
+)
+
+
+@dataclasses.dataclass(frozen=True)
+class TreeSpec:
+    """Параметры синтетического дерева."""
+
+    files: int = 2000
+    depth: int = 3
+    fanout: int = 4
+    size: int = 4096
+    sizes: str = 'lognormal'
+    line_length: int = 80
+    match_ratio: float = 0.01
+    seed: int = 1
+
+
+def file_sizes(spec: TreeSpec, rng: random.Random) -> list[int]:
+    """Выбирает размеры файлов по заданному распределению.
+
+    Args:
+        spec: Параметры дерева
+        rng: Генератор случайных чисел
+
+    Returns:
+        list[int]: Размер каждого файла в байтах
+    """
+    if spec.sizes == 'fixed':
+        return [spec.size] * spec.files
+
+    if spec.sizes == 'uniform':
+        return [rng.randint(0, 2 * spec.size) for _ in range(spec.files)]
+
+    # Логнормальное распределение с медианой spec.size: много мелких
+    # файлов и редкие крупные, как в настоящих проектах.
+    return [
+        int(rng.lognormvariate(0, 1) * spec.size) for _ in range(spec.files)
+    ]
+
+
+def make_line(spec: TreeSpec, rng: random.Random) -> str:
+    """Создает строку длиной spec.line_length символов с переводом строки.
+
+    Доля spec.match_ratio строк начинается с ``error``, чтобы у
+    ``grep -r error`` были совпадения.
+
+    Args:
+        spec: Параметры дерева
+        rng: Генератор случайных чисел
+
+    Returns:
+        str: Строка файла
+    """
+    words = ['error:' if rng.random() < spec.match_ratio else 'info:']
+    length = len(words[0])
+    while length < spec.line_length - 1:
+        word = rng.choice(WORDS)
+        words.append(word)
+        length += len(word) + 1
+
+    return ' '.join(words)[: spec.line_length - 1] + '\n'
+
+
+def make_directories(root: Path, spec: TreeSpec) -> list[Path]:
+    """Создает директории дерева: spec.fanout потомков до глубины depth.
+
+    Args:
+        root: Корень дерева
+        spec: Параметры дерева
+
+    Returns:
+        list[Path]: Все директории, включая корень
+    """
+    directories = [root]
+    level = [root]
+    for _ in range(spec.depth):
+        level = [
+            parent / f'dir_{number}'
+            for parent in level
+            for number in range(spec.fanout)
+        ]
+        directories.extend(level)
+
+    for directory in directories:
+        directory.mkdir(parents=True, exist_ok=True)
+    return directories
+
+
+def make_tree(root: Path, spec: TreeSpec) -> list[Path]:
+    """Создает дерево файлов по параметрам spec.
+
+    Файлы раскладываются по всем директориям по кругу. Строки берутся
+    из заранее созданного набора, поэтому генерация больших деревьев не
+    упирается в генератор случайных чисел.
+
+    Args:
+        root: Корень дерева (создается, если его нет)
+        spec: Параметры дерева
+
+    Returns:
+        list[Path]: Все директории дерева, включая корень
+    """
+    rng = random.Random(spec.seed)
+    directories = make_directories(root, spec)
+    lines = [make_line(spec, rng) for _ in range(1024)]
+
+    for number, size in enumerate(file_sizes(spec, rng)):
+        parts = []
+        written = 0
+        while written < size:
+            line = lines[rng.randrange(len(lines))]
+            parts.append(line)
+            written += len(line)
+
+        directory = directories[number % len(directories)]
+        (directory / f'file_{number}.txt').write_text(
+            ''.join(parts)[:size], encoding='utf-8'
+        )
+
+    return directories
+
+
+def add_arguments(arguments_parser: argparse.ArgumentParser) -> None:
+    """Добавляет параметры дерева в разбор аргументов.
+
+    Значения по умолчанию - None, чтобы отличать заданные параметры от
+    взятых из TreeSpec или из сохраненного результата.
+
+    Args:
+        arguments_parser: Разбор аргументов бенчмарка
+    """
+    arguments_parser.add_argument('--files', type=int)
+    arguments_parser.add_argument('--depth', type=int)
+    arguments_parser.add_argument('--fanout', type=int)
+    arguments_parser.add_argument(
+        '--size', type=int, help='средний размер файла в байтах'
+    )
+    arguments_parser.add_argument(
+        '--sizes', choices=('fixed', 'uniform', 'lognormal')
+    )
+    arguments_parser.add_argument('--line-length', type=int)
+    arguments_parser.add_argument('--match-ratio', type=float)
+    arguments_parser.add_argument('--seed', type=int)
+
+
+def spec_from_arguments(
+    arguments: argparse.Namespace, base: TreeSpec | None = None
+) -> TreeSpec:
+    """Собирает параметры дерева из аргументов поверх base.
+
+    Args:
+        arguments: Разобранные аргументы
+        base: Параметры по умолчанию
+
+    Returns:
+        TreeSpec: Параметры дерева
+    """
+    base = base or TreeSpec()
+    overrides = {
+        field.name: getattr(arguments, field.name)
+        for field in dataclasses.fields(TreeSpec)
+        if getattr(arguments, field.name) is not None
+    }
+    return dataclasses.replace(base, **overrides)
+
+
+def main() -> None:
+    arguments_parser = argparse.ArgumentParser(description=__doc__)
+    arguments_parser.add_argument('root', type=Path)
+    add_arguments(arguments_parser)
+    arguments = arguments_parser.parse_args()
+
+    spec = spec_from_arguments(arguments)
+    directories = make_tree(arguments.root, spec)
+    print(
+        f'{spec.files} files in {len(directories)} directories'
+        f' under {arguments.root}'
+    )
+
+
+if __name__ == '__main__':
+    main()
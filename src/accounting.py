@@ -0,0 +1,391 @@
+import contextlib
+import dataclasses
+import functools
+import os
+import resource
+import sys
+import threading
+import time
+import typing
+from collections.abc import Iterator
+from pathlib import Path
+
+from constants import ACCOUNTING_LOG
+from logger.logger_setup import terminal_logger
+
+PROC_IO_PATH = Path('/proc/self/io')
+PROC_STATUS_PATH = Path('/proc/self/status')
+PROC_CLEAR_REFS_PATH = Path('/proc/self/clear_refs')
+
+
+@dataclasses.dataclass
+class Usage:
+    """Ресурсы, потраченные командой.
+
+    Время ЦП, ввод-вывод и пиковая память считаются для всего процесса,
+    поэтому в них попадают и фоновые задачи, выполняющиеся параллельно.
+    Открытые файлы и вызовы stat считаются только в потоке команды и в
+    потоках, которые она запускает через bind (конвейер, пул ls -R).
+    Stat через DirEntry системным аудитом не виден и учитывается там,
+    где его вызывает ls. Поля ввода-вывода и памяти равны None, если
+    /proc недоступен.
+    """
+
+    real: float = 0.0
+    user: float = 0.0
+    system: float = 0.0
+    read_bytes: int | None = None
+    written_bytes: int | None = None
+    files_opened: int = 0
+    stat_calls: int = 0
+    peak_rss: int | None = None
+
+
+class _Counters:
+    """Счетчики открытых файлов и вызовов stat одного измерения.
+
+    В счетчики одного измерения пишут несколько потоков, поэтому
+    увеличение идет под блокировкой.
+    """
+
+    def __init__(self) -> None:
+        self.opened = 0
+        self.stats = 0
+        self._lock = threading.Lock()
+
+    def add(self, opened: int = 0, stats: int = 0) -> None:
+        with self._lock:
+            self.opened += opened
+            self.stats += stats
+
+
+class _MeasureLocal(threading.local):
+    counters: tuple[_Counters, ...] = ()
+
+
+_local = _MeasureLocal()
+_active: list[Usage] = []
+_lock = threading.Lock()
+_audit_installed = False
+_measuring = 0
+_originals: dict[str, typing.Callable[..., typing.Any]] = {}
+
+_STAT_FUNCTIONS = ('stat', 'lstat')
+_SUPPORTS = (os.supports_dir_fd, os.supports_fd, os.supports_follow_symlinks)
+
+
+def _audit(event: str, arguments: tuple[typing.Any, ...]) -> None:
+    if event == 'open':
+        for counters in _local.counters:
+            counters.add(opened=1)
+
+
+def count_stat() -> None:
+    """Учитывает вызов stat, который не виден через os.stat.
+
+    Вызывается для DirEntry.stat. Вне измерения ничего не делает.
+    """
+    for counters in _local.counters:
+        counters.add(stats=1)
+
+
+def _counted(function: typing.Callable[..., typing.Any]) -> typing.Any:
+    @functools.wraps(function)
+    def wrapper(*args: typing.Any, **kwargs: typing.Any) -> typing.Any:
+        for counters in _local.counters:
+            counters.add(stats=1)
+        return function(*args, **kwargs)
+
+    return wrapper
+
+
+def _install_hooks() -> None:
+    """Подключает счетчики открытых файлов и вызовов stat.
+
+    Открытия файлов считаются через audit hook события ``open``. Снять
+    его нельзя, поэтому он ставится один раз при первом измерении, а
+    вне измерений ничего не считает. Для stat аудит-события нет,
+    поэтому на время измерений os.stat и os.lstat заменяются обертками,
+    а после последнего измерения возвращаются (см. _remove_hooks).
+    Обертки добавляются в os.supports_* вместо исходных функций, чтобы
+    shutil и другие модули выбирали те же пути кода. Вызывается под
+    _lock.
+    """
+    global _audit_installed, _measuring
+
+    _measuring += 1
+    if _measuring > 1:
+        return
+
+    if not _audit_installed:
+        sys.addaudithook(_audit)
+        _audit_installed = True
+
+    for name in _STAT_FUNCTIONS:
+        original = getattr(os, name)
+        wrapper = _counted(original)
+        for supported in _SUPPORTS:
+            if original in supported:
+                supported.add(wrapper)
+        _originals[name] = original
+        setattr(os, name, wrapper)
+
+
+def _remove_hooks() -> None:
+    """Возвращает os.stat и os.lstat после последнего измерения.
+
+    Вызывается под _lock.
+    """
+    global _measuring
+
+    _measuring -= 1
+    if _measuring:
+        return
+
+    for name in _STAT_FUNCTIONS:
+        wrapper = getattr(os, name)
+        for supported in _SUPPORTS:
+            supported.discard(wrapper)
+        setattr(os, name, _originals.pop(name))
+
+
+def bind(
+    function: typing.Callable[..., typing.Any],
+) -> typing.Callable[..., typing.Any]:
+    """Переносит измерения текущего потока в поток, выполняющий function.
+
+    Команда передает свои функции потокам, которые она запускает и
+    дожидается (конвейер, пул ls -R), чтобы их открытия файлов и
+    вызовы stat попали в ее измерение. Фоновые задачи и другие клиенты
+    сервера в измерение не попадают.
+
+    Args:
+        function: Функция для другого потока
+
+    Returns:
+        typing.Callable[..., typing.Any]: function или обертка над ней
+    """
+    counters = _local.counters
+    if not counters:
+        return function
+
+    @functools.wraps(function)
+    def wrapper(*args: typing.Any, **kwargs: typing.Any) -> typing.Any:
+        previous = _local.counters
+        _local.counters = counters
+        try:
+            return function(*args, **kwargs)
+        finally:
+            _local.counters = previous
+
+    return wrapper
+
+
+def _read_io(own_read: bool = False) -> tuple[int, int] | None:
+    """Читает байты, прочитанные и записанные процессом.
+
+    Ядро учитывает чтение /proc/self/io только в следующем снимке,
+    поэтому для первого из двух снимков к rchar добавляется размер
+    самого чтения, иначе разница снимков включала бы его.
+
+    Args:
+        own_read: Учесть в rchar само это чтение
+
+    Returns:
+        tuple[int, int] | None: rchar и wchar из /proc/self/io или None
+    """
+    try:
+        text = PROC_IO_PATH.read_text()
+        fields = dict(line.split(': ') for line in text.splitlines())
+        own = len(text) if own_read else 0
+        return int(fields['rchar']) + own, int(fields['wchar'])
+    except (OSError, KeyError, ValueError):
+        return None
+
+
+def _read_peak_rss() -> int | None:
+    """Читает пиковый размер резидентной памяти процесса.
+
+    Returns:
+        int | None: VmHWM в байтах или ru_maxrss, если /proc недоступен
+    """
+    try:
+        for line in PROC_STATUS_PATH.read_text().splitlines():
+            if line.startswith('VmHWM:'):
+                return int(line.split()[1]) * 1024
+    except (OSError, ValueError):
+        pass
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def _reset_peak_rss() -> None:
+    """Сбрасывает VmHWM до текущего размера памяти.
+
+    Перед сбросом пик запоминается во всех незавершенных измерениях,
+    поэтому вложенные ``time`` не теряют пик внешней команды. Если
+    сбросить пик нельзя, измерение покажет пик за всю жизнь процесса.
+    """
+    peak = _read_peak_rss()
+    for usage in _active:
+        usage.peak_rss = max(usage.peak_rss or 0, peak or 0)
+
+    try:
+        PROC_CLEAR_REFS_PATH.write_text('5')
+    except OSError:
+        pass
+
+
+@contextlib.contextmanager
+def measure() -> Iterator[Usage]:
+    """Измеряет ресурсы, потраченные внутри блока.
+
+    Yields:
+        Usage: Запись, которая заполняется при выходе из блока
+    """
+    usage = Usage()
+    counters = _Counters()
+
+    with _lock:
+        _install_hooks()
+        _reset_peak_rss()
+        _active.append(usage)
+
+    io_before = _read_io(own_read=True)
+    rusage_before = resource.getrusage(resource.RUSAGE_SELF)
+    previous = _local.counters
+    _local.counters = previous + (counters,)
+    started = time.perf_counter()
+
+    try:
+        yield usage
+
+    finally:
+        usage.real = time.perf_counter() - started
+        _local.counters = previous
+        usage.files_opened = counters.opened
+        usage.stat_calls = counters.stats
+
+        rusage_after = resource.getrusage(resource.RUSAGE_SELF)
+        usage.user = rusage_after.ru_utime - rusage_before.ru_utime
+        usage.system = rusage_after.ru_stime - rusage_before.ru_stime
+
+        io_after = _read_io()
+        if io_before is not None and io_after is not None:
+            usage.read_bytes = io_after[0] - io_before[0]
+            usage.written_bytes = io_after[1] - io_before[1]
+
+        with _lock:
+            _remove_hooks()
+            _active.remove(usage)
+            peak = _read_peak_rss()
+            if peak is not None:
+                usage.peak_rss = max(usage.peak_rss or 0, peak)
+
+
+@contextlib.contextmanager
+def logged(line: str) -> Iterator[None]:
+    """Записывает ресурсы команды в лог, если включен ACCOUNTING_LOG.
+
+    Args:
+        line: Строка команды для записи в лог
+    """
+    if not ACCOUNTING_LOG:
+        yield
+        return
+
+    try:
+        with measure() as usage:
+            yield
+    finally:
+        terminal_logger.info(f'{line} - {format_log(usage)}')
+
+
+def usage_record(usage: Usage, line: str) -> dict[str, typing.Any]:
+    """Собирает запись о ресурсах команды.
+
+    Args:
+        usage: Измеренные ресурсы
+        line: Строка команды
+
+    Returns:
+        dict[str, typing.Any]: Запись с типом ``time``
+    """
+    return {'type': 'time', 'line': line, **dataclasses.asdict(usage)}
+
+
+def format_size(size: int | None) -> str:
+    """Форматирует размер в байтах как ``ls -h``.
+
+    Args:
+        size: Размер в байтах или None
+
+    Returns:
+        str: Строка вида ``512``, ``4.0K`` или ``-``, если размера нет
+    """
+    if size is None:
+        return '-'
+
+    if size < 1024:
+        return str(size)
+
+    value = size / 1024
+    for unit in 'KMG':
+        if value < 1024:
+            return f'{value:.1f}{unit}'
+        value /= 1024
+    return f'{value:.1f}T'
+
+
+def format_seconds(seconds: float) -> str:
+    """Форматирует время как встроенная команда time в bash.
+
+    Args:
+        seconds: Время в секундах
+
+    Returns:
+        str: Строка вида ``0m1.250s``
+    """
+    minutes, seconds = divmod(seconds, 60)
+    return f'{int(minutes)}m{seconds:.3f}s'
+
+
+def format_usage(record: dict[str, typing.Any]) -> str:
+    """Форматирует запись о ресурсах для вывода ``time``.
+
+    Args:
+        record: Запись из usage_record
+
+    Returns:
+        str: Строки ``имя<TAB>значение``, по одной на показатель
+    """
+    rows = (
+        ('real', format_seconds(record['real'])),
+        ('user', format_seconds(record['user'])),
+        ('sys', format_seconds(record['system'])),
+        ('read', format_size(record['read_bytes'])),
+        ('written', format_size(record['written_bytes'])),
+        ('opened', str(record['files_opened'])),
+        ('stat', str(record['stat_calls'])),
+        ('maxrss', format_size(record['peak_rss'])),
+    )
+    return '\n' + '\n'.join(f'{name}\t{value}' for name, value in rows)
+
+
+def format_log(usage: Usage) -> str:
+    """Форматирует ресурсы одной строкой для лога.
+
+    Args:
+        usage: Измеренные ресурсы
+
+    Returns:
+        str: Строка вида ``real=0.012s user=0.010s ...``
+    """
+    return (
+        f'real={usage.real:.3f}s user={usage.user:.3f}s '
+        f'sys={usage.system:.3f}s read={format_size(usage.read_bytes)} '
+        f'written={format_size(usage.written_bytes)} '
+        f'opened={usage.files_opened} stat={usage.stat_calls} '
+        f'maxrss={format_size(usage.peak_rss)}'
+    )
@@ -0,0 +1,182 @@
+import contextlib
+import signal
+import threading
+import time
+import typing
+from collections.abc import Iterator
+
+INTERRUPTED = 'interrupted'
+TIMED_OUT = 'timed out'
+
+
+class Cancelled(BaseException):
+    """Команда отменена через Ctrl-C или по истечении timeout.
+
+    Наследуется от BaseException, как и pipeline.PipeClosed, чтобы
+    обработчики ``except Exception`` в командах не перехватывали отмену.
+    """
+
+    def __init__(self, reason: str = INTERRUPTED) -> None:
+        super().__init__(reason)
+        self.reason = reason
+
+    @property
+    def exit_code(self) -> int:
+        """Код возврата: 124 по истечении срока, как у timeout, и 130
+        для Ctrl-C."""
+        return 124 if self.reason == TIMED_OUT else 130
+
+
+class CancelToken:
+    """Флаг отмены, который команды проверяют в контрольных точках.
+
+    Токен отменяется сам, когда истек его срок, и считается отмененным,
+    если отменен родительский токен.
+    """
+
+    def __init__(
+        self,
+        timeout: float | None = None,
+        parent: 'CancelToken | None' = None,
+    ) -> None:
+        self.deadline = None if timeout is None else time.monotonic() + timeout
+        self.parent = parent
+        self.reason: str | None = None
+        self._callbacks: list[typing.Callable[[], None]] = []
+
+    def cancel(self, reason: str = INTERRUPTED) -> None:
+        """Отменяет токен.
+
+        Args:
+            reason: Причина отмены
+        """
+        if self.reason is not None:
+            return
+
+        self.reason = reason
+        for callback in self._callbacks:
+            callback()
+
+    def on_cancel(self, callback: typing.Callable[[], None]) -> None:
+        """Вызывает callback при отмене токена.
+
+        Args:
+            callback: Функция без аргументов
+        """
+        self._callbacks.append(callback)
+
+    def cancelled(self) -> str | None:
+        """Проверяет отмену, не выбрасывая исключение.
+
+        Returns:
+            str | None: Причина отмены или None
+        """
+        if self.reason is None and self.deadline is not None:
+            if time.monotonic() >= self.deadline:
+                self.cancel(TIMED_OUT)
+
+        if self.reason is None and self.parent is not None:
+            return self.parent.cancelled()
+        return self.reason
+
+    def check(self) -> None:
+        """Контрольная точка: прерывает команду, если токен отменен.
+
+        Raises:
+            Cancelled: Если токен или его родитель отменены
+        """
+        reason = self.cancelled()
+        if reason is not None:
+            raise Cancelled(reason)
+
+
+class _TokenLocal(threading.local):
+    token: CancelToken | None = None
+
+
+_local = _TokenLocal()
+
+
+def current() -> CancelToken | None:
+    """Возвращает токен отмены текущего потока.
+
+    Returns:
+        CancelToken | None: Токен или None вне отменяемой команды
+    """
+    return _local.token
+
+
+@contextlib.contextmanager
+def scope(token: CancelToken | None) -> Iterator[CancelToken | None]:
+    """Делает token токеном отмены текущего потока.
+
+    Args:
+        token: Токен отмены
+
+    Yields:
+        CancelToken | None: Тот же токен
+    """
+    previous = _local.token
+    _local.token = token
+    try:
+        yield token
+    finally:
+        _local.token = previous
+
+
+def checkpoint() -> None:
+    """Прерывает команду, если ее токен отменен.
+
+    Вызывается в циклах обхода и копирования между файлами, поэтому
+    команда останавливается в согласованном состоянии.
+
+    Raises:
+        Cancelled: Если токен текущего потока отменен
+    """
+    token = _local.token
+    if token is not None:
+        token.check()
+
+
+def interrupt(token: CancelToken) -> None:
+    """Обрабатывает Ctrl-C во время команды.
+
+    Первое нажатие отменяет команду. Если команда не дошла до
+    контрольной точки и пользователь нажал Ctrl-C еще раз, оболочка
+    прерывается, как раньше.
+
+    Args:
+        token: Токен команды переднего плана
+
+    Raises:
+        KeyboardInterrupt: При повторном Ctrl-C
+    """
+    if token.reason is not None:
+        raise KeyboardInterrupt
+    token.cancel(INTERRUPTED)
+
+
+@contextlib.contextmanager
+def sigint_cancels(token: CancelToken) -> Iterator[CancelToken]:
+    """Направляет Ctrl-C в token, пока выполняется блок.
+
+    Обработчик сигнала можно поставить только в главном потоке, в
+    остальных потоках блок выполняется без него.
+
+    Args:
+        token: Токен отмены
+
+    Yields:
+        CancelToken: Тот же токен
+    """
+    if threading.current_thread() is not threading.main_thread():
+        yield token
+        return
+
+    previous = signal.signal(
+        signal.SIGINT, lambda signum, frame: interrupt(token)
+    )
+    try:
+        yield token
+    finally:
+        signal.signal(signal.SIGINT, previous)
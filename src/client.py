@@ -0,0 +1,136 @@
+"""Тонкий клиент сервера оболочки (``main.py --serve``).
+
+Передает строки команд серверу по Unix-сокету и выводит ответ по мере
+поступления. Клиент не импортирует модули оболочки, поэтому
+запускается почти мгновенно.
+"""
+
+import argparse
+import io
+import json
+import os
+import socket
+import sys
+
+import protocol
+from constants import SERVER_SOCKET_PATH
+
+
+def request(
+    reader: io.BufferedIOBase,
+    writer: io.BufferedIOBase,
+    line: str,
+    cwd: str,
+    stop_on_error: bool = False,
+) -> tuple[int, str]:
+    """Выполняет строку команд на сервере и выводит ее результат.
+
+    Args:
+        reader: Поток чтения соединения с сервером
+        writer: Поток записи соединения с сервером
+        line: Строка с командами через ``;``
+        cwd: Рабочая директория для команд
+        stop_on_error: Остановиться на первой команде с ошибкой
+
+    Returns:
+        tuple[int, str]: Код возврата и рабочая директория после
+            выполнения
+
+    Raises:
+        ConnectionError: Если сервер закрыл соединение
+    """
+    stdout = sys.stdout.buffer
+
+    protocol.write_frame(
+        writer,
+        protocol.REQUEST,
+        json.dumps(
+            {'line': line, 'cwd': cwd, 'stop_on_error': stop_on_error}
+        ).encode(),
+    )
+
+    while (frame := protocol.read_frame(reader)) is not None:
+        kind, payload = frame
+
+        if kind == protocol.OUTPUT:
+            stdout.write(payload)
+
+        elif kind == protocol.QUESTION:
+            stdout.flush()
+            try:
+                answer = input(payload.decode())
+            except EOFError:
+                answer = ''
+            protocol.write_frame(writer, protocol.ANSWER, answer.encode())
+
+        elif kind == protocol.EXIT:
+            stdout.flush()
+            result = json.loads(payload)
+            return result['exit_code'], result['cwd']
+
+    raise ConnectionError('server closed the connection')
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Подключается к серверу и выполняет команды.
+
+    Без аргументов клиент работает интерактивно, как main.py, с ``-c``
+    выполняет переданные команды.
+
+    Args:
+        argv: Аргументы командной строки без имени программы
+
+    Returns:
+        int: Код возврата последней команды
+    """
+    arguments_parser = argparse.ArgumentParser(
+        prog='client.py', description='Клиент сервера оболочки'
+    )
+    arguments_parser.add_argument(
+        '-c', dest='commands', metavar='COMMANDS', help='выполнить команды'
+    )
+    arguments_parser.add_argument(
+        '-e',
+        dest='stop_on_error',
+        action='store_true',
+        help='остановиться на первой команде с ошибкой',
+    )
+    arguments_parser.add_argument(
+        '--socket', default=str(SERVER_SOCKET_PATH), help='путь к сокету'
+    )
+    arguments = arguments_parser.parse_args(argv)
+
+    connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        connection.connect(arguments.socket)
+    except OSError as e:
+        print(f'client.py: {arguments.socket}: {e.strerror}')
+        return 1
+
+    cwd = os.getcwd()
+    exit_code = 0
+
+    with connection:
+        reader = connection.makefile('rb')
+        writer = connection.makefile('wb')
+
+        if arguments.commands is not None:
+            exit_code, cwd = request(
+                reader,
+                writer,
+                arguments.commands,
+                cwd,
+                arguments.stop_on_error,
+            )
+            return exit_code
+
+        print(cwd, end=' ', flush=True)
+        for line in sys.stdin:
+            exit_code, cwd = request(reader, writer, line.strip(), cwd)
+            print(cwd, end=' ', flush=True)
+
+    return exit_code
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,23 +1,90 @@
-import shutil
+import os
 from pathlib import Path
 
-POSSIBLE_SHORT_FLAGS = {'i', 'r', 'l', 'a'}
-POSSIBLE_LONS_FLAGS = {'ignore-case', 'recursive', 'long', 'all'}
+POSSIBLE_SHORT_FLAGS = {'i', 'r', 'l', 'a', 's', 'S', 'm', 'U', 'R', 't'}
+POSSIBLE_LONS_FLAGS = {
+    'ignore-case',
+    'recursive',
+    'long',
+    'all',
+    'search',
+    'slowest',
+    'mem',
+}
 TRANSFORMATION_FLAGS = {
     'ignore-case': 'i',
     'recursive': 'r',
     'long': 'l',
     'all': 'a',
+    'search': 's',
+    'slowest': 'S',
+    'mem': 'm',
 }
+VALUE_FLAGS = {'ls': {'top'}}
+
+COMPILE_CACHE_SIZE = 4096
+PIPE_BUFFER_LINES = 1024
+OUTPUT_BUFFER_SIZE = 64 * 1024
+JOB_WORKERS = 4
+CANCEL_CHECK_LINES = 4096
+LS_TIME_CACHE_SIZE = 1024
+LS_WORKERS = int(os.environ.get('TERMINAL_LS_WORKERS', '8'))
+LS_PREFETCH = 64
+LS_OUTPUT_BATCH = 1024
+LISTING_SORT_RUN = 16384
+CANCEL_POLL_INTERVAL = 0.1
+
+ACCOUNTING_LOG = os.environ.get('TERMINAL_ACCOUNTING', '0') == '1'
+PROFILE_DIR: Path = Path.home() / '.profiles'
+PROFILE_TOP = 15
+PROFILE_MAX_DEPTH = 64
+
+METRICS_PATH: Path | None = (
+    Path(
+        os.environ['TERMINAL_METRICS_PATH'].replace('{pid}', str(os.getpid()))
+    )
+    if os.environ.get('TERMINAL_METRICS_PATH')
+    else None
+)
+METRICS_INTERVAL = float(os.environ.get('TERMINAL_METRICS_INTERVAL', '15'))
+METRICS_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+    300.0,
+    float('inf'),
+)
 
 FOR_UNDO_HISTORY: list[list] = []
 HISTORY_PATH: Path = Path.home() / '.history'
+HISTORY_BLOCK_SIZE = 64 * 1024
 
-if not HISTORY_PATH.exists():
-    HISTORY_PATH.touch()
+HISTORY_BACKEND = os.environ.get('TERMINAL_HISTORY_BACKEND', 'file')
+HISTORY_DB_PATH: Path = Path.home() / '.history.sqlite3'
+HISTORY_DB_BATCH_SIZE = 64
+HISTORY_DB_FLUSH_INTERVAL = 0.5
 
-TRASH_PATH: Path = Path.home() / '.trash'
+SERVER_SOCKET_PATH: Path = Path(
+    os.environ.get('TERMINAL_SOCKET_PATH', Path.home() / '.terminal.sock')
+)
+SERVER_ANSWER_TIMEOUT = float(
+    os.environ.get('TERMINAL_SERVER_ANSWER_TIMEOUT', '300')
+)
+DIRECTORY_CACHE_NAMES = 200_000
+DIRECTORY_CACHE_RACY_SECONDS = 2.0
 
-if TRASH_PATH.exists():
-    shutil.rmtree(TRASH_PATH)
-TRASH_PATH.mkdir(exist_ok=True)
+TRASH_PATH: Path = Path.home() / '.trash'
+TRASH_ARCHIVE_PATH: Path = Path.home() / '.trash.old'
+TRASH_RETENTION_DAYS = float(
+    os.environ.get('TERMINAL_TRASH_RETENTION_DAYS', '0')
+)
@@ -0,0 +1,374 @@
+import contextlib
+import datetime
+import itertools
+import queue
+import re
+import sqlite3
+import threading
+import time
+from collections.abc import Iterator
+from pathlib import Path
+
+import history_index
+from constants import (
+    HISTORY_DB_BATCH_SIZE,
+    HISTORY_DB_FLUSH_INTERVAL,
+    HISTORY_DB_PATH,
+)
+from logger.logger_setup import terminal_logger
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS history (
+    sequence INTEGER PRIMARY KEY AUTOINCREMENT,
+    started REAL NOT NULL,
+    cwd TEXT NOT NULL,
+    command TEXT NOT NULL,
+    exit_code INTEGER,
+    duration REAL
+);
+-- Самые долгие команды за период (history -S) читаются из одного
+-- индекса по убыванию duration без сортировки, а started проверяется
+-- по тому же индексу. Старые отдельные индексы удаляются, чтобы
+-- планировщик не выбирал их в уже созданных базах.
+DROP INDEX IF EXISTS history_started;
+DROP INDEX IF EXISTS history_duration;
+CREATE INDEX IF NOT EXISTS history_duration_started
+    ON history (duration, started);
+"""
+
+SLOWEST_QUERY = (
+    'SELECT sequence, command, duration, exit_code FROM history'
+    ' WHERE started >= ? AND duration IS NOT NULL'
+    ' ORDER BY duration DESC LIMIT ?'
+)
+
+
+def connect(db_path: Path | str) -> sqlite3.Connection:
+    """Открывает базу истории в режиме WAL.
+
+    WAL позволяет нескольким оболочкам читать историю, пока другая
+    оболочка пишет, а AUTOINCREMENT выдает номера без гонок между ними.
+
+    Args:
+        db_path: Путь к базе истории
+
+    Returns:
+        sqlite3.Connection: Соединение с созданной схемой
+    """
+    connection = sqlite3.connect(db_path, timeout=10)
+    connection.execute('PRAGMA journal_mode=WAL')
+    connection.execute('PRAGMA synchronous=NORMAL')
+    connection.executescript(SCHEMA)
+    connection.create_function('regexp', 2, _regexp, deterministic=True)
+    return connection
+
+
+def _regexp(pattern: str, value: str) -> bool:
+    """Реализация оператора REGEXP для SQLite.
+
+    Args:
+        pattern: Регулярное выражение
+        value: Проверяемая строка
+
+    Returns:
+        bool: True если строка подходит под шаблон
+    """
+    return re.search(pattern, value) is not None
+
+
+class HistoryWriter:
+    """Фоновый писатель истории с пакетными коммитами.
+
+    Команды кладутся в очередь и не блокируют приглашение; поток
+    записи коммитит их пачками по HISTORY_DB_BATCH_SIZE записей или
+    после HISTORY_DB_FLUSH_INTERVAL секунд без новых записей. Ошибка
+    SQLite (полный диск, заблокированная или испорченная база) пишется
+    в лог, а записи, которые не удалось сохранить, теряются: поток
+    записи не останавливается, и flush не зависает.
+    """
+
+    def __init__(self, db_path: Path | str) -> None:
+        self.db_path = db_path
+        self._queue: queue.Queue[tuple] = queue.Queue()
+        self._tokens = itertools.count(1)
+        self._thread = threading.Thread(
+            target=self._run, name='history-writer', daemon=True
+        )
+        self._thread.start()
+
+    def begin(self, command: str, cwd: str) -> int:
+        """Ставит в очередь начало выполнения команды.
+
+        Args:
+            command: Текст команды
+            cwd: Рабочая директория
+
+        Returns:
+            int: Метка записи для finish
+        """
+        token = next(self._tokens)
+        self._queue.put(('begin', token, time.time(), cwd, command))
+        return token
+
+    def finish(self, token: int, exit_code: int, duration: float) -> None:
+        """Ставит в очередь код возврата и длительность команды.
+
+        Args:
+            token: Метка, полученная от begin
+            exit_code: Код возврата
+            duration: Длительность в секундах
+        """
+        self._queue.put(('finish', token, exit_code, duration))
+
+    def flush(self) -> None:
+        """Дожидается, пока все записи из очереди будут закоммичены."""
+        if not self._thread.is_alive():
+            return
+
+        self._queue.put(('flush',))
+        self._queue.join()
+
+    def close(self) -> None:
+        """Коммитит оставшиеся записи и останавливает поток записи."""
+        self._queue.put(('close',))
+        self._thread.join()
+
+    def _run(self) -> None:
+        try:
+            connection = connect(self.db_path)
+        except sqlite3.Error as e:
+            terminal_logger.error(f'history: {self.db_path}: {e}')
+            self._discard()
+            return
+
+        rowids: dict[int, int] = {}
+        pending = 0
+
+        while True:
+            try:
+                item = self._queue.get(
+                    timeout=HISTORY_DB_FLUSH_INTERVAL if pending else None
+                )
+            except queue.Empty:
+                item = ('commit',)
+
+            kind = item[0]
+            if kind in ('begin', 'finish'):
+                pending += 1
+            commit = kind not in ('begin', 'finish') or (
+                pending >= HISTORY_DB_BATCH_SIZE
+            )
+
+            try:
+                if kind == 'begin':
+                    _, token, started, cwd, command = item
+                    cursor = connection.execute(
+                        'INSERT INTO history (started, cwd, command)'
+                        ' VALUES (?, ?, ?)',
+                        (started, cwd, command),
+                    )
+                    if cursor.lastrowid is not None:
+                        rowids[token] = cursor.lastrowid
+
+                elif kind == 'finish':
+                    _, token, exit_code, duration = item
+                    connection.execute(
+                        'UPDATE history SET exit_code = ?, duration = ?'
+                        ' WHERE sequence = ?',
+                        (exit_code, duration, rowids.pop(token, -1)),
+                    )
+
+                if commit:
+                    connection.commit()
+
+            except sqlite3.Error as e:
+                terminal_logger.error(f'history: {self.db_path}: {e}')
+                with contextlib.suppress(sqlite3.Error):
+                    connection.rollback()
+
+            if commit:
+                for _ in range(pending):
+                    self._queue.task_done()
+                pending = 0
+
+            if kind in ('flush', 'close'):
+                self._queue.task_done()
+
+            if kind == 'close':
+                connection.close()
+                return
+
+    def _discard(self) -> None:
+        """Отбрасывает записи очереди, когда базу не удалось открыть."""
+        while True:
+            item = self._queue.get()
+            self._queue.task_done()
+            if item[0] == 'close':
+                return
+
+
+_writer: HistoryWriter | None = None
+
+
+def writer() -> HistoryWriter:
+    """Возвращает фоновый писатель истории, запуская его при необходимости.
+
+    Returns:
+        HistoryWriter: Писатель для HISTORY_DB_PATH
+    """
+    global _writer
+
+    if _writer is None:
+        _writer = HistoryWriter(HISTORY_DB_PATH)
+    return _writer
+
+
+def close() -> None:
+    """Коммитит оставшиеся записи истории при выходе из оболочки."""
+    global _writer
+
+    if _writer is not None:
+        _writer.close()
+        _writer = None
+
+
+def _query(
+    sql: str, parameters: tuple = (), regexp: re.Pattern[str] | None = None
+) -> list[tuple]:
+    """Выполняет запрос к истории, дождавшись записи очереди.
+
+    Args:
+        sql: Текст запроса
+        parameters: Параметры запроса
+        regexp: Скомпилированное выражение для оператора REGEXP (его
+            правый операнд тогда не используется)
+
+    Returns:
+        list[tuple]: Строки результата
+    """
+    if _writer is not None:
+        _writer.flush()
+
+    connection = connect(HISTORY_DB_PATH)
+    if regexp is not None:
+        search = regexp.search
+        connection.create_function(
+            'regexp',
+            2,
+            lambda pattern, value: search(value) is not None,
+            deterministic=True,
+        )
+    try:
+        return connection.execute(sql, parameters).fetchall()
+    finally:
+        connection.close()
+
+
+def format_record(sequence: int, command: str) -> str:
+    """Форматирует запись так же, как в файле истории.
+
+    Args:
+        sequence: Номер записи
+        command: Текст команды
+
+    Returns:
+        str: Строка вида ``N. команда``
+    """
+    return f'{sequence}. {command}\n'
+
+
+def all_records() -> Iterator[str]:
+    """Возвращает всю историю по порядку.
+
+    Yields:
+        str: Строки истории
+    """
+    if _writer is not None:
+        _writer.flush()
+
+    connection = connect(HISTORY_DB_PATH)
+    try:
+        for sequence, command in connection.execute(
+            'SELECT sequence, command FROM history ORDER BY sequence'
+        ):
+            yield format_record(sequence, command)
+    finally:
+        connection.close()
+
+
+def last_records(count: int) -> list[str]:
+    """Возвращает последние count записей истории.
+
+    Args:
+        count: Количество записей
+
+    Returns:
+        list[str]: Строки истории по порядку
+    """
+    rows = _query(
+        'SELECT sequence, command FROM history ORDER BY sequence DESC LIMIT ?',
+        (count,),
+    )
+    return [
+        format_record(sequence, command)
+        for sequence, command in reversed(rows)
+    ]
+
+
+def search(pattern: str, ignore_case: bool = False) -> list[str]:
+    """Ищет записи истории по регулярному выражению.
+
+    Обязательные фрагменты шаблона сначала отсекают записи через LIKE
+    (он не учитывает регистр только для ASCII, поэтому остальные
+    фрагменты пропускаются), а регулярное выражение проверяется только
+    на оставшихся записях.
+
+    Args:
+        pattern: Регулярное выражение
+        ignore_case: Игнорировать регистр
+
+    Returns:
+        list[str]: Найденные строки истории
+
+    Raises:
+        re.error: Если шаблон не является регулярным выражением
+        sqlite3.Error: Если базу истории не удалось прочитать
+    """
+    literals = history_index.required_literals(pattern) or []
+    regexp = re.compile(pattern, re.IGNORECASE if ignore_case else 0)
+
+    conditions = ['command REGEXP ?']
+    parameters = [pattern]
+    for literal in filter(str.isascii, literals):
+        conditions.insert(0, "command LIKE ? ESCAPE '\\'")
+        escaped = re.sub(r'([%_\\])', r'\\\1', literal)
+        parameters.insert(0, f'%{escaped}%')
+
+    rows = _query(
+        'SELECT sequence, command FROM history'
+        f' WHERE {" AND ".join(conditions)} ORDER BY sequence',
+        tuple(parameters),
+        regexp,
+    )
+    return [format_record(sequence, command) for sequence, command in rows]
+
+
+def slowest(
+    count: int, since: float | None = None
+) -> list[tuple[int, str, float, int | None]]:
+    """Возвращает самые долгие команды начиная с момента since.
+
+    Args:
+        count: Количество записей
+        since: Время начала в секундах Unix (по умолчанию начало суток)
+
+    Returns:
+        list[tuple[int, str, float, int | None]]: Номер, команда,
+            длительность в секундах и код возврата
+    """
+    if since is None:
+        since = datetime.datetime.combine(
+            datetime.date.today(), datetime.time.min
+        ).timestamp()
+
+    return _query(SLOWEST_QUERY, (since, count))
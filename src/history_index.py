@@ -0,0 +1,355 @@
+import os
+import re
+import typing
+from collections.abc import Iterator
+from pathlib import Path
+
+HISTORY_INDEX_SUFFIX = '.idx'
+
+REGEX_SPECIAL_CHARS = set('.^$*+?{}[]()|\\')
+OPTIONAL_QUANTIFIERS = set('?*{')
+
+_loaded_indexes: dict[str, tuple[int, dict[str, list[int]], int]] = {}
+
+
+def index_path(history_path: Path | str) -> Path:
+    """Возвращает путь к индексу, лежащему рядом с файлом истории.
+
+    Args:
+        history_path: Путь к файлу истории
+
+    Returns:
+        Path: Путь к файлу индекса
+    """
+    return Path(f'{history_path}{HISTORY_INDEX_SUFFIX}')
+
+
+def tokenize(command: str) -> set[str]:
+    """Разбивает команду на токены для индекса.
+
+    Args:
+        command: Текст команды
+
+    Returns:
+        set[str]: Уникальные токены в нижнем регистре
+    """
+    return set(command.lower().split())
+
+
+def _postings(offset: int, command: str) -> str:
+    """Формирует строки индекса для одной записи истории.
+
+    Args:
+        offset: Смещение записи в файле истории
+        command: Текст команды
+
+    Returns:
+        str: Строки вида ``токен<TAB>смещение``
+    """
+    return ''.join(f'{token}\t{offset}\n' for token in tokenize(command))
+
+
+def add_record(history_path: Path | str, offset: int, command: str) -> None:
+    """Добавляет запись истории в индекс одной дозаписью.
+
+    Если индекса еще нет, запись пропускается: индекс целиком строится
+    при первом поиске.
+
+    Args:
+        history_path: Путь к файлу истории
+        offset: Смещение записи в файле истории
+        command: Текст команды
+    """
+    postings = _postings(offset, command)
+    if not postings:
+        return
+
+    try:
+        fd = os.open(index_path(history_path), os.O_WRONLY | os.O_APPEND)
+    except FileNotFoundError:
+        return
+
+    try:
+        os.write(fd, postings.encode())
+    finally:
+        os.close(fd)
+
+
+def drop(history_path: Path | str) -> None:
+    """Удаляет индекс, например после обрезания файла истории.
+
+    Args:
+        history_path: Путь к файлу истории
+    """
+    index_path(history_path).unlink(missing_ok=True)
+    _loaded_indexes.pop(str(index_path(history_path)), None)
+
+
+def split_record(raw_line: bytes) -> str:
+    """Отделяет текст команды от номера записи истории.
+
+    Args:
+        raw_line: Строка истории вида ``N. команда``
+
+    Returns:
+        str: Текст команды
+    """
+    line = raw_line.decode(errors='replace').rstrip('\n')
+    _, _, command = line.partition('. ')
+    return command
+
+
+def _index_history_from(
+    history_path: Path | str, start: int, skip_first: bool
+) -> bool:
+    """Дописывает в индекс записи истории начиная со смещения start.
+
+    Args:
+        history_path: Путь к файлу истории
+        start: Смещение, с которого читаются записи
+        skip_first: Пропустить первую запись (она уже в индексе)
+
+    Returns:
+        bool: True если в индекс что-то дописано
+    """
+    chunks = []
+    with open(history_path, 'rb') as f:
+        f.seek(start)
+        offset = start
+        for raw_line in f:
+            if not skip_first:
+                chunks.append(_postings(offset, split_record(raw_line)))
+            skip_first = False
+            offset += len(raw_line)
+
+    postings = ''.join(chunks)
+    if not postings:
+        return False
+
+    with open(index_path(history_path), 'a') as f:
+        f.write(postings)
+    return True
+
+
+def rebuild(history_path: Path | str) -> None:
+    """Полностью перестраивает индекс по файлу истории.
+
+    Args:
+        history_path: Путь к файлу истории
+    """
+    drop(history_path)
+    index_path(history_path).touch(mode=0o600)
+    _index_history_from(history_path, 0, skip_first=False)
+
+
+def _is_record_start(history_path: Path | str, offset: int) -> bool:
+    """Проверяет, что по смещению начинается запись истории.
+
+    Args:
+        history_path: Путь к файлу истории
+        offset: Проверяемое смещение
+
+    Returns:
+        bool: True если перед смещением стоит перевод строки
+    """
+    if offset == 0:
+        return True
+
+    with open(history_path, 'rb') as f:
+        f.seek(offset - 1)
+        return f.read(1) == b'\n'
+
+
+def _read_new_postings(
+    index_file: Path,
+    loaded: tuple[int, dict[str, list[int]], int],
+) -> tuple[int, dict[str, list[int]], int]:
+    """Дочитывает в память строки индекса, дописанные после загрузки.
+
+    Args:
+        index_file: Путь к файлу индекса
+        loaded: Прочитанный размер, индекс и последнее смещение
+
+    Returns:
+        tuple[int, dict[str, list[int]], int]: Обновленные значения
+    """
+    loaded_size, postings, last_offset = loaded
+
+    if index_file.stat().st_size < loaded_size:
+        loaded_size, postings, last_offset = 0, {}, -1
+
+    with open(index_file, 'rb') as f:
+        f.seek(loaded_size)
+        for raw_line in f:
+            if not raw_line.endswith(b'\n'):
+                break
+            loaded_size += len(raw_line)
+            token, _, raw_offset = raw_line[:-1].decode().rpartition('\t')
+            offset = int(raw_offset)
+            postings.setdefault(token, []).append(offset)
+            last_offset = max(last_offset, offset)
+
+    return loaded_size, postings, last_offset
+
+
+def load(history_path: Path | str) -> dict[str, list[int]]:
+    """Загружает индекс, догоняя его до текущего состояния истории.
+
+    Индекс кэшируется в памяти процесса, и при повторных вызовах
+    читается только дописанная с прошлого раза часть файла индекса.
+    Записи истории, которые попали в файл в обход индекса, дописываются
+    в индекс; если индекс не соответствует истории, он перестраивается.
+
+    Args:
+        history_path: Путь к файлу истории
+
+    Returns:
+        dict[str, list[int]]: Отображение токен -> смещения записей
+    """
+    index_file = index_path(history_path)
+    history_size = os.stat(history_path).st_size
+
+    if not index_file.exists():
+        rebuild(history_path)
+
+    key = str(index_file)
+    loaded = _read_new_postings(
+        index_file, _loaded_indexes.get(key, (0, {}, -1))
+    )
+    last_offset = loaded[2]
+
+    if last_offset >= history_size or not _is_record_start(
+        history_path, max(last_offset, 0)
+    ):
+        rebuild(history_path)
+        loaded = _read_new_postings(index_file, (0, {}, -1))
+
+    elif _index_history_from(
+        history_path, max(last_offset, 0), skip_first=last_offset >= 0
+    ):
+        loaded = _read_new_postings(index_file, loaded)
+
+    _loaded_indexes[key] = loaded
+    return loaded[1]
+
+
+def required_literals(pattern: str) -> list[str] | None:
+    """Находит фрагменты, которые обязаны входить в любое совпадение.
+
+    Разбор консервативный: если шаблон содержит альтернативу или
+    необязательную группу, сузить поиск нельзя и возвращается None.
+
+    Args:
+        pattern: Регулярное выражение
+
+    Returns:
+        list[str] | None: Фрагменты в нижнем регистре или None
+    """
+    if '|' in pattern or '(?' in pattern:
+        return None
+
+    pattern = re.sub(r'\\.', ' ', pattern)
+    pattern = re.sub(r'\[\^?\]?[^\]]*\]', ' ', pattern)
+    pattern = re.sub(r'\{[\d,]*\}', '*', pattern)
+    if re.search(r'\)[?*]', pattern):
+        return None
+
+    literals = []
+    run: list[str] = []
+
+    for position, char in enumerate(pattern):
+        if char in REGEX_SPECIAL_CHARS or char.isspace():
+            if run:
+                literals.append(''.join(run))
+            run = []
+            continue
+
+        next_char = pattern[position + 1 : position + 2]
+        if next_char and next_char in OPTIONAL_QUANTIFIERS:
+            if run:
+                literals.append(''.join(run))
+            run = []
+            continue
+
+        run.append(char)
+
+    if run:
+        literals.append(''.join(run))
+
+    return [literal.lower() for literal in literals] or None
+
+
+def candidates(
+    postings: dict[str, list[int]], literals: list[str]
+) -> list[int]:
+    """Отбирает записи, содержащие все обязательные фрагменты.
+
+    Args:
+        postings: Индекс токен -> смещения записей
+        literals: Обязательные фрагменты в нижнем регистре
+
+    Returns:
+        list[int]: Отсортированные смещения записей-кандидатов
+    """
+    result: set[int] | None = None
+
+    for literal in literals:
+        offsets: set[int] = set()
+        for token, token_offsets in postings.items():
+            if literal in token:
+                offsets.update(token_offsets)
+
+        result = offsets if result is None else result & offsets
+        if not result:
+            return []
+
+    return sorted(result or ())
+
+
+def search(
+    history_path: Path | str, pattern: str, ignore_case: bool = False
+) -> list[str]:
+    """Ищет записи истории по регулярному выражению через индекс.
+
+    Args:
+        history_path: Путь к файлу истории
+        pattern: Регулярное выражение
+        ignore_case: Игнорировать регистр
+
+    Returns:
+        list[str]: Найденные строки истории вида ``N. команда``
+
+    Raises:
+        re.error: Если шаблон не является регулярным выражением
+    """
+    regex = re.compile(pattern, re.IGNORECASE if ignore_case else 0)
+    literals = required_literals(pattern)
+
+    postings = None if literals is None else load(history_path)
+
+    found = []
+    with open(history_path, 'rb') as f:
+        records: typing.Iterable[bytes] = f
+        if postings is not None and literals is not None:
+            records = _read_records(f, candidates(postings, literals))
+
+        for raw_line in records:
+            if regex.search(split_record(raw_line)):
+                found.append(raw_line.decode(errors='replace'))
+
+    return found
+
+
+def _read_records(f: typing.BinaryIO, offsets: list[int]) -> Iterator[bytes]:
+    """Читает записи истории по смещениям.
+
+    Args:
+        f: Открытый файл истории
+        offsets: Смещения записей
+
+    Yields:
+        bytes: Строки истории
+    """
+    for offset in offsets:
+        f.seek(offset)
+        yield f.readline()
@@ -0,0 +1,309 @@
+import concurrent.futures
+import dataclasses
+import os
+import threading
+import typing
+
+import cancellation
+import output
+import workdir
+from constants import CANCEL_POLL_INTERVAL, JOB_WORKERS
+from logger.logger_setup import terminal_logger
+
+
+class Runnable(typing.Protocol):
+    """Разобранная команда или конвейер."""
+
+    line: str
+
+    def run(self) -> int: ...
+
+
+class JobSink:
+    """Копит вывод фоновой задачи, пока она не выведена на передний план.
+
+    После attach накопленный вывод передается в приемник переднего
+    плана, и дальше задача пишет прямо в него.
+    """
+
+    def __init__(self) -> None:
+        self._parts: list[str] = []
+        self._target: output.Sink | None = None
+        self._lock = threading.Lock()
+
+    def write(self, text: str) -> int:
+        with self._lock:
+            target = self._target
+            if target is None:
+                self._parts.append(text)
+                return len(text)
+        return target.write(text)
+
+    def flush(self) -> None:
+        target = self._target
+        if target is not None:
+            target.flush()
+
+    def ask(self, prompt: str) -> str:
+        """Задает вопрос, только если задача на переднем плане.
+
+        В фоне ответить некому, поэтому вопрос попадает в вывод задачи,
+        а ответ считается пустым.
+
+        Args:
+            prompt: Текст вопроса
+
+        Returns:
+            str: Ответ пользователя или пустая строка в фоне
+        """
+        target = self._target
+        if target is None:
+            self.write(prompt + '\n')
+            return ''
+
+        target.flush()
+        target_ask = getattr(target, 'ask', None)
+        if target_ask is not None:
+            return target_ask(prompt)
+        return input(prompt)
+
+    def attach(self, target: output.Sink) -> None:
+        """Выводит накопленный вывод в target и пишет в него дальше.
+
+        Args:
+            target: Приемник вывода переднего плана
+        """
+        with self._lock:
+            if self._parts:
+                target.write(''.join(self._parts))
+                self._parts = []
+            self._target = target
+
+    def has_output(self) -> bool:
+        """Проверяет, есть ли невыведенный вывод.
+
+        Returns:
+            bool: True, если задача что-то вывела в фоне
+        """
+        with self._lock:
+            return bool(self._parts)
+
+
+@dataclasses.dataclass
+class Job:
+    """Фоновая задача оболочки.
+
+    cwd - рабочая директория, из которой задача запущена. Команды
+    задачи разрешают относительные пути от нее (см. workdir), поэтому
+    cd на переднем плане не меняет файлы, с которыми работает задача.
+    """
+
+    number: int
+    line: str
+    future: concurrent.futures.Future[int]
+    sink: JobSink
+    token: cancellation.CancelToken
+    cwd: str = ''
+    reported: bool = False
+
+    @property
+    def exit_code(self) -> int | None:
+        """Код возврата или None, если задача еще выполняется."""
+        if not self.future.done():
+            return None
+        return self.future.result()
+
+    @property
+    def state(self) -> str:
+        """Состояние задачи в формате jobs из bash."""
+        if not self.future.done():
+            return 'Running'
+        if self.exit_code == 0:
+            return 'Done'
+        return f'Exit {self.exit_code}'
+
+
+_jobs: dict[int, Job] = {}
+_lock = threading.Lock()
+_executor: concurrent.futures.ThreadPoolExecutor | None = None
+_listeners: list[typing.Callable[[], None]] = []
+
+
+def _run_job(
+    command: Runnable,
+    sink: JobSink,
+    token: cancellation.CancelToken,
+    cwd: str,
+) -> int:
+    """Выполняет команду фоновой задачи в рабочем потоке.
+
+    Args:
+        command: Команда задачи
+        sink: Приемник вывода задачи
+        token: Токен отмены задачи
+        cwd: Рабочая директория задачи
+
+    Returns:
+        int: Код возврата команды
+    """
+    with (
+        output.use_sink(sink),
+        cancellation.scope(token),
+        workdir.scope(cwd),
+    ):
+        try:
+            return command.run()
+
+        except cancellation.Cancelled as e:
+            terminal_logger.error(f'{command.line}: {e.reason}')
+            return e.exit_code
+
+        except Exception as e:
+            output.echo(f'Error: {e}')
+            output.flush()
+            terminal_logger.error(f'{e}')
+            return 1
+
+
+def _notify(future: concurrent.futures.Future[int]) -> None:
+    for listener in list(_listeners):
+        listener()
+
+
+def subscribe(listener: typing.Callable[[], None]) -> None:
+    """Подписывает функцию на завершение фоновых задач.
+
+    Функция вызывается в рабочем потоке задачи.
+
+    Args:
+        listener: Функция без аргументов
+    """
+    _listeners.append(listener)
+
+
+def unsubscribe(listener: typing.Callable[[], None]) -> None:
+    """Отписывает функцию от завершения фоновых задач.
+
+    Args:
+        listener: Функция, переданная в subscribe
+    """
+    _listeners.remove(listener)
+
+
+def start(command: Runnable) -> Job:
+    """Запускает команду фоновой задачей в пуле рабочих потоков.
+
+    Args:
+        command: Разобранная команда или конвейер
+
+    Returns:
+        Job: Запущенная задача
+    """
+    global _executor
+
+    sink = JobSink()
+    token = cancellation.CancelToken()
+    cwd = os.getcwd()
+
+    with _lock:
+        if _executor is None:
+            _executor = concurrent.futures.ThreadPoolExecutor(
+                JOB_WORKERS, thread_name_prefix='job'
+            )
+
+        number = max(_jobs, default=0) + 1
+        job = Job(
+            number,
+            command.line,
+            _executor.submit(_run_job, command, sink, token, cwd),
+            sink,
+            token,
+            cwd,
+        )
+        _jobs[number] = job
+
+    job.future.add_done_callback(_notify)
+    terminal_logger.info(f'job [{number}]: {command.line}')
+    return job
+
+
+def get(number: int | None = None) -> Job | None:
+    """Находит задачу по номеру.
+
+    Args:
+        number: Номер задачи (None - последняя запущенная)
+
+    Returns:
+        Job | None: Задача или None, если ее нет
+    """
+    with _lock:
+        if number is None:
+            number = max(_jobs, default=0)
+        return _jobs.get(number)
+
+
+def all_jobs() -> list[Job]:
+    """Возвращает задачи в порядке номеров.
+
+    Returns:
+        list[Job]: Все задачи, еще не выведенные через fg
+    """
+    with _lock:
+        return [_jobs[number] for number in sorted(_jobs)]
+
+
+def remove(job: Job) -> None:
+    """Удаляет задачу из таблицы.
+
+    Args:
+        job: Задача
+    """
+    with _lock:
+        _jobs.pop(job.number, None)
+
+
+def collect_finished() -> list[Job]:
+    """Возвращает завершившиеся задачи, о которых еще не сообщалось.
+
+    Задачи без вывода удаляются из таблицы, а задачи с выводом остаются,
+    чтобы вывод можно было получить через fg.
+
+    Returns:
+        list[Job]: Завершившиеся задачи
+    """
+    finished = []
+
+    with _lock:
+        for number in sorted(_jobs):
+            job = _jobs[number]
+            if job.reported or not job.future.done():
+                continue
+
+            job.reported = True
+            finished.append(job)
+            if not job.sink.has_output():
+                del _jobs[number]
+
+    return finished
+
+
+def wait_for(jobs: typing.Iterable[Job]) -> None:
+    """Ждет завершения задач, оставаясь отменяемым через Ctrl-C.
+
+    Args:
+        jobs: Задачи
+
+    Raises:
+        cancellation.Cancelled: Если отменена ждущая команда
+    """
+    pending = {job.future for job in jobs}
+    while pending:
+        cancellation.checkpoint()
+        _, pending = concurrent.futures.wait(
+            pending, timeout=CANCEL_POLL_INTERVAL
+        )
+
+
+def wait_all() -> None:
+    """Ждет завершения всех фоновых задач."""
+    wait_for(all_jobs())
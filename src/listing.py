@@ -0,0 +1,213 @@
+import array
+import heapq
+import sys
+import typing
+from collections.abc import Callable, Iterable, Iterator
+
+from constants import LISTING_SORT_RUN
+
+_ENCODING = sys.getfilesystemencoding()
+_ERRORS = sys.getfilesystemencodeerrors()
+
+# Запись директории: имя, признак директории, st_mode, st_size и
+# st_mtime. Обычный кортеж, а не NamedTuple: записи создаются на каждый
+# файл, и создание NamedTuple заметно дороже.
+Row = tuple[str, bool, int, int, float]
+
+
+class CompactListing:
+    """Листинг директории в массивах вместо объекта на каждую запись.
+
+    Имена хранятся подряд в одном буфере в кодировке файловой системы,
+    а границы имен, права, размеры и времена изменения - в массивах
+    array. Запись занимает около 30 байт плюс длину имени, тогда как
+    DirEntry с путем и stat_result - несколько сотен. Поля stat
+    хранятся, только если листинг создан с with_stat.
+
+    Сортировка тоже не держит ключ на каждую запись: номера записей
+    сортируются участками по LISTING_SORT_RUN, и ключи живут только
+    для одного участка, а затем участки сливаются через heapq.merge.
+    После сортировки остается только массив номеров в порядке вывода.
+    """
+
+    def __init__(self, with_stat: bool = False) -> None:
+        self.with_stat = with_stat
+        self._names = bytearray()
+        self._offsets = array.array('Q', [0])
+        self.directories = array.array('B')
+        self.modes = array.array('I')
+        self.sizes = array.array('q')
+        self.mtimes = array.array('d')
+        self._order: array.array[int] | None = None
+
+    @classmethod
+    def from_rows(
+        cls, rows: Iterable[Row], with_stat: bool = False
+    ) -> 'CompactListing':
+        """Создает листинг из записей.
+
+        Args:
+            rows: Записи директории
+            with_stat: Хранить права, размеры и времена изменения
+
+        Returns:
+            CompactListing: Листинг в порядке записей
+        """
+        listing = cls(with_stat)
+        listing.extend(rows)
+        return listing
+
+    def __len__(self) -> int:
+        return len(self.directories)
+
+    def extend(self, rows: Iterable[Row]) -> None:
+        """Добавляет записи в конец листинга.
+
+        Args:
+            rows: Записи директории
+        """
+        names = self._names
+        add_offset = self._offsets.append
+        add_directory = self.directories.append
+        add_mode = self.modes.append
+        add_size = self.sizes.append
+        add_mtime = self.mtimes.append
+        with_stat = self.with_stat
+
+        for name, is_dir, mode, size, mtime in rows:
+            names += name.encode(_ENCODING, _ERRORS)
+            add_offset(len(names))
+            add_directory(is_dir)
+            if with_stat:
+                add_mode(mode)
+                add_size(size)
+                add_mtime(mtime)
+
+        self._order = None
+
+    def name(self, index: int) -> str:
+        """Возвращает имя записи.
+
+        Args:
+            index: Номер записи
+
+        Returns:
+            str: Имя
+        """
+        return self._names[
+            self._offsets[index] : self._offsets[index + 1]
+        ].decode(_ENCODING, _ERRORS)
+
+    def _indices(self) -> Iterable[int]:
+        return range(len(self)) if self._order is None else self._order
+
+    def __iter__(self) -> Iterator[Row]:
+        names = self._names
+        offsets = self._offsets
+        directories = self.directories
+        modes = self.modes
+        sizes = self.sizes
+        mtimes = self.mtimes
+        with_stat = self.with_stat
+
+        for index in self._indices():
+            name = names[offsets[index] : offsets[index + 1]].decode(
+                _ENCODING, _ERRORS
+            )
+            if with_stat:
+                yield (
+                    name,
+                    bool(directories[index]),
+                    modes[index],
+                    sizes[index],
+                    mtimes[index],
+                )
+            else:
+                yield name, bool(directories[index]), 0, 0, 0.0
+
+    def _sort_key(self, by: str) -> Callable[[int], typing.Any]:
+        """Возвращает ключ сортировки номера записи.
+
+        Ключ читает поля записи из массивов. Имя сравнивается в
+        кодировке файловой системы, а при равных ключах записи
+        остаются в исходном порядке.
+
+        Args:
+            by: 'name', 'size' или 'mtime'
+
+        Returns:
+            Callable[[int], typing.Any]: Ключ для sorted и heapq.merge
+        """
+        names = self._names
+        offsets = self._offsets
+
+        if by == 'size':
+            sizes = self.sizes
+            return lambda index: (
+                -sizes[index],
+                names[offsets[index] : offsets[index + 1]],
+            )
+        if by == 'mtime':
+            mtimes = self.mtimes
+            return lambda index: (
+                -mtimes[index],
+                names[offsets[index] : offsets[index + 1]],
+            )
+        return lambda index: names[offsets[index] : offsets[index + 1]]
+
+    def sort(self, by: str = 'name') -> None:
+        """Упорядочивает записи для вывода.
+
+        Сортировка по размеру и времени требует with_stat. При равных
+        значениях записи идут по имени.
+
+        Args:
+            by: 'name', 'size' (сначала большие) или 'mtime' (сначала
+                новые)
+        """
+        key = self._sort_key(by)
+        runs = [
+            array.array(
+                'I',
+                sorted(
+                    range(start, min(start + LISTING_SORT_RUN, len(self))),
+                    key=key,
+                ),
+            )
+            for start in range(0, len(self), LISTING_SORT_RUN)
+        ]
+
+        if len(runs) == 1:
+            self._order = runs[0]
+        else:
+            self._order = array.array('I', heapq.merge(*runs, key=key))
+
+    def directory_names(self) -> Iterator[str]:
+        """Возвращает имена поддиректорий в порядке вывода.
+
+        Yields:
+            str: Имена записей с признаком директории
+        """
+        directories = self.directories
+        for index in self._indices():
+            if directories[index]:
+                yield self.name(index)
+
+    def nbytes(self) -> int:
+        """Считает память, занятую буферами листинга.
+
+        Returns:
+            int: Размер в байтах
+        """
+        arrays: list[array.array[typing.Any]] = [
+            self._offsets,
+            self.directories,
+            self.modes,
+            self.sizes,
+            self.mtimes,
+        ]
+        if self._order is not None:
+            arrays.append(self._order)
+        return len(self._names) + sum(
+            len(values) * values.itemsize for values in arrays
+        )
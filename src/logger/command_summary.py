@@ -0,0 +1,127 @@
+import os
+import shutil
+import time
+import typing
+from pathlib import Path
+
+import cancellation
+import metrics
+import output
+from logger.logger_setup import terminal_logger
+
+LOG_VERBOSITY = int(os.environ.get('TERMINAL_LOG_VERBOSITY', '0'))
+LOG_SAMPLE_RATE = float(os.environ.get('TERMINAL_LOG_SAMPLE_RATE', '0'))
+
+
+class CommandSummary:
+    """Счетчики одной команды, которые пишутся в лог одной записью.
+
+    Отдельные элементы (совпадения grep, файлы cp и rm) попадают в лог
+    только при TERMINAL_LOG_VERBOSITY >= 1 или выборочно с долей
+    TERMINAL_LOG_SAMPLE_RATE; ошибки пишутся всегда.
+
+    Как контекстный менеджер пишет итоговую запись при выходе из блока,
+    поэтому запись есть и у команды, завершившейся ошибкой, исключением
+    или отменой.
+    """
+
+    def __init__(self, command: str) -> None:
+        self.command = command
+        self.items = 0
+        self.files = 0
+        self.bytes = 0
+        self.errors = 0
+        self.started = time.perf_counter()
+        self.sample_every = (
+            round(1 / LOG_SAMPLE_RATE) if LOG_SAMPLE_RATE else 0
+        )
+
+    def __enter__(self) -> 'CommandSummary':
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.emit()
+
+    def item(
+        self, message: str, *args: typing.Any, files: int = 0, size: int = 0
+    ) -> None:
+        """Учитывает обработанный элемент.
+
+        Сообщение форматируется так же лениво, как в logging, поэтому
+        элементы, которые не попадают в лог, почти ничего не стоят.
+
+        Args:
+            message: Шаблон записи об элементе для подробного лога
+            *args: Аргументы шаблона
+            files: Количество затронутых файлов
+            size: Количество обработанных байт
+        """
+        self.items += 1
+        self.files += files
+        self.bytes += size
+
+        if LOG_VERBOSITY >= 1 or (
+            self.sample_every and self.items % self.sample_every == 0
+        ):
+            terminal_logger.info(message, *args)
+
+    def copy2(self, source: str | Path, destination: str | Path) -> str:
+        """Копирует файл через shutil.copy2 и учитывает его в счетчиках.
+
+        Подходит как copy_function для shutil.copytree. Перед каждым
+        файлом проверяется отмена команды, поэтому копирование дерева
+        прерывается между файлами.
+
+        Args:
+            source: Путь к исходному файлу
+            destination: Путь назначения
+
+        Returns:
+            str: Путь к скопированному файлу
+
+        Raises:
+            cancellation.Cancelled: Если команда отменена
+        """
+        cancellation.checkpoint()
+        copied = shutil.copy2(source, destination)
+        self.files += 1
+        self.bytes += os.stat(copied).st_size
+        return str(copied)
+
+    def error(self, message: str) -> None:
+        """Учитывает и сразу пишет в лог ошибку.
+
+        Args:
+            message: Текст ошибки
+        """
+        self.errors += 1
+        terminal_logger.error(message)
+
+    def fields(self) -> dict[str, int | float]:
+        """Возвращает счетчики команды.
+
+        Returns:
+            dict[str, int | float]: Счетчики и время выполнения в секундах
+        """
+        return {
+            'items': self.items,
+            'files': self.files,
+            'bytes': self.bytes,
+            'errors': self.errors,
+            'elapsed': round(time.perf_counter() - self.started, 6),
+        }
+
+    def emit(self) -> None:
+        """Пишет в лог итоговую запись команды и добавляет ее файлы и
+        байты в метрики.
+
+        В режиме --json та же запись выводится последней строкой NDJSON.
+        """
+        fields = self.fields()
+        metrics.add(self.command, self.files, self.bytes)
+        terminal_logger.info(
+            f'{self.command}: summary '
+            + ' '.join(f'{name}={value}' for name, value in fields.items()),
+            extra={'summary': {'command': self.command, **fields}},
+        )
+        output.emit({'type': 'summary', 'command': self.command, **fields})
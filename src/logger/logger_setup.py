@@ -1,13 +1,124 @@
+import atexit
 import logging
+import logging.handlers
+import os
+import queue
+import time
+import typing
+from pathlib import Path
+
+LOG_PATH = Path(__file__).parent / 'shell.log'
+LOG_MAX_BYTES = 10 * 1024 * 1024
+LOG_BACKUP_COUNT = 5
+LOG_FLUSH_INTERVAL = 0.05
+
+
+class BatchRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """Пишет записи в файл с ротацией по размеру, не сбрасывая буфер.
+
+    Буфер сбрасывается слушателем очереди, когда очередь опустела, поэтому
+    пачка записей уходит на диск одной операцией записи. Размер файла
+    считается в памяти: стандартная проверка ротации делает seek и
+    сбрасывает буфер на каждой записи. Считаются байты, а не символы:
+    кириллица в UTF-8 занимает два байта на символ.
+    """
+
+    def __init__(self, *args: typing.Any, **kwargs: typing.Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.written = 0
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            message = self.format(record) + self.terminator
+            size = len(
+                message.encode(self.encoding or 'utf-8', errors='replace')
+            )
+
+            stream = self.stream
+            if stream is None:
+                stream = self.stream = self._open()
+                self.written = stream.seek(0, os.SEEK_END)
+
+            if self.maxBytes and self.written + size > self.maxBytes:
+                self.doRollover()
+                stream = self.stream = self.stream or self._open()
+                self.written = 0
+
+            stream.write(message)
+            self.written += size
+        except Exception:
+            self.handleError(record)
+
+
+class BatchQueueHandler(logging.handlers.QueueHandler):
+    """Кладет записи в очередь, подставляя аргументы в сообщение.
+
+    В отличие от стандартного QueueHandler не копирует запись и не
+    форматирует ее целиком в потоке команды: это делает поток записи.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(
+                record.exc_info
+            )
+            record.exc_info = None
+        return record
+
+
+class BatchQueueListener(logging.handlers.QueueListener):
+    """Слушатель очереди логов, записывающий их пачками.
+
+    Когда очередь пустеет, обработчики сбрасываются на диск, а после
+    пробуждения поток ждет LOG_FLUSH_INTERVAL секунд, чтобы в очереди
+    накопилась пачка и команды не будили его на каждую запись.
+    """
+
+    def dequeue(self, block: bool) -> logging.LogRecord:
+        records = typing.cast(queue.SimpleQueue, self.queue)
+        try:
+            return records.get_nowait()
+        except queue.Empty:
+            for handler in self.handlers:
+                handler.flush()
+            record = records.get(block)
+            if record is not None:
+                time.sleep(LOG_FLUSH_INTERVAL)
+            return record
+
 
 terminal_logger = logging.getLogger('terminal_logger')
 terminal_logger.setLevel(logging.INFO)
 
-terminal_logger_handler = logging.FileHandler('src/logger/shell.log', mode='a')
+terminal_logger_queue: queue.SimpleQueue = queue.SimpleQueue()
+
+terminal_logger_handler = BatchRotatingFileHandler(
+    LOG_PATH,
+    mode='a',
+    maxBytes=LOG_MAX_BYTES,
+    backupCount=LOG_BACKUP_COUNT,
+    delay=True,
+)
 terminal_logger_formater = logging.Formatter(
     '[%(asctime)s] %(levelname)s: %(message)s'
 )
 
 terminal_logger_handler.setFormatter(terminal_logger_formater)
 
-terminal_logger.addHandler(terminal_logger_handler)
+terminal_logger.addHandler(BatchQueueHandler(terminal_logger_queue))
+
+terminal_logger_listener = BatchQueueListener(
+    terminal_logger_queue, terminal_logger_handler
+)
+terminal_logger_listener.start()
+
+
+def stop_logging() -> None:
+    """Дописывает накопленные записи и останавливает поток логирования."""
+    terminal_logger_listener.stop()
+    terminal_logger_handler.close()
+
+
+atexit.register(stop_logging)
@@ -1,34 +1,248 @@
+import argparse
+import io
 import os
 import sys
+import time
+from collections.abc import Iterable
 from pathlib import Path
 
+import accounting
+import cancellation
+import output
 import parser
+from constants import HISTORY_BACKEND, SERVER_SOCKET_PATH
 from logger.logger_setup import terminal_logger
 from ubuntu_commands import helper_functions
 
+if HISTORY_BACKEND == 'sqlite':
+    import history_db
 
-def run() -> None:
-    os.chdir(str(Path.home()))
-    print(Path.cwd(), end=' ', flush=True)
-    for line in sys.stdin:
-        line = line.strip()
 
-        terminal_logger.info(line)
+def execute(line: str) -> int:
+    """Выполняет строку команды и записывает ее в историю.
+
+    Для файловой истории команда записывается до выполнения. Для
+    истории в SQLite запись ставится в очередь до выполнения, а код
+    возврата и длительность дописываются после. С
+    ``TERMINAL_ACCOUNTING=1`` ресурсы команды записываются в лог.
 
+    Args:
+        line: Строка команды
+
+    Returns:
+        int: Код возврата команды
+    """
+    history_token = None
+    if HISTORY_BACKEND == 'sqlite':
+        history_token = history_db.writer().begin(line, str(Path.cwd()))
+    else:
         helper_functions.write_history(line)
 
-        if not line:
-            print(Path.cwd(), end=' ', flush=True)
-            continue
+    started = time.perf_counter()
+    exit_code = 0
+
+    if line:
         try:
-            parser.parser(line)
+            with accounting.logged(line):
+                exit_code = parser.parser(line)
+
+        except cancellation.Cancelled as e:
+            terminal_logger.error(f'{line}: {e.reason}')
+            exit_code = e.exit_code
 
         except Exception as e:
-            print(f'Error: {e}')
+            output.echo(f'Error: {e}')
+            output.flush()
             terminal_logger.error(f'{e}')
+            exit_code = 1
+
+    if history_token is not None:
+        history_db.writer().finish(
+            history_token, exit_code, time.perf_counter() - started
+        )
+
+    return exit_code
+
+
+def run() -> None:
+    """Запускает интерактивный режим оболочки.
+
+    asyncio импортируется только здесь, чтобы не замедлять запуск
+    режимов ``-c`` и сценария.
+    """
+    import asyncio
+
+    import repl
+
+    helper_functions.prepare_home()
+    os.chdir(str(Path.home()))
+    try:
+        asyncio.run(repl.repl(execute))
+    finally:
+        if HISTORY_BACKEND == 'sqlite':
+            history_db.close()
+
+
+def run_command(
+    command: parser.Command | parser.Pipeline | parser.Background,
+) -> int:
+    """Выполняет заранее разобранную команду.
+
+    Args:
+        command: Команда из parser.compile_script
+
+    Returns:
+        int: Код возврата команды
+    """
+    try:
+        with accounting.logged(command.line):
+            return command.run()
+
+    except cancellation.Cancelled as e:
+        terminal_logger.error(f'{command.line}: {e.reason}')
+        return e.exit_code
+
+    except Exception as e:
+        output.echo(f'Error: {e}')
+        output.flush()
+        terminal_logger.error(f'{e}')
+        return 1
+
+
+def run_commands(lines: Iterable[str], stop_on_error: bool = False) -> int:
+    """Выполняет команды без приглашения и без записи в историю.
+
+    Все строки разбираются до выполнения первой команды, поэтому
+    сценарий с ошибкой разбора не выполняется вовсе. Ctrl-C отменяет
+    текущую команду и останавливает сценарий. Перед выходом функция
+    ждет фоновые задачи, запущенные через ``&``.
+
+    Args:
+        lines: Строки с командами
+        stop_on_error: Остановиться на первой команде с ненулевым кодом
+
+    Returns:
+        int: Код возврата последней выполненной команды или 2 при
+            ошибке разбора
+    """
+    try:
+        plan = parser.compile_script(lines)
+    except ValueError as e:
+        print(f'main.py: {e}')
+        terminal_logger.error(f'main.py: {e}')
+        return 2
+
+    exit_code = 0
+    token = cancellation.CancelToken()
+
+    try:
+        with cancellation.sigint_cancels(token), cancellation.scope(token):
+            for command in plan:
+                terminal_logger.info(command.line)
+
+                exit_code = run_command(command)
+                if (exit_code and stop_on_error) or token.cancelled():
+                    return exit_code
+
+        return exit_code
+
+    finally:
+        if any(isinstance(command, parser.Background) for command in plan):
+            import job_control
+
+            job_control.wait_all()
+
+
+def run_script(script: str, stop_on_error: bool = False) -> int:
+    """Выполняет команды из файла сценария.
+
+    Args:
+        script: Путь к файлу сценария
+        stop_on_error: Остановиться на первой команде с ненулевым кодом
+
+    Returns:
+        int: Код возврата последней команды или 127, если файла нет
+    """
+    try:
+        script_file = open(script, encoding='utf-8')
+    except OSError as e:
+        print(f'main.py: {script}: {e.strerror}')
+        terminal_logger.error(f'main.py: {script}: {e.strerror}')
+        return 127
+
+    with script_file:
+        return run_commands(script_file, stop_on_error)
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Разбирает аргументы запуска и выполняет оболочку.
+
+    Без аргументов запускается интерактивный режим. С ``-c`` или файлом
+    сценария команды выполняются в текущей директории без приглашения,
+    а вывод буферизуется блоками и сбрасывается при выходе. С ``--serve``
+    запускается сервер для клиента client.py.
+
+    Args:
+        argv: Аргументы командной строки без имени программы
+
+    Returns:
+        int: Код возврата процесса
+    """
+    arguments_parser = argparse.ArgumentParser(
+        prog='main.py', description='Мини-оболочка с файловыми командами'
+    )
+    arguments_parser.add_argument(
+        '-c',
+        dest='commands',
+        metavar='COMMANDS',
+        help='выполнить команды, разделенные ";"',
+    )
+    arguments_parser.add_argument(
+        '-e',
+        dest='stop_on_error',
+        action='store_true',
+        help='остановиться на первой команде с ошибкой',
+    )
+    arguments_parser.add_argument(
+        '--serve',
+        action='store_true',
+        help='запустить сервер оболочки на Unix-сокете',
+    )
+    arguments_parser.add_argument(
+        '--socket',
+        default=str(SERVER_SOCKET_PATH),
+        help='путь к сокету сервера',
+    )
+    arguments_parser.add_argument(
+        'script', nargs='?', help='файл сценария с командами'
+    )
+    arguments = arguments_parser.parse_args(argv)
+
+    if arguments.serve:
+        import server
+
+        helper_functions.prepare_home()
+        try:
+            return server.serve(Path(arguments.socket), execute)
+        finally:
+            if HISTORY_BACKEND == 'sqlite':
+                history_db.close()
+
+    if arguments.commands is None and arguments.script is None:
+        run()
+        return 0
+
+    if isinstance(sys.stdout, io.TextIOWrapper):
+        sys.stdout.reconfigure(line_buffering=False)
 
-        print(Path.cwd(), end=' ', flush=True)
+    helper_functions.prepare_home()
+    try:
+        if arguments.commands is not None:
+            return run_commands([arguments.commands], arguments.stop_on_error)
+        return run_script(arguments.script, arguments.stop_on_error)
+    finally:
+        sys.stdout.flush()
 
 
 if __name__ == '__main__':
-    run()
+    sys.exit(main())
@@ -0,0 +1,199 @@
+import atexit
+import dataclasses
+import os
+import threading
+import time
+from pathlib import Path
+
+from constants import METRICS_BUCKETS, METRICS_INTERVAL, METRICS_PATH
+from logger.logger_setup import terminal_logger
+
+PREFIX = 'terminal_command'
+
+
+@dataclasses.dataclass
+class CommandMetrics:
+    """Счетчики и гистограмма длительности одной команды."""
+
+    invocations: int = 0
+    errors: int = 0
+    bytes: int = 0
+    files: int = 0
+    duration_sum: float = 0.0
+    buckets: list[int] = dataclasses.field(
+        default_factory=lambda: [0] * len(METRICS_BUCKETS)
+    )
+
+
+_commands: dict[str, CommandMetrics] = {}
+_lock = threading.Lock()
+_write_lock = threading.Lock()
+_changed = threading.Event()
+_writer: threading.Thread | None = None
+
+
+def enabled() -> bool:
+    """Проверяет, включен ли экспорт метрик.
+
+    Returns:
+        bool: True, если задан TERMINAL_METRICS_PATH
+    """
+    return METRICS_PATH is not None
+
+
+def _metrics(command: str) -> CommandMetrics:
+    metrics = _commands.get(command)
+    if metrics is None:
+        metrics = _commands[command] = CommandMetrics()
+    return metrics
+
+
+def observe(command: str, duration: float, failed: bool) -> None:
+    """Учитывает выполнение команды.
+
+    Args:
+        command: Имя команды
+        duration: Длительность в секундах
+        failed: Команда завершилась с ненулевым кодом или исключением
+    """
+    if METRICS_PATH is None:
+        return
+
+    with _lock:
+        metrics = _metrics(command)
+        metrics.invocations += 1
+        metrics.errors += failed
+        metrics.duration_sum += duration
+        for index, bound in enumerate(METRICS_BUCKETS):
+            if duration <= bound:
+                metrics.buckets[index] += 1
+                break
+
+    _start_writer()
+
+
+def add(command: str, files: int = 0, size: int = 0) -> None:
+    """Учитывает затронутые командой файлы и перемещенные байты.
+
+    Args:
+        command: Имя команды
+        files: Количество файлов
+        size: Количество байт
+    """
+    if METRICS_PATH is None:
+        return
+
+    with _lock:
+        metrics = _metrics(command)
+        metrics.files += files
+        metrics.bytes += size
+
+
+def render() -> str:
+    """Форматирует метрики в текстовом формате Prometheus.
+
+    Гистограмма хранит число попаданий в каждую корзину отдельно, а
+    при выводе счетчики складываются, потому что корзины Prometheus
+    накопительные.
+
+    Returns:
+        str: Текст для textfile collector node exporter
+    """
+    with _lock:
+        commands = sorted(
+            (command, dataclasses.replace(metrics, buckets=metrics.buckets[:]))
+            for command, metrics in _commands.items()
+        )
+
+    lines = []
+    for name, kind, description, field in (
+        ('invocations_total', 'counter', 'Command runs.', 'invocations'),
+        ('errors_total', 'counter', 'Failed command runs.', 'errors'),
+        ('bytes_total', 'counter', 'Bytes read or copied.', 'bytes'),
+        ('files_total', 'counter', 'Files touched.', 'files'),
+    ):
+        lines.append(f'# HELP {PREFIX}_{name} {description}')
+        lines.append(f'# TYPE {PREFIX}_{name} {kind}')
+        for command, metrics in commands:
+            value = getattr(metrics, field)
+            lines.append(f'{PREFIX}_{name}{{command="{command}"}} {value}')
+
+    name = f'{PREFIX}_duration_seconds'
+    lines.append(f'# HELP {name} Command duration.')
+    lines.append(f'# TYPE {name} histogram')
+    for command, metrics in commands:
+        cumulative = 0
+        for bound, count in zip(METRICS_BUCKETS, metrics.buckets, strict=True):
+            cumulative += count
+            le = '+Inf' if bound == float('inf') else f'{bound:g}'
+            lines.append(
+                f'{name}_bucket{{command="{command}",le="{le}"}} {cumulative}'
+            )
+        lines.append(
+            f'{name}_sum{{command="{command}"}} {metrics.duration_sum:.6f}'
+        )
+        lines.append(
+            f'{name}_count{{command="{command}"}} {metrics.invocations}'
+        )
+
+    return '\n'.join(lines) + '\n'
+
+
+def write(path: Path | None = None) -> None:
+    """Атомарно записывает метрики в файл.
+
+    Текст пишется во временный файл рядом с целевым и переименовывается
+    через os.replace, поэтому node exporter никогда не читает
+    недописанный файл. Временный файл не оканчивается на ``.prom`` и
+    не попадает в сбор.
+
+    Args:
+        path: Путь к файлу, по умолчанию METRICS_PATH
+    """
+    path = path or METRICS_PATH
+    if path is None:
+        return
+
+    temp_path = path.with_name(f'.{path.name}.{os.getpid()}.tmp')
+    with _write_lock:
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as metrics_file:
+                metrics_file.write(render())
+            os.chmod(temp_path, 0o644)
+            os.replace(temp_path, path)
+
+        except OSError as e:
+            terminal_logger.error(f'metrics: cannot write {path}: {e}')
+            temp_path.unlink(missing_ok=True)
+
+
+def _write_periodically() -> None:
+    """Записывает метрики раз в METRICS_INTERVAL секунд, если они
+    изменились."""
+    while True:
+        _changed.wait()
+        _changed.clear()
+        write()
+        time.sleep(METRICS_INTERVAL)
+
+
+def _start_writer() -> None:
+    """Отмечает изменение и запускает поток записи при первом вызове.
+
+    При выходе из оболочки метрики записываются еще раз, чтобы файл
+    содержал последние команды.
+    """
+    global _writer
+
+    _changed.set()
+    if _writer is not None:
+        return
+
+    with _lock:
+        if _writer is not None:
+            return
+        _writer = threading.Thread(
+            target=_write_periodically, name='metrics-writer', daemon=True
+        )
+        _writer.start()
+        atexit.register(write)
@@ -0,0 +1,253 @@
+import contextlib
+import functools
+import io
+import json
+import sys
+import threading
+import typing
+from collections.abc import Iterator
+
+from constants import OUTPUT_BUFFER_SIZE
+
+F = typing.TypeVar('F', bound=typing.Callable[..., typing.Any])
+
+
+class Sink(typing.Protocol):
+    """Приемник вывода команд."""
+
+    def write(self, text: str) -> int: ...
+
+    def flush(self) -> None: ...
+
+
+class StreamSink:
+    """Копит вывод и пишет его в sys.stdout.buffer блоками.
+
+    Строки собираются в памяти и кодируются одним куском, когда набралось
+    OUTPUT_BUFFER_SIZE символов или вызван flush, поэтому миллион строк
+    вывода стоит десятки системных вызовов, а не миллион.
+    """
+
+    def __init__(self, buffer_size: int = OUTPUT_BUFFER_SIZE) -> None:
+        self.buffer_size = buffer_size
+        self._parts: list[str] = []
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def write(self, text: str) -> int:
+        with self._lock:
+            self._parts.append(text)
+            self._size += len(text)
+            if self._size >= self.buffer_size:
+                self._write_out()
+        return len(text)
+
+    def flush(self) -> None:
+        with self._lock:
+            self._write_out()
+
+    def _write_out(self) -> None:
+        if not self._parts:
+            return
+
+        text = ''.join(self._parts)
+        self._parts = []
+        self._size = 0
+
+        stream = sys.stdout
+        binary = getattr(stream, 'buffer', None)
+        if binary is None:
+            stream.write(text)
+            stream.flush()
+            return
+
+        stream.flush()
+        binary.write(
+            text.encode(
+                getattr(stream, 'encoding', None) or 'utf-8',
+                getattr(stream, 'errors', None) or 'strict',
+            )
+        )
+        binary.flush()
+
+
+class CaptureSink(io.StringIO):
+    """Приемник, сохраняющий вывод в памяти, например для тестов."""
+
+
+class _SinkLocal(threading.local):
+    sink: Sink | None = None
+    json: bool = False
+
+
+_stdout_sink = StreamSink()
+_local = _SinkLocal()
+
+
+def current_sink() -> Sink:
+    """Возвращает приемник вывода текущего потока.
+
+    Returns:
+        Sink: Приемник, заданный через use_sink, или общий буфер stdout
+    """
+    sink = _local.sink
+    return _stdout_sink if sink is None else sink
+
+
+@contextlib.contextmanager
+def use_sink(sink: Sink) -> Iterator[Sink]:
+    """Направляет вывод текущего потока в sink.
+
+    Args:
+        sink: Приемник вывода
+
+    Yields:
+        Sink: Тот же приемник
+    """
+    previous = _local.sink
+    _local.sink = sink
+    try:
+        yield sink
+    finally:
+        _local.sink = previous
+
+
+@contextlib.contextmanager
+def capture() -> Iterator[CaptureSink]:
+    """Собирает вывод текущего потока в памяти.
+
+    Yields:
+        CaptureSink: Приемник, из которого вывод читается через getvalue
+    """
+    with use_sink(CaptureSink()) as sink:
+        yield typing.cast(CaptureSink, sink)
+
+
+@contextlib.contextmanager
+def json_records(enabled: bool = True) -> Iterator[None]:
+    """Переключает вывод текущего потока в формат NDJSON.
+
+    Args:
+        enabled: Выводить записи как JSON
+    """
+    previous = _local.json
+    _local.json = enabled
+    try:
+        yield
+    finally:
+        _local.json = previous
+
+
+def json_enabled() -> bool:
+    """Проверяет, выводятся ли записи текущего потока как JSON.
+
+    Returns:
+        bool: True в режиме --json
+    """
+    return _local.json
+
+
+def echo(*parts: object, sep: str = ' ', end: str = '\n') -> None:
+    """Выводит значения так же, как print, но через буфер вывода.
+
+    В режиме JSON текст выводится записью ``{"type": "message"}``.
+
+    Args:
+        *parts: Выводимые значения
+        sep: Разделитель значений
+        end: Окончание строки
+    """
+    if len(parts) == 1 and type(parts[0]) is str:
+        text = parts[0] + end
+    else:
+        text = sep.join(map(str, parts)) + end
+
+    sink = _local.sink
+    if _local.json:
+        text = _dump({'type': 'message', 'text': text.rstrip('\n')})
+    (_stdout_sink if sink is None else sink).write(text)
+
+
+def emit(
+    record: dict[str, typing.Any],
+    text: str | typing.Callable[[dict[str, typing.Any]], str] | None = None,
+    end: str = '\n',
+) -> None:
+    """Выводит структурированную запись команды.
+
+    В режиме JSON запись выводится одной строкой NDJSON, иначе выводится
+    ее текстовое представление. Если текст задан функцией, она
+    вызывается только в текстовом режиме.
+
+    Args:
+        record: Запись с полем ``type``
+        text: Текст записи или функция, форматирующая запись (None -
+            запись видна только в режиме JSON)
+        end: Окончание строки текста
+    """
+    sink = _local.sink
+    if _local.json:
+        line = _dump(record)
+    elif text is None:
+        return
+    else:
+        line = (text if isinstance(text, str) else text(record)) + end
+    (_stdout_sink if sink is None else sink).write(line)
+
+
+def _dump(record: dict[str, typing.Any]) -> str:
+    """Сериализует запись в строку NDJSON.
+
+    Args:
+        record: Запись
+
+    Returns:
+        str: JSON без переводов строк с завершающим переводом строки
+    """
+    return json.dumps(record, ensure_ascii=False, default=str) + '\n'
+
+
+def flush() -> None:
+    """Сбрасывает буфер вывода текущего потока."""
+    current_sink().flush()
+
+
+def ask(prompt: str) -> str:
+    """Сбрасывает вывод и запрашивает ответ пользователя.
+
+    Если приемник вывода умеет задавать вопросы сам (например, передает
+    их клиенту сервера), вопрос задается через него.
+
+    Args:
+        prompt: Текст вопроса
+
+    Returns:
+        str: Ответ пользователя
+    """
+    sink = current_sink()
+    sink.flush()
+
+    sink_ask = getattr(sink, 'ask', None)
+    if sink_ask is not None:
+        return sink_ask(prompt)
+    return input(prompt)
+
+
+def flushed(function: F) -> F:
+    """Сбрасывает буфер вывода после выполнения команды.
+
+    Args:
+        function: Функция команды
+
+    Returns:
+        F: Функция, сбрасывающая вывод при любом завершении
+    """
+
+    @functools.wraps(function)
+    def wrapper(*args: typing.Any, **kwargs: typing.Any) -> typing.Any:
+        try:
+            return function(*args, **kwargs)
+        finally:
+            flush()
+
+    return typing.cast(F, wrapper)
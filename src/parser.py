@@ -1,68 +1,402 @@
+import dataclasses
+import functools
+import importlib
 import shlex
+import time
+import typing
 
+import metrics
+import output
+import pipeline
+import stat_cache
+from constants import COMPILE_CACHE_SIZE, VALUE_FLAGS
 from logger.logger_setup import terminal_logger
-from ubuntu_commands import (
-    cat,
-    cd,
-    cp,
-    grep,
-    helper_functions,
-    history,
-    ls,
-    mv,
-    rm,
-    tar,
-    undo,
-    untar,
-    unzip,
-    zip_,
-)
+from ubuntu_commands import helper_functions
 
 commands = {
-    'ls': ls.ls,
-    'cd': cd.cd,
-    'cat': cat.cat,
-    'cp': cp.cp,
-    'mv': mv.mv,
-    'rm': rm.rm,
-    'zip': zip_.zip_,
-    'unzip': unzip.unzip,
-    'tar': tar.tar,
-    'untar': untar.untar,
-    'grep': grep.grep,
-    'history': history.history,
-    'undo': undo.undo,
+    'ls': ('ubuntu_commands.ls', 'ls'),
+    'cd': ('ubuntu_commands.cd', 'cd'),
+    'cat': ('ubuntu_commands.cat', 'cat'),
+    'cp': ('ubuntu_commands.cp', 'cp'),
+    'mv': ('ubuntu_commands.mv', 'mv'),
+    'rm': ('ubuntu_commands.rm', 'rm'),
+    'zip': ('ubuntu_commands.zip_', 'zip_'),
+    'unzip': ('ubuntu_commands.unzip', 'unzip'),
+    'tar': ('ubuntu_commands.tar', 'tar'),
+    'untar': ('ubuntu_commands.untar', 'untar'),
+    'grep': ('ubuntu_commands.grep', 'grep'),
+    'head': ('ubuntu_commands.head', 'head'),
+    'history': ('ubuntu_commands.history', 'history'),
+    'undo': ('ubuntu_commands.undo', 'undo'),
+    'jobs': ('ubuntu_commands.jobs', 'jobs'),
+    'fg': ('ubuntu_commands.jobs', 'fg'),
+    'wait': ('ubuntu_commands.jobs', 'wait'),
+    'timeout': ('ubuntu_commands.timeout', 'timeout'),
+    'time': ('ubuntu_commands.time_', 'time_'),
+    'profile': ('ubuntu_commands.profile_', 'profile_'),
 }
 
+_loaded_commands: dict[str, typing.Callable[..., int]] = {}
 
-def parser(line: str) -> int:
+
+def get_command(command: str) -> typing.Callable[..., int]:
+    """Возвращает функцию команды, импортируя ее модуль при первом вызове.
+
+    Модули команд не импортируются при запуске оболочки, поэтому
+    приглашение появляется без загрузки zipfile, tarfile и остальных
+    зависимостей команд.
+
+    Args:
+        command: Имя команды из commands
+
+    Returns:
+        typing.Callable[..., int]: Функция команды
+    """
+    if command not in _loaded_commands:
+        module_name, function_name = commands[command]
+        _loaded_commands[command] = getattr(
+            importlib.import_module(module_name), function_name
+        )
+    return _loaded_commands[command]
+
+
+def _split_unquoted(line: str, separator: str) -> list[str]:
+    """Разбивает строку по символу-разделителю вне кавычек.
+
+    Args:
+        line: Исходная строка
+        separator: Символ-разделитель
+
+    Returns:
+        list[str]: Части строки без пробелов по краям, включая пустые
+    """
+    if separator not in line:
+        return [line.strip()]
+
+    parts = []
+    current: list[str] = []
+    quote = ''
+    escaped = False
+
+    for char in line:
+        if escaped:
+            escaped = False
+        elif char == '\\' and quote != "'":
+            escaped = True
+        elif quote:
+            if char == quote:
+                quote = ''
+        elif char in '\'"':
+            quote = char
+        elif char == separator:
+            parts.append(''.join(current).strip())
+            current = []
+            continue
+
+        current.append(char)
+
+    parts.append(''.join(current).strip())
+    return parts
+
+
+def split_commands(line: str) -> list[str]:
+    """Разбивает строку на команды по ``;`` вне кавычек.
+
+    Args:
+        line: Строка с одной или несколькими командами
+
+    Returns:
+        list[str]: Непустые команды без пробелов по краям
+    """
+    return [command for command in _split_unquoted(line, ';') if command]
+
+
+def split_background(line: str) -> tuple[str, bool]:
+    """Отделяет ``&`` в конце команды, запускающий ее в фоне.
+
+    Args:
+        line: Строка одной команды или конвейера
+
+    Returns:
+        tuple[str, bool]: Команда без ``&`` и признак фонового запуска
+    """
+    line = line.strip()
+    if not line.endswith('&') or _split_unquoted(line, '&')[-1]:
+        return line, False
+
+    return line[:-1].rstrip(), True
+
+
+class ParseError(ValueError):
+    """Ошибка разбора команды: неизвестная команда или флаг."""
+
+
+@dataclasses.dataclass(frozen=True)
+class Command:
+    """Разобранная команда с найденной функцией.
+
+    Объект неизменяемый, поэтому одинаковые строки могут
+    переиспользовать один и тот же объект из кэша compile_line.
+    """
+
+    name: str
+    handler: typing.Callable[..., int]
+    arguments: tuple[str, ...]
+    flags: frozenset[str]
+    line: str
+    json_output: bool = False
+
+    def run(self) -> int:
+        """Выполняет команду.
+
+        Функции команды получают свои копии аргументов и флагов, так как
+        некоторые команды их изменяют. С флагом ``--json`` записи
+        команды выводятся как NDJSON. Если включен экспорт метрик,
+        учитываются запуск, ошибка и длительность команды. На время
+        команды создается кэш stat, поэтому каждый путь проверяется
+        один раз.
+
+        Returns:
+            int: Код возврата команды
+        """
+        if not metrics.enabled():
+            return self._run()
+
+        started = time.perf_counter()
+        exit_code = 1
+        try:
+            exit_code = self._run()
+            return exit_code
+        except pipeline.PipeClosed:
+            # Следующая команда конвейера перестала читать вход
+            # (cat big | head) - это не ошибка команды.
+            exit_code = 0
+            raise
+        finally:
+            metrics.observe(
+                self.name, time.perf_counter() - started, exit_code != 0
+            )
+
+    def _run(self) -> int:
+        with stat_cache.scope():
+            if self.json_output:
+                with output.json_records():
+                    return self.handler(list(self.arguments), set(self.flags))
+
+            return self.handler(list(self.arguments), set(self.flags))
+
+
+@dataclasses.dataclass(frozen=True)
+class Pipeline:
+    """Команды, соединенные через ``|``."""
+
+    stages: tuple[Command, ...]
+    line: str
+
+    def run(self) -> int:
+        """Выполняет команды конвейера.
+
+        Returns:
+            int: Код возврата последней команды
+        """
+        return pipeline.run_pipeline(self.stages)
+
+
+@dataclasses.dataclass(frozen=True)
+class Background:
+    """Команда или конвейер с ``&``, выполняемые фоновой задачей."""
+
+    command: Command | Pipeline
+    line: str
+
+    def run(self) -> int:
+        """Запускает фоновую задачу и сразу возвращает управление.
+
+        Returns:
+            int: 0
+        """
+        import job_control
+
+        job = job_control.start(self.command)
+        output.echo(f'[{job.number}] {job.line}')
+        output.flush()
+        return 0
+
+
+@functools.lru_cache(maxsize=COMPILE_CACHE_SIZE)
+def compile_line(line: str) -> Command | Pipeline | Background | None:
+    """Разбирает строку с командой или конвейером и проверяет флаги.
+
+    Args:
+        line: Строка команды
+
+    Returns:
+        Command | Pipeline | Background | None: Разобранная команда,
+            конвейер, фоновая задача или None для пустой строки
+
+    Raises:
+        ParseError: Если команда или флаг не существуют, у ``|`` нет
+            команды с одной из сторон или перед ``&`` нет команды
+        ValueError: Если в строке не закрыты кавычки
+    """
+    line, background = split_background(line)
+    if background:
+        command = compile_line(line)
+        if command is None or isinstance(command, Background):
+            raise ParseError("syntax error near unexpected token `&'")
+        return Background(command, line)
+
+    stages = _split_unquoted(line, '|')
+    if len(stages) == 1:
+        return _compile_command(line)
+
+    if not all(stages):
+        raise ParseError("syntax error near unexpected token `|'")
+
+    return Pipeline(
+        tuple(
+            typing.cast(Command, _compile_command(stage)) for stage in stages
+        ),
+        line,
+    )
+
+
+def _compile_command(line: str) -> Command | None:
+    """Разбирает строку с одной командой и проверяет флаги.
+
+    Флаги, включая ``--json``, идут до первого операнда или до ``--``,
+    поэтому ``rm -- --json`` удаляет файл с именем ``--json``. Флаги
+    со значением из VALUE_FLAGS принимает только своя команда, и они
+    попадают в множество строкой ``name=value``; при повторе
+    действует последний.
+
+    Args:
+        line: Строка команды
+
+    Returns:
+        Command | None: Разобранная команда или None для пустой строки
+
+    Raises:
+        ParseError: Если команда или флаг не существуют или у флага
+            нет значения
+        ValueError: Если в строке не закрыты кавычки
+    """
     list_of_line = shlex.split(line)
     if not list_of_line:
-        return 0
+        return None
 
     command = list_of_line[0]
 
-    if command in commands:
-        arguments = list_of_line[1:]
-        flags = set()
+    if command not in commands:
+        raise ParseError(f'{command}: command not found')
 
-        for argument in arguments:
-            result_flagging = helper_functions.is_flags(argument)
+    arguments = list_of_line[1:]
+    flags: set[str] = set()
+    value_flags = VALUE_FLAGS.get(command, set())
+    json_output = False
 
-            if result_flagging == 1:
-                print('a non-existent flags')
-                terminal_logger.error('a non-existent flags')
-                return 1
+    while arguments:
+        argument = arguments[0]
+        if argument == '--':
+            arguments = arguments[1:]
+            break
+
+        if argument == '--json':
+            json_output = True
+            arguments = arguments[1:]
+            continue
 
-            if result_flagging == 0:
-                break
+        name, equals, value = argument[2:].partition('=')
+        if argument.startswith('--') and name in value_flags:
+            if not equals:
+                if len(arguments) == 1:
+                    raise ParseError(
+                        f"option '{argument}' requires an argument"
+                    )
+                value = arguments[1]
+                arguments = arguments[1:]
 
+            flags = {flag for flag in flags if not flag.startswith(name + '=')}
+            flags.add(f'{name}={value}')
             arguments = arguments[1:]
-            flags.update(result_flagging)
+            continue
 
-        return commands[command](arguments, flags)
+        result_flagging = helper_functions.is_flags(argument)
 
-    else:
-        print(f'{command}: command not found')
-        terminal_logger.error(f'{command}: command not found')
+        if result_flagging == 1:
+            raise ParseError('a non-existent flags')
+
+        if result_flagging == 0:
+            break
+
+        arguments = arguments[1:]
+        flags.update(result_flagging)
+
+    return Command(
+        command,
+        get_command(command),
+        tuple(arguments),
+        frozenset(flags),
+        line,
+        json_output,
+    )
+
+
+def compile_script(
+    lines: typing.Iterable[str],
+) -> list[Command | Pipeline | Background]:
+    """Разбирает сценарий целиком до выполнения первой команды.
+
+    Пустые строки и строки, начинающиеся с ``#``, пропускаются, а
+    строка может содержать несколько команд через ``;``.
+
+    Args:
+        lines: Строки сценария
+
+    Returns:
+        list[Command | Pipeline | Background]: Команды в порядке
+            выполнения
+
+    Raises:
+        ParseError: При первой ошибке разбора с номером строки
+    """
+    plan: list[Command | Pipeline | Background] = []
+
+    for line_number, line in enumerate(lines, start=1):
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+
+        for command_line in split_commands(line):
+            try:
+                command = compile_line(command_line)
+            except ValueError as e:
+                raise ParseError(f'line {line_number}: {e}') from e
+
+            if command is not None:
+                plan.append(command)
+
+    return plan
+
+
+def parser(line: str) -> int:
+    """Разбирает и выполняет строку команды.
+
+    Args:
+        line: Строка команды
+
+    Returns:
+        int: Код возврата команды (0 для фоновой задачи)
+    """
+    try:
+        command = compile_line(line)
+    except ParseError as e:
+        output.echo(str(e))
+        output.flush()
+        terminal_logger.error(f'{e}')
         return 1
+
+    if command is None:
+        return 0
+
+    return command.run()
@@ -0,0 +1,182 @@
+import io
+import queue
+import threading
+import typing
+from collections.abc import Iterator
+
+import accounting
+import cancellation
+import output
+import workdir
+from constants import PIPE_BUFFER_LINES
+
+
+class Stage(typing.Protocol):
+    """Команда конвейера."""
+
+    def run(self) -> int: ...
+
+
+class PipeClosed(BaseException):
+    """Следующая команда конвейера перестала читать вход.
+
+    Наследуется от BaseException, чтобы обработчики ``except Exception``
+    в командах не перехватывали ее и команда сразу завершалась.
+    """
+
+
+class PipeWriter(io.TextIOBase):
+    """Выход команды конвейера, передающий строки в ограниченную очередь.
+
+    Если очередь заполнена, команда ждет, пока следующая команда
+    прочитает строки, поэтому в памяти держится не больше
+    PIPE_BUFFER_LINES строк.
+    """
+
+    def __init__(self, pipe: 'Pipe') -> None:
+        self.pipe = pipe
+        self._partial = ''
+
+    def write(self, text: str) -> int:
+        if self.pipe.closed:
+            raise PipeClosed
+
+        lines = (self._partial + text).split('\n')
+        self._partial = lines.pop()
+        for line in lines:
+            self.pipe.put(line + '\n')
+        return len(text)
+
+    def close(self) -> None:
+        if not self.closed:
+            if self._partial and not self.pipe.closed:
+                self.pipe.put(self._partial)
+            self._partial = ''
+            self.pipe.put(None)
+        super().close()
+
+
+class Pipe:
+    """Ограниченная очередь строк между двумя командами конвейера."""
+
+    def __init__(self, maxsize: int = PIPE_BUFFER_LINES) -> None:
+        self._lines: queue.Queue[str | None] = queue.Queue(maxsize)
+        self.closed = False
+
+    def put(self, line: str | None) -> None:
+        """Передает строку читателю; None означает конец входа.
+
+        Args:
+            line: Строка с переводом строки или None
+        """
+        if not self.closed:
+            self._lines.put(line)
+
+    def __iter__(self) -> Iterator[str]:
+        while (line := self._lines.get()) is not None:
+            yield line
+
+    def close(self) -> None:
+        """Прекращает чтение: следующая запись в трубу прервет писателя."""
+        self.closed = True
+        while True:
+            try:
+                self._lines.get_nowait()
+            except queue.Empty:
+                break
+
+
+_local = threading.local()
+
+
+def piped_input() -> Pipe | None:
+    """Возвращает вход команды из конвейера.
+
+    Returns:
+        Pipe | None: Труба с выходом предыдущей команды или None, если
+            команда запущена не в конвейере
+    """
+    return getattr(_local, 'stdin', None)
+
+
+def _run_stage(
+    stage: Stage,
+    stdin: Pipe | None,
+    stdout: PipeWriter | None,
+    token: cancellation.CancelToken | None,
+) -> int:
+    """Выполняет одну команду конвейера в текущем потоке.
+
+    Args:
+        stage: Команда
+        stdin: Вход из предыдущей команды
+        stdout: Выход в следующую команду (None - в вывод оболочки)
+        token: Токен отмены всего конвейера
+
+    Returns:
+        int: Код возврата команды (141, если следующая команда
+            перестала читать вход, 124 или 130 при отмене)
+    """
+    _local.stdin = stdin
+    sink = output.current_sink() if stdout is None else stdout
+
+    try:
+        with output.use_sink(sink), cancellation.scope(token):
+            try:
+                return stage.run()
+
+            except Exception as e:
+                output.echo(f'Error: {e}')
+                output.flush()
+                return 1
+
+    except PipeClosed:
+        return 141
+
+    except cancellation.Cancelled as e:
+        return e.exit_code
+
+    finally:
+        if stdout is not None:
+            stdout.close()
+        if stdin is not None:
+            stdin.close()
+        _local.stdin = None
+
+
+def run_pipeline(stages: typing.Sequence[Stage]) -> int:
+    """Выполняет команды конвейера параллельно, соединяя их трубами.
+
+    Каждая команда, кроме последней, работает в своем потоке и пишет в
+    ограниченную очередь, а последняя выполняется в текущем потоке и
+    пишет в вывод оболочки. Когда команда перестает читать вход,
+    предыдущая прерывается на следующей записи. Все команды проверяют
+    токен отмены текущего потока.
+
+    Args:
+        stages: Команды конвейера по порядку
+
+    Returns:
+        int: Код возврата последней команды
+    """
+    threads = []
+    stdin = None
+    token = cancellation.current()
+    try:
+        for stage in stages[:-1]:
+            pipe = Pipe()
+            thread = threading.Thread(
+                target=workdir.bind(accounting.bind(_run_stage)),
+                args=(stage, stdin, PipeWriter(pipe), token),
+                name='pipeline-stage',
+                daemon=True,
+            )
+            thread.start()
+            threads.append(thread)
+            stdin = pipe
+
+        return _run_stage(stages[-1], stdin, None, token)
+
+    finally:
+        for thread in threads:
+            thread.join()
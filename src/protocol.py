@@ -0,0 +1,48 @@
+import io
+import struct
+
+REQUEST = b'R'
+OUTPUT = b'O'
+QUESTION = b'Q'
+ANSWER = b'A'
+EXIT = b'X'
+
+FRAME_HEADER = struct.Struct('>cI')
+
+
+def write_frame(
+    stream: io.BufferedIOBase, kind: bytes, payload: bytes
+) -> None:
+    """Отправляет кадр протокола оболочки и сбрасывает поток.
+
+    Кадр состоит из байта типа, длины в 4 байтах и данных.
+
+    Args:
+        stream: Поток сокета для записи
+        kind: Тип кадра (REQUEST, OUTPUT, QUESTION, ANSWER или EXIT)
+        payload: Данные кадра
+    """
+    stream.write(FRAME_HEADER.pack(kind, len(payload)) + payload)
+    stream.flush()
+
+
+def read_frame(stream: io.BufferedIOBase) -> tuple[bytes, bytes] | None:
+    """Читает кадр протокола оболочки.
+
+    Args:
+        stream: Поток сокета для чтения
+
+    Returns:
+        tuple[bytes, bytes] | None: Тип и данные кадра или None, если
+            соединение закрыто
+    """
+    header = stream.read(FRAME_HEADER.size)
+    if len(header) < FRAME_HEADER.size:
+        return None
+
+    kind, size = FRAME_HEADER.unpack(header)
+    payload = stream.read(size)
+    if len(payload) < size:
+        return None
+
+    return kind, payload
@@ -0,0 +1,186 @@
+import asyncio
+import signal
+import sys
+import threading
+import typing
+from pathlib import Path
+
+import cancellation
+import job_control
+import output
+from logger.logger_setup import terminal_logger
+
+T = typing.TypeVar('T')
+
+
+def in_thread(
+    loop: asyncio.AbstractEventLoop,
+    name: str,
+    function: typing.Callable[..., T],
+    *args: typing.Any,
+) -> asyncio.Future[T]:
+    """Выполняет функцию в потоке-демоне, не блокируя цикл событий.
+
+    Поток-демон не задерживает выход из оболочки, даже если функция
+    так и не завершилась.
+
+    Args:
+        loop: Цикл событий
+        name: Имя потока
+        function: Функция
+        *args: Аргументы функции
+
+    Returns:
+        asyncio.Future[T]: Результат функции
+    """
+    future: asyncio.Future[T] = loop.create_future()
+
+    def run() -> None:
+        try:
+            result = function(*args)
+        except BaseException as e:
+            loop.call_soon_threadsafe(future.set_exception, e)
+        else:
+            loop.call_soon_threadsafe(future.set_result, result)
+
+    threading.Thread(target=run, name=name, daemon=True).start()
+    return future
+
+
+def read_line(loop: asyncio.AbstractEventLoop) -> asyncio.Future[str]:
+    """Читает строку стандартного ввода, не блокируя цикл событий.
+
+    Строка читается только по запросу, чтобы не забирать из ввода
+    ответы на вопросы команд.
+
+    Args:
+        loop: Цикл событий
+
+    Returns:
+        asyncio.Future[str]: Строка или пустая строка в конце ввода
+    """
+    return in_thread(loop, 'stdin', sys.stdin.readline)
+
+
+def run_foreground(
+    execute: typing.Callable[[str], int],
+    line: str,
+    token: cancellation.CancelToken,
+) -> int:
+    """Выполняет команду переднего плана с токеном отмены.
+
+    Args:
+        execute: Функция, выполняющая строку команды
+        line: Строка команды
+        token: Токен, который отменяет Ctrl-C
+
+    Returns:
+        int: Код возврата команды
+    """
+    with cancellation.scope(token):
+        return execute(line)
+
+
+def report_finished(idle: bool = False) -> bool:
+    """Сообщает о завершившихся фоновых задачах.
+
+    Args:
+        idle: Оболочка ждет ввода, и сообщение нужно начать с новой
+            строки после приглашения
+
+    Returns:
+        bool: True, если что-то было выведено
+    """
+    finished = job_control.collect_finished()
+    if idle and finished:
+        output.echo('')
+
+    for job in finished:
+        hint = '  (fg to see output)' if job.sink.has_output() else ''
+        output.echo(f'[{job.number}]  {job.state:<10} {job.line}{hint}')
+    output.flush()
+
+    return bool(finished)
+
+
+def prompt() -> None:
+    print(Path.cwd(), end=' ', flush=True)
+
+
+async def repl(execute: typing.Callable[[str], int]) -> None:
+    """Интерактивный цикл оболочки на asyncio.
+
+    Пока оболочка ждет ввода, цикл событий следит за фоновыми задачами
+    и сообщает об их завершении сразу, как ``set -b`` в bash. Команда
+    переднего плана выполняется в отдельном потоке, а цикл событий
+    принимает Ctrl-C и отменяет ее токен. Фоновые задачи выполняются в
+    пуле рабочих потоков job_control.
+
+    Args:
+        execute: Функция, выполняющая строку команды
+    """
+    loop = asyncio.get_running_loop()
+    finished = asyncio.Event()
+    foreground: cancellation.CancelToken | None = None
+
+    def on_finish() -> None:
+        loop.call_soon_threadsafe(finished.set)
+
+    def on_interrupt() -> None:
+        if foreground is not None:
+            cancellation.interrupt(foreground)
+            return
+
+        output.echo('')
+        output.flush()
+        prompt()
+
+    job_control.subscribe(on_finish)
+    loop.add_signal_handler(signal.SIGINT, on_interrupt)
+    try:
+        prompt()
+        line_future = read_line(loop)
+
+        while True:
+            finished_waiter = asyncio.ensure_future(finished.wait())
+            await asyncio.wait(
+                (line_future, finished_waiter),
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            finished_waiter.cancel()
+            finished.clear()
+
+            if not line_future.done():
+                if report_finished(idle=True):
+                    prompt()
+                continue
+
+            line = line_future.result()
+            if not line:
+                break
+
+            line = line.strip()
+            terminal_logger.info(line)
+
+            foreground = cancellation.CancelToken()
+            try:
+                await in_thread(
+                    loop,
+                    'foreground',
+                    run_foreground,
+                    execute,
+                    line,
+                    foreground,
+                )
+            finally:
+                foreground = None
+
+            report_finished()
+            prompt()
+            line_future = read_line(loop)
+
+    finally:
+        loop.remove_signal_handler(signal.SIGINT)
+        job_control.unsubscribe(on_finish)
+
+    job_control.wait_all()
@@ -0,0 +1,246 @@
+import io
+import json
+import os
+import signal
+import socket
+import socketserver
+import sys
+import threading
+import typing
+from pathlib import Path
+
+import output
+import parser
+import protocol
+import stat_cache
+from constants import OUTPUT_BUFFER_SIZE, SERVER_ANSWER_TIMEOUT
+from logger.logger_setup import terminal_logger
+
+_execute_lock = threading.Lock()
+
+
+class SocketSink:
+    """Приемник вывода, отправляющий вывод команды клиенту кадрами."""
+
+    def __init__(
+        self,
+        rfile: io.BufferedIOBase,
+        wfile: io.BufferedIOBase,
+        connection: socket.socket | None = None,
+    ) -> None:
+        self.rfile = rfile
+        self.wfile = wfile
+        self.connection = connection
+        self._parts: list[str] = []
+        self._size = 0
+
+    def write(self, text: str) -> int:
+        self._parts.append(text)
+        self._size += len(text)
+        if self._size >= OUTPUT_BUFFER_SIZE:
+            self.flush()
+        return len(text)
+
+    def flush(self) -> None:
+        if not self._parts:
+            return
+
+        data = ''.join(self._parts).encode()
+        self._parts = []
+        self._size = 0
+        protocol.write_frame(self.wfile, protocol.OUTPUT, data)
+
+    def ask(self, prompt: str) -> str:
+        """Задает вопрос пользователю клиента и ждет ответа.
+
+        Пока клиент отвечает, блокировка выполнения снята и команды
+        других клиентов выполняются. После ответа блокировка берется
+        снова и рабочая директория команды восстанавливается. Если
+        ответа нет SERVER_ANSWER_TIMEOUT секунд, ответ считается
+        пустым, а соединение после команды закрывается.
+
+        Args:
+            prompt: Текст вопроса
+
+        Returns:
+            str: Ответ или пустая строка, если клиент отключился или
+                не ответил вовремя
+        """
+        cwd = os.getcwd()
+        _execute_lock.release()
+        try:
+            protocol.write_frame(
+                self.wfile, protocol.QUESTION, prompt.encode()
+            )
+            if self.connection is not None:
+                self.connection.settimeout(SERVER_ANSWER_TIMEOUT)
+            frame = protocol.read_frame(self.rfile)
+
+        except OSError as e:
+            terminal_logger.error(f'server: no answer to {prompt!r}: {e}')
+            return ''
+
+        finally:
+            if self.connection is not None:
+                self.connection.settimeout(None)
+            _execute_lock.acquire()
+            os.chdir(cwd)
+
+        if frame is None or frame[0] != protocol.ANSWER:
+            return ''
+        return frame[1].decode()
+
+
+class ShellRequestHandler(socketserver.StreamRequestHandler):
+    """Выполняет строки команд одного клиента."""
+
+    server: 'ShellServer'
+
+    def handle(self) -> None:
+        while True:
+            try:
+                frame = protocol.read_frame(self.rfile)
+            except OSError:
+                return
+            if frame is None:
+                return
+
+            kind, payload = frame
+            if kind != protocol.REQUEST:
+                return
+
+            request = json.loads(payload)
+            exit_code, cwd = self.run_request(
+                request['line'],
+                request['cwd'],
+                request.get('stop_on_error', False),
+            )
+
+            protocol.write_frame(
+                self.wfile,
+                protocol.EXIT,
+                json.dumps({'exit_code': exit_code, 'cwd': cwd}).encode(),
+            )
+
+    def run_request(
+        self, line: str, cwd: str, stop_on_error: bool
+    ) -> tuple[int, str]:
+        """Выполняет строку клиента в его рабочей директории.
+
+        Команды меняют рабочую директорию и общее состояние процесса,
+        поэтому строки разных клиентов выполняются по очереди. Очередь
+        не держится, пока команда ждет ответа клиента (см.
+        SocketSink.ask).
+
+        Args:
+            line: Строка с командами через ``;``
+            cwd: Рабочая директория клиента
+            stop_on_error: Остановиться на первой команде с ошибкой
+
+        Returns:
+            tuple[int, str]: Код возврата последней команды и рабочая
+                директория после выполнения
+        """
+        sink = SocketSink(self.rfile, self.wfile, self.connection)
+        exit_code = 0
+
+        with _execute_lock, output.use_sink(sink):
+            try:
+                os.chdir(cwd)
+            except OSError as e:
+                output.echo(f'-bash: cd: {cwd}: {e.strerror}')
+                output.flush()
+                return 1, os.getcwd()
+
+            for command in parser.split_commands(line) or ['']:
+                terminal_logger.info(command)
+
+                exit_code = self.server.execute(command)
+                if exit_code and stop_on_error:
+                    break
+
+            output.flush()
+            return exit_code, os.getcwd()
+
+
+class ShellServer(socketserver.ThreadingUnixStreamServer):
+    """Долгоживущая оболочка на Unix-сокете."""
+
+    daemon_threads = True
+
+    def __init__(
+        self, socket_path: Path, execute: typing.Callable[[str], int]
+    ) -> None:
+        self.execute = execute
+
+        previous_umask = os.umask(0o177)
+        try:
+            super().__init__(str(socket_path), ShellRequestHandler)
+        finally:
+            os.umask(previous_umask)
+
+
+def warm_up() -> None:
+    """Загружает модули всех команд, чтобы клиенты не ждали импорта."""
+    for command in parser.commands:
+        parser.get_command(command)
+
+
+def remove_stale_socket(socket_path: Path) -> bool:
+    """Удаляет сокет, оставшийся от завершившегося сервера.
+
+    Args:
+        socket_path: Путь к сокету
+
+    Returns:
+        bool: False если на сокете уже работает другой сервер
+    """
+    if not socket_path.exists():
+        return True
+
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(str(socket_path))
+    except OSError:
+        socket_path.unlink()
+        return True
+    finally:
+        probe.close()
+
+    return False
+
+
+def serve(socket_path: Path, execute: typing.Callable[[str], int]) -> int:
+    """Запускает сервер оболочки и обслуживает клиентов до остановки.
+
+    Импорты, кэш разобранных строк, скомпилированные регулярные
+    выражения, индекс истории и кэш содержимого директорий живут в
+    процессе сервера и остаются прогретыми между клиентами.
+
+    Args:
+        socket_path: Путь к Unix-сокету
+        execute: Функция, выполняющая одну команду
+
+    Returns:
+        int: Код возврата процесса
+    """
+    if not remove_stale_socket(socket_path):
+        print(f'main.py: {socket_path}: server is already running')
+        terminal_logger.error(f'server: {socket_path}: already running')
+        return 1
+
+    warm_up()
+    stat_cache.enable_directory_cache()
+
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+
+    with ShellServer(socket_path, execute) as server:
+        terminal_logger.info(f'server: listening on {socket_path}')
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            socket_path.unlink(missing_ok=True)
+
+    return 0
@@ -0,0 +1,337 @@
+import collections
+import contextlib
+import errno
+import os
+import stat
+import threading
+import time
+from collections.abc import Iterator
+from pathlib import Path
+
+from constants import DIRECTORY_CACHE_NAMES, DIRECTORY_CACHE_RACY_SECONDS
+
+_IGNORED_ERRNOS = (errno.ENOENT, errno.ENOTDIR, errno.EBADF, errno.ELOOP)
+
+# Тип записи директории: обычная директория, ссылка или другой файл.
+DIRECTORY, LINK, FILE = 'd', 'l', 'f'
+
+
+class StatCache:
+    """Результаты stat путей, полученные за время одной команды.
+
+    Команды проверяют один и тот же путь через exists, is_dir и
+    is_file подряд, и каждая проверка Path - отдельный вызов stat. Кэш
+    делает один stat на путь, а отсутствие пути тоже запоминается.
+    Ключ - строка пути как ее передала команда, поэтому ``a/../b`` и
+    ``b`` кэшируются отдельно.
+    """
+
+    def __init__(self) -> None:
+        self._stats: dict[str, os.stat_result | None] = {}
+
+    def stat(self, path: str | Path) -> os.stat_result | None:
+        """Возвращает stat пути с переходом по символическим ссылкам.
+
+        Args:
+            path: Путь
+
+        Returns:
+            os.stat_result | None: Результат stat или None, если пути
+                нет (как Path.exists, который возвращает False)
+
+        Raises:
+            OSError: Если stat не удался по другой причине, например
+                из-за прав доступа
+        """
+        key = os.fspath(path)
+        try:
+            return self._stats[key]
+        except KeyError:
+            pass
+
+        try:
+            result: os.stat_result | None = os.stat(key)
+        except OSError as e:
+            if e.errno not in _IGNORED_ERRNOS:
+                raise
+            result = None
+        except ValueError:
+            result = None
+
+        self._stats[key] = result
+        return result
+
+    def clear(self) -> None:
+        """Забывает все пути, например после изменения файлов."""
+        self._stats.clear()
+
+
+class _CacheLocal(threading.local):
+    cache: StatCache | None = None
+
+
+_local = _CacheLocal()
+
+
+def current() -> StatCache | None:
+    """Возвращает кэш команды текущего потока.
+
+    Returns:
+        StatCache | None: Кэш или None вне команды
+    """
+    return _local.cache
+
+
+@contextlib.contextmanager
+def scope() -> Iterator[StatCache]:
+    """Создает кэш stat на время выполнения команды в текущем потоке.
+
+    Yields:
+        StatCache: Новый пустой кэш
+    """
+    previous = _local.cache
+    _local.cache = StatCache()
+    try:
+        yield _local.cache
+    finally:
+        _local.cache = previous
+
+
+def exists(path: Path) -> bool:
+    """Проверяет, существует ли путь, как Path.exists.
+
+    Вне команды вызывает сам Path.exists, поэтому поведение функций
+    команд, вызванных напрямую, не меняется.
+
+    Args:
+        path: Путь
+
+    Returns:
+        bool: True, если путь существует
+    """
+    cache = _local.cache
+    if cache is None:
+        return path.exists()
+    return cache.stat(path) is not None
+
+
+def is_dir(path: Path) -> bool:
+    """Проверяет, является ли путь директорией, как Path.is_dir.
+
+    Args:
+        path: Путь
+
+    Returns:
+        bool: True для директории или ссылки на нее
+    """
+    cache = _local.cache
+    if cache is None:
+        return path.is_dir()
+    result = cache.stat(path)
+    return result is not None and stat.S_ISDIR(result.st_mode)
+
+
+def is_file(path: Path) -> bool:
+    """Проверяет, является ли путь обычным файлом, как Path.is_file.
+
+    Args:
+        path: Путь
+
+    Returns:
+        bool: True для файла или ссылки на него
+    """
+    cache = _local.cache
+    if cache is None:
+        return path.is_file()
+    result = cache.stat(path)
+    return result is not None and stat.S_ISREG(result.st_mode)
+
+
+def stat_path(path: Path) -> os.stat_result:
+    """Возвращает stat пути, как Path.stat.
+
+    Args:
+        path: Путь
+
+    Returns:
+        os.stat_result: Результат stat
+
+    Raises:
+        FileNotFoundError: Если пути нет
+    """
+    cache = _local.cache
+    if cache is None:
+        return path.stat()
+
+    result = cache.stat(path)
+    if result is None:
+        raise FileNotFoundError(
+            errno.ENOENT, os.strerror(errno.ENOENT), str(path)
+        )
+    return result
+
+
+def invalidate() -> None:
+    """Сбрасывает кэш команды после того, как она изменила файлы."""
+    cache = _local.cache
+    if cache is not None:
+        cache.clear()
+
+
+class DirectoryCache:
+    """Содержимое директорий, общее для команд долгоживущего процесса.
+
+    Имена и типы записей меняются только вместе с mtime и ctime самой
+    директории, поэтому сохраненное содержимое проверяется одним stat
+    директории вместо ее чтения. Директории, измененные меньше
+    DIRECTORY_CACHE_RACY_SECONDS назад, не сохраняются: их следующее
+    изменение может не сдвинуть mtime. Тип цели ссылки не хранится,
+    так как он меняется без изменения директории. Всего хранится не
+    больше names имен, давно не использованные директории вытесняются.
+    """
+
+    def __init__(self, names: int = DIRECTORY_CACHE_NAMES) -> None:
+        self.names = names
+        self._size = 0
+        self._entries: collections.OrderedDict[
+            str, tuple[tuple[int, ...], list[tuple[str, str]]]
+        ] = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def read(self, directory: str | Path) -> list[tuple[str, str]]:
+        """Возвращает записи директории.
+
+        Args:
+            directory: Путь к директории
+
+        Returns:
+            list[tuple[str, str]]: Имя и тип (DIRECTORY, LINK или FILE)
+                каждой записи в порядке файловой системы
+
+        Raises:
+            OSError: Если директорию нельзя прочитать
+        """
+        key = os.path.abspath(directory)
+        info = os.stat(key)
+        version = (
+            info.st_dev,
+            info.st_ino,
+            info.st_mtime_ns,
+            info.st_ctime_ns,
+        )
+
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None and cached[0] == version:
+                self._entries.move_to_end(key)
+                return cached[1]
+
+        entries = scan(key)
+        changed = max(info.st_mtime, info.st_ctime)
+        if time.time() - changed < DIRECTORY_CACHE_RACY_SECONDS:
+            return entries
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous[1])
+            if len(entries) <= self.names:
+                self._entries[key] = (version, entries)
+                self._size += len(entries)
+            while self._size > self.names:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+
+        return entries
+
+
+_directories: DirectoryCache | None = None
+
+
+def enable_directory_cache() -> None:
+    """Включает кэш содержимого директорий для всего процесса.
+
+    Кэш нужен долгоживущему серверу (--serve): его клиенты повторяют
+    обходы одних и тех же деревьев.
+    """
+    global _directories
+    if _directories is None:
+        _directories = DirectoryCache()
+
+
+def scan(directory: str | Path) -> list[tuple[str, str]]:
+    """Читает записи директории без кэша.
+
+    Args:
+        directory: Путь к директории
+
+    Returns:
+        list[tuple[str, str]]: Имя и тип каждой записи
+
+    Raises:
+        OSError: Если директорию нельзя прочитать
+    """
+    entries = []
+    with os.scandir(directory) as scanner:
+        for entry in scanner:
+            if entry.is_symlink():
+                kind = LINK
+            else:
+                try:
+                    kind = DIRECTORY if entry.is_dir() else FILE
+                except OSError:
+                    kind = FILE
+            entries.append((entry.name, kind))
+    return entries
+
+
+def read_directory(directory: str | Path) -> list[tuple[str, str]]:
+    """Возвращает записи директории, через кэш процесса, если он включен.
+
+    Args:
+        directory: Путь к директории
+
+    Returns:
+        list[tuple[str, str]]: Имя и тип каждой записи
+
+    Raises:
+        OSError: Если директорию нельзя прочитать
+    """
+    cache = _directories
+    if cache is None:
+        return scan(directory)
+    return cache.read(directory)
+
+
+def iter_files(root: Path) -> Iterator[Path]:
+    """Обходит дерево и возвращает все пути, кроме директорий.
+
+    Порядок тот же, что у ``root.rglob('*')`` с пропуском директорий,
+    но тип берется из записи директории, которую на Linux ядро отдает
+    без вызова stat. Ссылки на директории пропускаются, но не
+    обходятся, а директории без прав на чтение пропускаются. В сервере
+    директории читаются через кэш процесса (см. DirectoryCache).
+
+    Args:
+        root: Корень обхода
+
+    Yields:
+        Path: Пути файлов
+    """
+    directories = [root]
+    while directories:
+        directory = directories.pop()
+        try:
+            entries = read_directory(directory)
+        except OSError:
+            continue
+
+        subdirectories = []
+        for name, kind in entries:
+            path = directory / name
+            if kind == DIRECTORY:
+                subdirectories.append(path)
+            elif kind == FILE or not os.path.isdir(path):
+                yield path
+
+        directories.extend(reversed(subdirectories))
@@ -0,0 +1,103 @@
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+
+SECONDS_PER_DAY = 24 * 60 * 60
+
+
+def rotate(trash_path: Path, archive_path: Path) -> Path | None:
+    """Откладывает корзину прошлой сессии и создает пустую.
+
+    Корзина переносится в архив одним переименованием, поэтому время
+    запуска не зависит от ее размера. Имя отложенной корзины - время
+    переноса в наносекундах, по нему считается срок хранения.
+
+    Args:
+        trash_path: Путь к корзине
+        archive_path: Директория с корзинами прошлых сессий
+
+    Returns:
+        Path | None: Путь к отложенной корзине или None, если корзины
+            не было
+    """
+    archive_path.mkdir(exist_ok=True)
+    archived_path: Path | None = archive_path / str(time.time_ns())
+
+    try:
+        os.rename(trash_path, str(archived_path))
+    except FileNotFoundError:
+        archived_path = None
+
+    trash_path.mkdir(exist_ok=True)
+    return archived_path
+
+
+def expired(
+    archive_path: Path, retention_days: float, now: float | None = None
+) -> list[Path]:
+    """Находит отложенные корзины старше срока хранения.
+
+    Args:
+        archive_path: Директория с корзинами прошлых сессий
+        retention_days: Срок хранения в днях (0 - удалять все)
+        now: Текущее время в секундах Unix
+
+    Returns:
+        list[Path]: Корзины, которые можно удалить
+    """
+    if now is None:
+        now = time.time()
+    deadline = now - retention_days * SECONDS_PER_DAY
+
+    try:
+        entries = list(os.scandir(archive_path))
+    except FileNotFoundError:
+        return []
+
+    return [
+        Path(entry.path)
+        for entry in entries
+        if entry.name.isdigit() and int(entry.name) / 1e9 <= deadline
+    ]
+
+
+def purge(archive_path: Path, retention_days: float) -> None:
+    """Удаляет отложенные корзины старше срока хранения.
+
+    Args:
+        archive_path: Директория с корзинами прошлых сессий
+        retention_days: Срок хранения в днях
+    """
+    for path in expired(archive_path, retention_days):
+        shutil.rmtree(path, ignore_errors=True)
+
+
+def purge_in_background(
+    archive_path: Path, retention_days: float
+) -> threading.Thread | None:
+    """Запускает удаление старых корзин в фоновом потоке.
+
+    Поток не задерживает выход из оболочки: если он не успел удалить
+    все, остаток удалит следующий запуск.
+
+    Args:
+        archive_path: Директория с корзинами прошлых сессий
+        retention_days: Срок хранения в днях
+
+    Returns:
+        threading.Thread | None: Запущенный поток или None, если
+            удалять нечего
+    """
+    if not expired(archive_path, retention_days):
+        return None
+
+    thread = threading.Thread(
+        target=purge,
+        args=(archive_path, retention_days),
+        name='trash-purge',
+        daemon=True,
+    )
+    thread.start()
+    return thread
@@ -1,13 +1,18 @@
-import os
 import typing
 from pathlib import Path
 
+import workdir
 from logger.logger_setup import terminal_logger
+from output import echo, flushed
 
 
+@flushed
 def cd(arguments: list[str], flags: set[typing.Any] | None = None) -> int:
     """Меняет текущую рабочую директорию.
 
+    В фоновой задаче меняется только рабочая директория задачи (см.
+    workdir.change).
+
     Args:
         arguments: Путь к директории (максимум 1 аргумент)
         flags: Флаги (не поддерживаются)
@@ -17,34 +22,36 @@ def cd(arguments: list[str], flags: set[typing.Any] | None = None) -> int:
     """
     if not flags:
         if len(arguments) > 1:
-            print('-bash: cd: too many arguments')
+            echo('-bash: cd: too many arguments')
             terminal_logger.error(f'cd: too many arguments: {arguments}')
             return 0
 
         if not arguments or arguments[0] == '~':
             argument_path = Path.home()
-            os.chdir(str(argument_path))
+            workdir.change(str(argument_path))
             terminal_logger.info(f'cd: {arguments} - success')
             return 0
 
         else:
-            argument_path = Path(arguments[0])
+            argument_path = workdir.resolve(arguments[0])
 
             if argument_path.is_dir():
-                argument_path = Path(arguments[0]).expanduser().resolve()
-                os.chdir(str(argument_path))
+                argument_path = workdir.resolve(
+                    Path(arguments[0]).expanduser()
+                ).resolve()
+                workdir.change(str(argument_path))
                 terminal_logger.info(f'cd: {arguments} - success')
                 return 0
 
             elif argument_path.is_file():
-                print(f'-bash: cd: {argument_path.name}: Not a directory')
+                echo(f'-bash: cd: {argument_path.name}: Not a directory')
                 terminal_logger.error(
                     f'cd: {argument_path.name}: Not a directory'
                 )
                 return 1
 
             else:
-                print(
+                echo(
                     f'-bash: cd: {argument_path.name}:',
                     ' No such file or directory',
                 )
@@ -53,7 +60,7 @@ def cd(arguments: list[str], flags: set[typing.Any] | None = None) -> int:
                 )
                 return 1
 
-    print(f'-bash: cd: does not support the flags: {", ".join(flags)}')
+    echo(f'-bash: cd: does not support the flags: {", ".join(flags)}')
     terminal_logger.error(
         f'cd: does not support the flags: {", ".join(flags)}'
     )
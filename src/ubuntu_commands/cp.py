@@ -1,14 +1,18 @@
-import shutil
 import typing
 from pathlib import Path
 
+import cancellation
+import stat_cache
+import workdir
 from constants import FOR_UNDO_HISTORY
-from logger.logger_setup import terminal_logger
+from logger.command_summary import CommandSummary
+from output import echo, emit, flushed
 from ubuntu_commands import helper_functions
 
 correct_flags = {'r'}
 
 
+@flushed
 def cp(arguments: list[str], flags: set[typing.Any] | None = None) -> int:
     """Копирует файлы и директории.
 
@@ -19,28 +23,47 @@ def cp(arguments: list[str], flags: set[typing.Any] | None = None) -> int:
     Returns:
         int: 0 при успехе, 1 при ошибке
     """
+    with CommandSummary('cp') as summary:
+        return _cp(arguments, flags, summary)
+
+
+def _cp(
+    arguments: list[str],
+    flags: set[typing.Any] | None,
+    summary: CommandSummary,
+) -> int:
+    """Выполняет cp, учитывая результаты в summary.
+
+    Args:
+        arguments: Аргументы команды
+        flags: Флаги команды
+        summary: Счетчики команды
+
+    Returns:
+        int: Код возврата команды
+    """
     if flags is None:
         flags = set()
 
     if not flags.issubset(correct_flags):
-        print(
+        echo(
             'cp: does not support the flags:',
             f' {", ".join(flags.difference(correct_flags))}',
         )
-        terminal_logger.error(
-            'cp: does not support the flags:',
-            f' {", ".join(flags.difference(correct_flags))}',
+        summary.error(
+            'cp: does not support the flags:'
+            + f' {", ".join(flags.difference(correct_flags))}',
         )
         return 1
 
     if not arguments:
-        print('cp: missing file operand')
-        terminal_logger.error('cp: missing file operand')
+        echo('cp: missing file operand')
+        summary.error('cp: missing file operand')
         return 1
 
     if len(arguments) == 1:
-        print(f"cp: missing destination file operand after '{arguments[0]}'")
-        terminal_logger.error(
+        echo(f"cp: missing destination file operand after '{arguments[0]}'")
+        summary.error(
             f"cp: missing destination file operand after '{arguments[0]}'"
         )
         return 1
@@ -55,202 +78,264 @@ def cp(arguments: list[str], flags: set[typing.Any] | None = None) -> int:
         first_item = arguments[0]
         second_item = arguments[1]
 
-        if not Path(first_item).exists():
-            print(f"cp: cannot stat '{first_item}': No such file or directory")
-            terminal_logger.error(
+        if not stat_cache.exists(workdir.resolve(first_item)):
+            echo(f"cp: cannot stat '{first_item}': No such file or directory")
+            summary.error(
                 f"cp: cannot stat '{first_item}': No such file or directory"
             )
             return 1
 
-        first_path = Path(first_item)
-        second_path = Path(second_item)
+        first_path = workdir.resolve(first_item)
+        second_path = workdir.resolve(second_item)
 
-        if first_path.is_dir():
+        if stat_cache.is_dir(first_path):
             if not recursive:
-                print(
+                echo(
                     f"cp: -r not specified; omitting directory '{first_item}'"
                 )
-                terminal_logger.error(
+                summary.error(
                     f"cp: -r not specified; omitting directory '{first_item}'"
                 )
                 return 1
 
-            if second_path.exists():
-                if second_path.is_dir():
+            if stat_cache.exists(second_path):
+                if stat_cache.is_dir(second_path):
                     final_dest = second_path / first_path.name
                     try:
-                        shutil.copytree(first_item, final_dest)
+                        helper_functions.copy_tree(
+                            first_path, final_dest, summary.copy2
+                        )
                         cp_items.append(str(first_path))
                         cp_items.append(str(final_dest))
-                        terminal_logger.info(
-                            f'cp: {first_item} -> {final_dest} - success'
+                        summary.item(
+                            'cp: %s -> %s - success', first_item, final_dest
+                        )
+                        emit(
+                            {
+                                'type': 'copied',
+                                'source': first_item,
+                                'destination': str(final_dest),
+                            }
                         )
 
                     except Exception as e:
-                        print(
+                        echo(
                             f"cp: cannot copy '{first_item}'",
                             f" to '{final_dest}': {e}",
                         )
-                        terminal_logger.error(
-                            f"cp: cannot copy '{first_item}'",
-                            f" to '{final_dest}': {e}",
+                        summary.error(
+                            f"cp: cannot copy '{first_item}'"
+                            + f" to '{final_dest}': {e}",
                         )
                         return 1
                 else:
-                    print(
+                    echo(
                         'cp: cannot overwrite non-directory',
                         " '{second_item}' with directory '{first_item}'",
                     )
-                    terminal_logger.error(
-                        'cp: cannot overwrite non-directory',
-                        " '{second_item}' with directory '{first_item}'",
+                    summary.error(
+                        'cp: cannot overwrite non-directory'
+                        + " '{second_item}' with directory '{first_item}'",
                     )
                     return 1
             else:
                 if helper_functions.is_valid_dirname(second_path.name):
                     try:
-                        shutil.copytree(first_path, second_path)
+                        helper_functions.copy_tree(
+                            first_path, second_path, summary.copy2
+                        )
                         cp_items.append(str(first_path))
                         cp_items.append(str(second_path))
-                        terminal_logger.info(
-                            f'cp: {first_item} -> {second_item} - success'
+                        summary.item(
+                            'cp: %s -> %s - success', first_item, second_item
+                        )
+                        emit(
+                            {
+                                'type': 'copied',
+                                'source': first_item,
+                                'destination': str(second_item),
+                            }
                         )
 
                     except Exception as e:
-                        print(
+                        echo(
                             f"cp: cannot create directory '{second_item}': {e}"
                         )
-                        terminal_logger.error(
+                        summary.error(
                             f"cp: cannot create directory '{second_item}': {e}"
                         )
                         return 1
                 else:
-                    print(f"cp: invalid directory name '{second_path.name}'")
-                    terminal_logger.error(
+                    echo(f"cp: invalid directory name '{second_path.name}'")
+                    summary.error(
                         f"cp: invalid directory name '{second_path.name}'"
                     )
                     return 1
 
-        elif first_path.is_file():
-            if second_path.exists() and second_path.is_dir():
+        elif stat_cache.is_file(first_path):
+            if stat_cache.exists(second_path) and stat_cache.is_dir(
+                second_path
+            ):
                 try:
-                    shutil.copy2(first_path, second_path)
+                    summary.copy2(first_path, second_path)
                     cp_items.append(str(first_path))
                     cp_items.append(str(second_path))
-                    terminal_logger.info(
-                        f'cp: {first_item} -> {second_item} - success'
+                    summary.item(
+                        'cp: %s -> %s - success', first_item, second_item
+                    )
+                    emit(
+                        {
+                            'type': 'copied',
+                            'source': first_item,
+                            'destination': str(second_item),
+                        }
                     )
 
                 except Exception as e:
-                    print(
+                    echo(
                         f"cp: cannot copy '{first_item}'",
                         f" to '{second_path}': {e}",
                     )
-                    terminal_logger.error(
-                        f"cp: cannot copy '{first_item}'",
-                        f" to '{second_path}': {e}",
+                    summary.error(
+                        f"cp: cannot copy '{first_item}'"
+                        + f" to '{second_path}': {e}",
                     )
                     return 1
             else:
                 if helper_functions.is_valid_filename(second_path.name):
                     try:
                         second_path.parent.mkdir(parents=True, exist_ok=True)
-                        shutil.copy2(first_path, second_path)
+                        summary.copy2(first_path, second_path)
                         cp_items.append(str(first_path))
                         cp_items.append(str(second_path))
-                        terminal_logger.info(
-                            f'cp: {first_item} -> {second_item} - success'
+                        summary.item(
+                            'cp: %s -> %s - success', first_item, second_item
+                        )
+                        emit(
+                            {
+                                'type': 'copied',
+                                'source': first_item,
+                                'destination': str(second_item),
+                            }
                         )
 
                     except Exception as e:
-                        print(
+                        echo(
                             f"cp: cannot copy '{first_item}'",
                             f" to '{second_item}': {e}",
                         )
-                        terminal_logger.error(
-                            f"cp: cannot copy '{first_item}'",
-                            f" to '{second_item}': {e}",
+                        summary.error(
+                            f"cp: cannot copy '{first_item}'"
+                            + f" to '{second_item}': {e}",
                         )
                         return 1
                 else:
-                    print(f"cp: invalid filename '{second_path.name}'")
-                    terminal_logger.error(
-                        f"cp: invalid filename '{second_path.name}'"
-                    )
+                    echo(f"cp: invalid filename '{second_path.name}'")
+                    summary.error(f"cp: invalid filename '{second_path.name}'")
                     return 1
         else:
-            print(f"cp: cannot copy '{first_item}': No such file or directory")
-            terminal_logger.error(
+            echo(f"cp: cannot copy '{first_item}': No such file or directory")
+            summary.error(
                 f"cp: cannot copy '{first_item}': No such file or directory"
             )
             return 1
 
     else:
         last_item = arguments[-1]
-        last_path = Path(last_item)
+        last_path = workdir.resolve(last_item)
 
-        if not last_path.exists():
-            print(f"cp: target '{last_item}': No such file or directory")
-            terminal_logger.error(
+        if not stat_cache.exists(last_path):
+            echo(f"cp: target '{last_item}': No such file or directory")
+            summary.error(
                 f"cp: target '{last_item}': No such file or directory"
             )
             return 1
 
-        if not last_path.is_dir():
-            print(f"cp: target '{last_item}' is not a directory")
-            terminal_logger.error(
-                f"cp: target '{last_item}' is not a directory"
-            )
+        if not stat_cache.is_dir(last_path):
+            echo(f"cp: target '{last_item}' is not a directory")
+            summary.error(f"cp: target '{last_item}' is not a directory")
             return 1
 
-        for item in arguments[:-1]:
-            item_path = Path(item)
-            if not item_path.exists():
-                print(f"cp: cannot stat '{item}': No such file or directory")
-                terminal_logger.error(
-                    f"cp: cannot stat '{item}': No such file or directory"
-                )
-                continue
-
-            if item_path.is_file():
-                try:
-                    shutil.copy2(item_path, last_path)
-                    cp_items.append(str(item_path))
-                    terminal_logger.info(
-                        f'cp: {item} -> {last_item} - success'
+        try:
+            for item in arguments[:-1]:
+                item_path = workdir.resolve(item)
+                if not stat_cache.exists(item_path):
+                    echo(
+                        f"cp: cannot stat '{item}': No such file or directory"
                     )
-                except Exception as e:
-                    print(f"cp: cannot copy '{item}' to '{last_item}': {e}")
-                    terminal_logger.error(
-                        f"cp: cannot copy '{item}' to '{last_item}': {e}"
+                    summary.error(
+                        f"cp: cannot stat '{item}': No such file or directory"
                     )
                     continue
 
-            elif item_path.is_dir():
-                if not recursive:
-                    print(f"cp: -r not specified; omitting directory '{item}'")
-                    terminal_logger.error(
-                        f"cp: -r not specified; omitting directory '{item}'"
-                    )
-                    continue
+                if stat_cache.is_file(item_path):
+                    try:
+                        summary.copy2(item_path, last_path)
+                        stat_cache.invalidate()
+                        cp_items.append(str(item_path))
+                        summary.item('cp: %s -> %s - success', item, last_item)
+                        emit(
+                            {
+                                'type': 'copied',
+                                'source': item,
+                                'destination': str(last_item),
+                            }
+                        )
+                    except Exception as e:
+                        echo(f"cp: cannot copy '{item}' to '{last_item}': {e}")
+                        summary.error(
+                            f"cp: cannot copy '{item}' to '{last_item}': {e}"
+                        )
+                        continue
 
-                try:
-                    final_path = last_path / item_path.name
-                    shutil.copytree(item_path, final_path)
-                    cp_items.append(str(item_path))
-                    terminal_logger.info(
-                        f'cp: {item} -> {final_path} - success'
-                    )
-                except Exception as e:
-                    print(f"cp: cannot copy '{item}' to '{final_path}': {e}")
-                    terminal_logger.error(
-                        f"cp: cannot copy '{item}' to '{final_path}': {e}"
-                    )
-                    continue
+                elif stat_cache.is_dir(item_path):
+                    if not recursive:
+                        echo(
+                            'cp: -r not specified;'
+                            f" omitting directory '{item}'"
+                        )
+                        summary.error(
+                            'cp: -r not specified;'
+                            f" omitting directory '{item}'"
+                        )
+                        continue
+
+                    try:
+                        final_path = last_path / item_path.name
+                        helper_functions.copy_tree(
+                            item_path, final_path, summary.copy2
+                        )
+                        stat_cache.invalidate()
+                        cp_items.append(str(item_path))
+                        summary.item(
+                            'cp: %s -> %s - success', item, final_path
+                        )
+                        emit(
+                            {
+                                'type': 'copied',
+                                'source': item,
+                                'destination': str(final_path),
+                            }
+                        )
+                    except Exception as e:
+                        echo(
+                            f"cp: cannot copy '{item}' to '{final_path}': {e}"
+                        )
+                        summary.error(
+                            f"cp: cannot copy '{item}' to '{final_path}': {e}"
+                        )
+                        continue
+        except cancellation.Cancelled:
+            if cp_items:
+                FOR_UNDO_HISTORY.append(
+                    ['cp'] + cp_items + [str(last_path), Path('.')]
+                )
+            raise
 
         if cp_items:
             cp_items.append(str(last_path))
 
     if cp_items:
         FOR_UNDO_HISTORY.append(['cp'] + cp_items + [Path('.')])
+
     return 0
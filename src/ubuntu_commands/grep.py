@@ -1,12 +1,20 @@
+import os
 import re
 import typing
 from pathlib import Path
 
-from logger.logger_setup import terminal_logger
+import cancellation
+import pipeline
+import stat_cache
+import workdir
+from constants import CANCEL_CHECK_LINES
+from logger.command_summary import CommandSummary
+from output import echo, emit, flushed, json_enabled
 
 correct_flags = {'r', 'i'}
 
 
+@flushed
 def grep(arguments: list[str], flags: set[typing.Any] | None = None) -> int:
     """Ищет текст в файлах по регулярному выражению.
 
@@ -17,17 +25,36 @@ def grep(arguments: list[str], flags: set[typing.Any] | None = None) -> int:
     Returns:
         int: 0 при успехе, 1 при ошибке
     """
+    with CommandSummary('grep') as summary:
+        return _grep(arguments, flags, summary)
+
+
+def _grep(
+    arguments: list[str],
+    flags: set[typing.Any] | None,
+    summary: CommandSummary,
+) -> int:
+    """Выполняет grep, учитывая результаты в summary.
+
+    Args:
+        arguments: Аргументы команды
+        flags: Флаги команды
+        summary: Счетчики команды
+
+    Returns:
+        int: Код возврата команды
+    """
     if flags is None:
         flags = set()
 
     if not flags.issubset(correct_flags):
-        print(
+        echo(
             'grep: does not support the flags:',
             f' {", ".join(flags.difference(correct_flags))}',
         )
-        terminal_logger.error(
-            'grep: does not support the flags:',
-            f' {", ".join(flags.difference(correct_flags))}',
+        summary.error(
+            'grep: does not support the flags:'
+            + f' {", ".join(flags.difference(correct_flags))}',
         )
         return 1
 
@@ -39,9 +66,13 @@ def grep(arguments: list[str], flags: set[typing.Any] | None = None) -> int:
     if 'i' in flags:
         ignore_case = True
 
+    piped_input = pipeline.piped_input()
+    if len(arguments) == 1 and piped_input is not None:
+        return grep_lines(arguments[0], piped_input, ignore_case, summary)
+
     if len(arguments) < 2:
-        print('Usage: grep [OPTION]... PATTERNS [FILE]...')
-        terminal_logger.error('grep: insufficient arguments')
+        echo('Usage: grep [OPTION]... PATTERNS [FILE]...')
+        summary.error('grep: insufficient arguments')
         return 1
 
     else:
@@ -51,16 +82,15 @@ def grep(arguments: list[str], flags: set[typing.Any] | None = None) -> int:
             pattern = arguments[0].lower()
 
         for argument in arguments[1:]:
-            argument_path = Path(argument)
+            cancellation.checkpoint()
+            argument_path = workdir.resolve(argument)
 
-            if not argument_path.exists():
-                print(f'grep: {argument}: No such file or directory')
-                terminal_logger.error(
-                    f'grep: {argument}: No such file or directory'
-                )
+            if not stat_cache.exists(argument_path):
+                echo(f'grep: {argument}: No such file or directory')
+                summary.error(f'grep: {argument}: No such file or directory')
                 continue
 
-            if argument_path.is_file():
+            if stat_cache.is_file(argument_path):
                 line_number = 1
 
                 try:
@@ -68,88 +98,166 @@ def grep(arguments: list[str], flags: set[typing.Any] | None = None) -> int:
                         for line in file:
                             if ignore_case:
                                 if re.search(pattern, line.lower()):
-                                    print(
-                                        f'{argument}:',
-                                        f' {line_number}. {line}',
+                                    emit(
+                                        match_record(
+                                            argument, line_number, line
+                                        ),
+                                        f'{argument}:  {line_number}. {line}',
                                         end='',
                                     )
-                                    terminal_logger.info(
-                                        f'grep: {argument}:',
-                                        f'{line_number} - found',
+                                    summary.item(
+                                        'grep: %s:%s - found',
+                                        argument,
+                                        line_number,
                                     )
 
                             else:
                                 if re.search(pattern, line):
-                                    print(
-                                        f'{argument}:',
-                                        f' {line_number}. {line}',
+                                    emit(
+                                        match_record(
+                                            argument, line_number, line
+                                        ),
+                                        f'{argument}:  {line_number}. {line}',
                                         end='',
                                     )
-                                    terminal_logger.info(
-                                        f'grep: {argument}:',
-                                        f'{line_number} - found',
+                                    summary.item(
+                                        'grep: %s:%s - found',
+                                        argument,
+                                        line_number,
                                     )
 
+                            if line_number % CANCEL_CHECK_LINES == 0:
+                                cancellation.checkpoint()
                             line_number += 1
-                        print()
+                        summary.files += 1
+                        summary.bytes += os.fstat(file.fileno()).st_size
+                        if not json_enabled():
+                            echo()
                     continue
                 except UnicodeDecodeError:
-                    print(f'grep: {argument}: Binary file matches')
-                    terminal_logger.error(
-                        f'grep: {argument}: Binary file matches'
-                    )
+                    echo(f'grep: {argument}: Binary file matches')
+                    summary.error(f'grep: {argument}: Binary file matches')
                 except Exception as e:
-                    print(f'grep: {argument}: {e}')
-                    terminal_logger.error(f'grep: {argument}: {e}')
+                    echo(f'grep: {argument}: {e}')
+                    summary.error(f'grep: {argument}: {e}')
 
-            if argument_path.is_dir():
+            if stat_cache.is_dir(argument_path):
                 if not recursive:
-                    print(f'grep: {argument}: Is a directory')
-                    terminal_logger.error(f'grep: {argument}: Is a directory')
+                    echo(f'grep: {argument}: Is a directory')
+                    summary.error(f'grep: {argument}: Is a directory')
                     continue
 
-                for file_path in argument_path.rglob('*'):
-                    if file_path.is_dir():
-                        continue
-
+                for found_path in stat_cache.iter_files(argument_path):
+                    cancellation.checkpoint()
+                    file_path = Path(argument) / found_path.relative_to(
+                        argument_path
+                    )
                     line_number = 1
 
                     try:
-                        with open(file_path) as file:
+                        with open(found_path) as file:
                             for line in file:
                                 if ignore_case:
                                     if bool(re.match(pattern, line.lower())):
-                                        print(
-                                            f'{file_path.name}:',
-                                            f' {line_number}. {line}',
+                                        emit(
+                                            match_record(
+                                                str(file_path),
+                                                line_number,
+                                                line,
+                                            ),
+                                            f'{file_path.name}:'
+                                            f'  {line_number}. {line}',
                                             end='',
                                         )
-                                        terminal_logger.info(
-                                            f'grep: {file_path.name}:',
-                                            f'{line_number} - found',
+                                        summary.item(
+                                            'grep: %s:%s - found',
+                                            file_path.name,
+                                            line_number,
                                         )
 
                                 else:
                                     if bool(re.match(pattern, line)):
-                                        print(
-                                            f'{file_path.name}:',
-                                            f' {line_number}. {line}',
+                                        emit(
+                                            match_record(
+                                                str(file_path),
+                                                line_number,
+                                                line,
+                                            ),
+                                            f'{file_path.name}:'
+                                            f'  {line_number}. {line}',
                                             end='',
                                         )
-                                        terminal_logger.info(
-                                            f'grep: {file_path.name}:',
-                                            f'{line_number} - found',
+                                        summary.item(
+                                            'grep: %s:%s - found',
+                                            file_path.name,
+                                            line_number,
                                         )
 
+                                if line_number % CANCEL_CHECK_LINES == 0:
+                                    cancellation.checkpoint()
                                 line_number += 1
+                            summary.files += 1
+                            summary.bytes += os.fstat(file.fileno()).st_size
                         continue
                     except UnicodeDecodeError:
-                        print(f'grep: {file_path}: Binary file matches')
-                        terminal_logger.error(
+                        echo(f'grep: {file_path}: Binary file matches')
+                        summary.error(
                             f'grep: {file_path}: Binary file matches'
                         )
                     except Exception as e:
-                        print(f'grep: {file_path}: {e}')
-                        terminal_logger.error(f'grep: {file_path}: {e}')
+                        echo(f'grep: {file_path}: {e}')
+                        summary.error(f'grep: {file_path}: {e}')
 
         return 0
+
+
+def grep_lines(
+    pattern: str,
+    lines: typing.Iterable[str],
+    ignore_case: bool,
+    summary: CommandSummary,
+) -> int:
+    """Выводит подходящие под шаблон строки входа конвейера.
+
+    Args:
+        pattern: Регулярное выражение
+        lines: Строки входа
+        ignore_case: Игнорировать регистр
+        summary: Счетчики команды
+
+    Returns:
+        int: 0 при успехе
+    """
+    if ignore_case:
+        pattern = pattern.lower()
+
+    for line_number, line in enumerate(lines, start=1):
+        if line_number % CANCEL_CHECK_LINES == 0:
+            cancellation.checkpoint()
+        if re.search(pattern, line.lower() if ignore_case else line):
+            emit(match_record(None, None, line), line, end='')
+            summary.item('grep: (standard input) - found')
+        summary.bytes += len(line)
+
+    return 0
+
+
+def match_record(
+    path: str | None, line_number: int | None, line: str
+) -> dict[str, typing.Any]:
+    """Собирает запись о найденной строке.
+
+    Args:
+        path: Путь к файлу (None для входа конвейера)
+        line_number: Номер строки в файле
+        line: Найденная строка
+
+    Returns:
+        dict[str, typing.Any]: Запись с полями path, line_number и line
+    """
+    return {
+        'type': 'match',
+        'path': path,
+        'line_number': line_number,
+        'line': line.rstrip('\n'),
+    }
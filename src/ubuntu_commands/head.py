@@ -0,0 +1,88 @@
+import itertools
+import typing
+
+import pipeline
+import workdir
+from logger.logger_setup import terminal_logger
+from output import echo, emit, flushed, json_enabled
+
+DEFAULT_HEAD_LINES = 10
+
+
+@flushed
+def head(arguments: list[str], flags: set[typing.Any] | None = None) -> int:
+    """Выводит первые строки входа конвейера или файлов.
+
+    Прочитав нужное количество строк из конвейера, команда перестает
+    читать вход, и предыдущая команда завершается, не выполняя лишней
+    работы.
+
+    Args:
+        arguments: Количество строк (по умолчанию 10) и пути к файлам
+        flags: Флаги (не поддерживаются)
+
+    Returns:
+        int: 0 при успехе, 1 при ошибке
+    """
+    if flags:
+        echo(f'head: does not support the flags: {", ".join(flags)}')
+        terminal_logger.error(
+            f'head: does not support the flags: {", ".join(flags)}'
+        )
+        return 1
+
+    count = DEFAULT_HEAD_LINES
+    if arguments and arguments[0].isdigit():
+        count = int(arguments[0])
+        arguments = arguments[1:]
+
+    if not arguments:
+        piped_input = pipeline.piped_input()
+        if piped_input is None:
+            echo('head: missing input: use in a pipeline or pass files')
+            terminal_logger.error('head: missing input')
+            return 1
+
+        for line in itertools.islice(piped_input, count):
+            emit(line_record(None, line), line, end='')
+        piped_input.close()
+
+        terminal_logger.info(f'head: {count} - success')
+        return 0
+
+    for argument in arguments:
+        argument_path = workdir.resolve(argument)
+
+        if not argument_path.is_file():
+            echo(
+                f"head: cannot open '{argument}' for reading:",
+                'No such file or directory',
+            )
+            terminal_logger.error(
+                f"head: cannot open '{argument}' for reading:"
+                + ' No such file or directory'
+            )
+            continue
+
+        if len(arguments) > 1 and not json_enabled():
+            echo(f'==> {argument} <==')
+
+        with open(argument_path, encoding='utf-8', errors='replace') as file:
+            for line in itertools.islice(file, count):
+                emit(line_record(argument, line), line, end='')
+
+    terminal_logger.info(f'head: {arguments} - success')
+    return 0
+
+
+def line_record(path: str | None, line: str) -> dict[str, typing.Any]:
+    """Собирает запись о выведенной строке.
+
+    Args:
+        path: Путь к файлу (None для входа конвейера)
+        line: Строка
+
+    Returns:
+        dict[str, typing.Any]: Запись с полями path и line
+    """
+    return {'type': 'line', 'path': path, 'line': line.rstrip('\n')}
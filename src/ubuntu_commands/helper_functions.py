@@ -1,12 +1,23 @@
+import os
 import shutil
+import typing
 from pathlib import Path
 
+import cancellation
+import history_index
+import metrics
+import trash
 from constants import (
+    HISTORY_BLOCK_SIZE,
     HISTORY_PATH,
     POSSIBLE_LONS_FLAGS,
     POSSIBLE_SHORT_FLAGS,
     TRANSFORMATION_FLAGS,
+    TRASH_ARCHIVE_PATH,
+    TRASH_PATH,
+    TRASH_RETENTION_DAYS,
 )
+from output import ask, echo
 
 
 def is_flags(flags: str) -> int | set:
@@ -87,6 +98,67 @@ def is_valid_dirname(dirname: str) -> bool:
     return True
 
 
+def checked_copy2(source: Path | str, destination: Path | str) -> str:
+    """Копирует файл через shutil.copy2, проверив отмену команды.
+
+    Args:
+        source: Путь к исходному файлу
+        destination: Путь назначения
+
+    Returns:
+        str: Путь к скопированному файлу
+
+    Raises:
+        cancellation.Cancelled: Если команда отменена
+    """
+    cancellation.checkpoint()
+    return str(shutil.copy2(source, destination))
+
+
+def copy_tree(
+    source: Path | str,
+    destination: Path | str,
+    copy_function: typing.Callable[..., typing.Any] = checked_copy2,
+) -> None:
+    """Копирует дерево и удаляет частичную копию, если команду отменили.
+
+    Args:
+        source: Исходная директория
+        destination: Несуществующий путь назначения
+        copy_function: Функция копирования одного файла
+
+    Raises:
+        cancellation.Cancelled: Если команда отменена во время копирования
+    """
+    try:
+        shutil.copytree(source, destination, copy_function=copy_function)
+    except cancellation.Cancelled:
+        shutil.rmtree(destination, ignore_errors=True)
+        raise
+
+
+def add_tree_metrics(command: str, path: Path) -> None:
+    """Учитывает в метриках файлы и байты дерева, обработанного командой.
+
+    Архивные команды собирают файлы во временной директории, поэтому
+    ее размер и есть объем, который они упаковали или распаковали.
+    Дерево обходится, только если метрики включены.
+
+    Args:
+        command: Имя команды
+        path: Временная директория с файлами архива
+    """
+    if not metrics.enabled():
+        return
+
+    files = size = 0
+    for directory, _, names in os.walk(path):
+        for name in names:
+            files += 1
+            size += os.lstat(os.path.join(directory, name)).st_size
+    metrics.add(command, files, size)
+
+
 def extracting_files(
     temp_dir_path: Path, extract_folder_path: Path, archive_name: str
 ) -> int:
@@ -100,7 +172,7 @@ def extracting_files(
     Returns:
         int: 0 при успехе
     """
-    print(f'Archive:  {archive_name}')
+    echo(f'Archive:  {archive_name}')
 
     all_files = list(temp_dir_path.rglob('*'))
 
@@ -124,63 +196,216 @@ def extracting_files(
     for file_path, relative_path, final_file_path in no_conflict_files:
         final_file_path.parent.mkdir(parents=True, exist_ok=True)
         shutil.copy2(file_path, final_file_path)
-        print(f'  inflating: {relative_path}')
+        echo(f'  inflating: {relative_path}')
 
     replace_all = False
     skip_all = False
 
     for file_path, relative_path, final_file_path in conflict_files:
         if skip_all:
-            print(f'  skipping: {relative_path}')
+            echo(f'  skipping: {relative_path}')
             continue
 
         if replace_all:
             shutil.copy2(file_path, final_file_path)
-            print(f'  inflating: {relative_path}')
+            echo(f'  inflating: {relative_path}')
             continue
 
-        print(
+        echo(
             f'replace {relative_path}? [y]es, [n]o, [A]ll, [s]kip all: ',
             end='',
         )
-        answer = input().strip().lower()
+        answer = ask('').strip().lower()
 
         if answer in ('y', 'yes'):
             shutil.copy2(file_path, final_file_path)
-            print(f'  inflating: {relative_path}')
+            echo(f'  inflating: {relative_path}')
         elif answer in ('a', 'all'):
             replace_all = True
             shutil.copy2(file_path, final_file_path)
-            print(f'  inflating: {relative_path}')
+            echo(f'  inflating: {relative_path}')
         elif answer in ('s', 'skip'):
             skip_all = True
-            print(f'  skipping: {relative_path}')
+            echo(f'  skipping: {relative_path}')
         elif answer in ('n', 'no'):
-            print(f'  skipping: {relative_path}')
+            echo(f'  skipping: {relative_path}')
         else:
-            print(f'  skipping: {relative_path}')
+            echo(f'  skipping: {relative_path}')
 
     return 0
 
 
+def read_last_lines(file_path: Path | str, count: int) -> list[str]:
+    """Читает последние count строк файла, не загружая его целиком.
+
+    Файл читается блоками от конца, пока не наберется нужное количество
+    строк, поэтому память и время зависят от count, а не от размера файла.
+
+    Args:
+        file_path: Путь к файлу
+        count: Количество строк
+
+    Returns:
+        list[str]: Последние строки файла вместе с переводами строк
+    """
+    if count <= 0:
+        return []
+
+    with open(file_path, 'rb') as f:
+        position = f.seek(0, os.SEEK_END)
+        blocks: list[bytes] = []
+        newlines = 0
+        trailing_newline = False
+
+        while position > 0 and newlines <= count:
+            block_size = min(HISTORY_BLOCK_SIZE, position)
+            position -= block_size
+            f.seek(position)
+            block = f.read(block_size)
+
+            if not blocks and block.endswith(b'\n'):
+                trailing_newline = True
+                newlines -= 1
+
+            newlines += block.count(b'\n')
+            blocks.append(block)
+
+    tail = b''.join(reversed(blocks))
+    if not tail:
+        return []
+
+    raw_lines = tail.split(b'\n')
+    if trailing_newline:
+        raw_lines.pop()
+
+    lines = [
+        raw_line.decode(errors='replace') + '\n'
+        for raw_line in raw_lines[-count:]
+    ]
+    if lines and not trailing_newline:
+        lines[-1] = lines[-1][:-1]
+    return lines
+
+
+def _read_last_history_number(history_path: Path) -> tuple[int, bool]:
+    """Читает номер последней записи истории с конца файла.
+
+    Файл читается блоками от конца, пока не найдется строка вида
+    ``N. команда``, поэтому стоимость не зависит от размера истории.
+
+    Args:
+        history_path: Путь к файлу истории
+
+    Returns:
+        tuple[int, bool]: Номер последней записи (0 если записей нет) и
+            признак того, что файл заканчивается переводом строки
+    """
+    with open(history_path, 'rb') as f:
+        position = f.seek(0, os.SEEK_END)
+        if position == 0:
+            return 0, True
+
+        f.seek(position - 1)
+        ends_with_newline = f.read(1) == b'\n'
+
+        tail = b''
+        while position > 0:
+            block_size = min(HISTORY_BLOCK_SIZE, position)
+            position -= block_size
+            f.seek(position)
+            tail = f.read(block_size) + tail
+
+            lines = tail.split(b'\n')
+            if position > 0:
+                lines = lines[1:]
+
+            for raw_line in reversed(lines):
+                number = _parse_history_number(raw_line)
+                if number is not None:
+                    return number, ends_with_newline
+
+    return 0, ends_with_newline
+
+
+def _parse_history_number(raw_line: bytes) -> int | None:
+    """Извлекает номер записи из строки истории.
+
+    Args:
+        raw_line: Строка истории в байтах
+
+    Returns:
+        int | None: Номер записи или None, если строка повреждена
+    """
+    first_word, _, _ = raw_line.partition(b' ')
+    if first_word.endswith(b'.') and first_word[:-1].isdigit():
+        return int(first_word[:-1])
+    return None
+
+
+_history_last_number = 0
+_history_size = -1
+
+
 def write_history(line: str) -> int:
     """Записывает команду в файл истории.
 
+    Номер последней записи и размер файла хранятся в памяти, поэтому
+    запись стоит один ``stat`` и одну дозапись (плюс дозапись в индекс
+    поиска, если он уже построен). Если размер файла изменился без
+    нашего участия (другая сессия, обрезание, сбой), номер заново
+    читается с конца файла, а после обрезания индекс сбрасывается.
+
     Args:
         line: Команда для записи
 
     Returns:
         int: 0 при успехе
     """
-    if HISTORY_PATH.stat().st_size == 0:
-        with open(HISTORY_PATH, 'w') as f:
-            f.write(f'1. {line}\n')
-        return 0
+    global _history_last_number, _history_size
+
+    try:
+        size = os.stat(HISTORY_PATH).st_size
+    except FileNotFoundError:
+        size = 0
 
-    history_lines = open(HISTORY_PATH).readlines()
-    last_line_number, *_ = history_lines[-1].split()
-    last_number = int(last_line_number[:-1])
+    prefix = ''
+    if size != _history_size:
+        if size < _history_size:
+            history_index.drop(HISTORY_PATH)
+
+        if size == 0:
+            _history_last_number = 0
+        else:
+            _history_last_number, ends_with_newline = (
+                _read_last_history_number(HISTORY_PATH)
+            )
+            if not ends_with_newline:
+                prefix = '\n'
 
-    with open(HISTORY_PATH, 'a') as f:
-        f.write(f'{last_number + 1}. {line}\n')
+    record = f'{prefix}{_history_last_number + 1}. {line}\n'.encode()
+
+    fd = os.open(HISTORY_PATH, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+    try:
+        os.write(fd, record)
+    finally:
+        os.close(fd)
+
+    history_index.add_record(HISTORY_PATH, size + len(prefix), line)
+
+    _history_last_number += 1
+    _history_size = size + len(record)
     return 0
+
+
+def prepare_home() -> None:
+    """Создает файл истории и пустую корзину в домашней директории.
+
+    Вызывается при запуске оболочки, а не при импорте constants, чтобы
+    импорт модулей не менял домашнюю директорию. Корзина прошлой сессии
+    откладывается в TRASH_ARCHIVE_PATH, а корзины старше
+    TRASH_RETENTION_DAYS дней удаляются в фоновом потоке.
+    """
+    HISTORY_PATH.touch(exist_ok=True)
+
+    trash.rotate(TRASH_PATH, TRASH_ARCHIVE_PATH)
+    trash.purge_in_background(TRASH_ARCHIVE_PATH, TRASH_RETENTION_DAYS)
@@ -1,30 +1,44 @@
+import re
+import sqlite3
 import typing
+from collections.abc import Iterator
 
-from constants import HISTORY_PATH
+import history_db
+import history_index
+from constants import HISTORY_BACKEND, HISTORY_PATH
 from logger.logger_setup import terminal_logger
+from output import echo, emit, flushed
+from ubuntu_commands import helper_functions
 
 
+@flushed
 def history(argument: list[str], flags: set[typing.Any] | None = None) -> int:
     """Показывает историю команд.
 
     Args:
         argument: Количество последних команд для показа (опционально)
-        flags: Флаги (не поддерживаются)
+            или шаблон для поиска с флагом 's'
+        flags: 's' - поиск по истории, 'i' - игнорировать регистр при поиске,
+            'S' - самые долгие команды за сегодня (только для sqlite)
 
     Returns:
         int: 0 при успехе, 1 при ошибке
     """
-    if not argument:
-        history_lines = open(HISTORY_PATH).readlines()
+    if flags and 'S' in flags:
+        return slowest_history(argument)
+
+    if flags and 's' in flags:
+        return search_history(argument, 'i' in flags)
 
-        for history_line in history_lines:
-            print(history_line, end='')
+    if not argument:
+        for history_line in all_history_lines():
+            emit(history_record(history_line), history_line, end='')
 
         terminal_logger.info('history: success')
         return 0
 
     elif len(argument) > 1:
-        print('-bash: history: too many arguments')
+        echo('-bash: history: too many arguments')
         terminal_logger.error(f'history: too many arguments: {argument}')
         return 1
 
@@ -32,14 +46,14 @@ def history(argument: list[str], flags: set[typing.Any] | None = None) -> int:
         try:
             number = int(argument[0])
         except ValueError:
-            print(f'-bash: history: {argument[0]}: numeric argument required')
+            echo(f'-bash: history: {argument[0]}: numeric argument required')
             terminal_logger.error(
                 f'history: {argument[0]}: numeric argument required'
             )
             return 1
 
         if number < 0:
-            print(f'-bash: history: {number}: invalid option')
+            echo(f'-bash: history: {number}: invalid option')
             terminal_logger.error(f'history: {number}: invalid option')
             return 1
 
@@ -48,19 +62,135 @@ def history(argument: list[str], flags: set[typing.Any] | None = None) -> int:
             return 0
 
         else:
-            history_lines = open(HISTORY_PATH).readlines()
-            last_line_number, *_ = history_lines[-1].split()
-            last_number = int(last_line_number[:-1])
-
-            if last_number < number:
-                number = last_number
-
-            for history_line in history_lines[last_number - number :]:
-                if number:
-                    print(history_line, end='')
-                    number -= 1
-                else:
-                    terminal_logger.info(f'history: {argument[0]} - success')
-                    return 0
+            history_lines = last_history_lines(number)
+
+            for history_line in history_lines:
+                emit(history_record(history_line), history_line, end='')
+
             terminal_logger.info(f'history: {argument[0]} - success')
             return 0
+
+
+def history_record(history_line: str) -> dict[str, typing.Any]:
+    """Собирает запись из строки истории.
+
+    Args:
+        history_line: Строка вида ``N. команда``
+
+    Returns:
+        dict[str, typing.Any]: Запись с полями number и command
+    """
+    number, _, command = history_line.rstrip('\n').partition('. ')
+    return {
+        'type': 'history',
+        'number': int(number) if number.isdigit() else None,
+        'command': command,
+    }
+
+
+def all_history_lines() -> Iterator[str]:
+    """Возвращает всю историю из выбранного хранилища.
+
+    Yields:
+        str: Строки истории вида ``N. команда``
+    """
+    if HISTORY_BACKEND == 'sqlite':
+        yield from history_db.all_records()
+        return
+
+    with open(HISTORY_PATH) as history_file:
+        yield from history_file
+
+
+def last_history_lines(number: int) -> list[str]:
+    """Возвращает последние number записей из выбранного хранилища.
+
+    Args:
+        number: Количество записей
+
+    Returns:
+        list[str]: Строки истории вида ``N. команда``
+    """
+    if HISTORY_BACKEND == 'sqlite':
+        return history_db.last_records(number)
+
+    return helper_functions.read_last_lines(HISTORY_PATH, number)
+
+
+def search_history(argument: list[str], ignore_case: bool) -> int:
+    """Ищет команды в истории по регулярному выражению через индекс.
+
+    Args:
+        argument: Шаблон для поиска
+        ignore_case: Игнорировать регистр
+
+    Returns:
+        int: 0 при успехе, 1 при ошибке
+    """
+    if len(argument) != 1:
+        echo('-bash: history: -s: pattern required')
+        terminal_logger.error(f'history: -s: pattern required: {argument}')
+        return 1
+
+    pattern = argument[0]
+
+    try:
+        if HISTORY_BACKEND == 'sqlite':
+            history_lines = history_db.search(pattern, ignore_case)
+        else:
+            history_lines = history_index.search(
+                HISTORY_PATH, pattern, ignore_case
+            )
+    except re.error as e:
+        echo(f'-bash: history: {pattern}: invalid pattern: {e}')
+        terminal_logger.error(f'history: {pattern}: invalid pattern: {e}')
+        return 1
+    except sqlite3.OperationalError as e:
+        echo(f'-bash: history: {pattern}: {e}')
+        terminal_logger.error(f'history: {pattern}: {e}')
+        return 1
+
+    for history_line in history_lines:
+        emit(history_record(history_line), history_line, end='')
+
+    terminal_logger.info(f'history: -s {pattern} - success')
+    return 0
+
+
+def slowest_history(argument: list[str]) -> int:
+    """Показывает самые долгие команды за сегодня.
+
+    Args:
+        argument: Количество команд
+
+    Returns:
+        int: 0 при успехе, 1 при ошибке
+    """
+    if HISTORY_BACKEND != 'sqlite':
+        echo('-bash: history: -S: requires the sqlite history backend')
+        terminal_logger.error('history: -S: requires the sqlite backend')
+        return 1
+
+    if len(argument) != 1 or not argument[0].isdigit():
+        echo('-bash: history: -S: numeric argument required')
+        terminal_logger.error(
+            f'history: -S: numeric argument required: {argument}'
+        )
+        return 1
+
+    for number, command, duration, exit_code in history_db.slowest(
+        int(argument[0])
+    ):
+        emit(
+            {
+                'type': 'history',
+                'number': number,
+                'command': command,
+                'duration': duration,
+                'exit_code': exit_code,
+            },
+            f'{number}. {command}  # {duration:.3f}s, exit {exit_code}',
+        )
+
+    terminal_logger.info(f'history: -S {argument[0]} - success')
+    return 0
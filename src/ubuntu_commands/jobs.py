@@ -0,0 +1,162 @@
+import typing
+
+import cancellation
+import job_control
+from logger.logger_setup import terminal_logger
+from output import current_sink, echo, emit, flush, flushed
+
+
+@flushed
+def jobs(arguments: list[str], flags: set[typing.Any] | None = None) -> int:
+    """Выводит фоновые задачи и их состояние.
+
+    Args:
+        arguments: Аргументы (не поддерживаются)
+        flags: Флаги (не поддерживаются)
+
+    Returns:
+        int: 0 при успехе, 1 при ошибке
+    """
+    if flags or arguments:
+        echo('-bash: jobs: does not support arguments')
+        terminal_logger.error(f'jobs: does not support: {arguments}')
+        return 1
+
+    for job in job_control.all_jobs():
+        emit(job_record(job), format_job)
+
+    terminal_logger.info('jobs - success')
+    return 0
+
+
+@flushed
+def fg(arguments: list[str], flags: set[typing.Any] | None = None) -> int:
+    """Выводит фоновую задачу на передний план и ждет ее завершения.
+
+    Сначала выводится все, что задача успела вывести в фоне, затем ее
+    вывод идет прямо в терминал, а вопросы задаются пользователю.
+    Ctrl-C во время fg отменяет задачу.
+
+    Args:
+        arguments: Номер задачи (по умолчанию последняя)
+        flags: Флаги (не поддерживаются)
+
+    Returns:
+        int: Код возврата задачи или 1, если задачи нет
+    """
+    if flags or len(arguments) > 1:
+        echo('-bash: fg: usage: fg [N]')
+        terminal_logger.error(f'fg: wrong arguments: {arguments}')
+        return 1
+
+    job = find_job('fg', arguments[0] if arguments else None)
+    if job is None:
+        return 1
+
+    echo(job.line)
+    flush()
+
+    token = cancellation.current()
+    if token is not None:
+        token.on_cancel(job.token.cancel)
+
+    job.sink.attach(current_sink())
+    exit_code = job.future.result()
+    job_control.remove(job)
+
+    terminal_logger.info(f'fg: [{job.number}] {job.line} - {exit_code}')
+    return exit_code
+
+
+@flushed
+def wait(arguments: list[str], flags: set[typing.Any] | None = None) -> int:
+    """Ждет завершения фоновых задач.
+
+    Вывод задач не печатается: его можно получить через fg.
+
+    Args:
+        arguments: Номера задач (по умолчанию все)
+        flags: Флаги (не поддерживаются)
+
+    Returns:
+        int: Код возврата последней задачи из аргументов, 0 без
+            аргументов или 127, если задачи нет
+    """
+    if flags:
+        echo(f'-bash: wait: does not support the flags: {", ".join(flags)}')
+        terminal_logger.error(
+            f'wait: does not support the flags: {", ".join(flags)}'
+        )
+        return 1
+
+    if not arguments:
+        job_control.wait_all()
+        terminal_logger.info('wait - success')
+        return 0
+
+    exit_code = 0
+    for argument in arguments:
+        job = find_job('wait', argument)
+        if job is None:
+            exit_code = 127
+            continue
+        job_control.wait_for([job])
+        exit_code = job.future.result()
+
+    terminal_logger.info(f'wait: {arguments} - {exit_code}')
+    return exit_code
+
+
+def find_job(command: str, argument: str | None) -> job_control.Job | None:
+    """Находит задачу по аргументу вида ``N`` или ``%N``.
+
+    Args:
+        command: Имя команды для сообщения об ошибке
+        argument: Номер задачи или None для последней
+
+    Returns:
+        job_control.Job | None: Задача или None, если ее нет
+    """
+    if argument is None:
+        job = job_control.get()
+        if job is None:
+            echo(f'-bash: {command}: current: no such job')
+            terminal_logger.error(f'{command}: current: no such job')
+        return job
+
+    number = argument.removeprefix('%')
+    job = job_control.get(int(number)) if number.isdigit() else None
+    if job is None:
+        echo(f'-bash: {command}: {argument}: no such job')
+        terminal_logger.error(f'{command}: {argument}: no such job')
+    return job
+
+
+def job_record(job: job_control.Job) -> dict[str, typing.Any]:
+    """Собирает запись о фоновой задаче.
+
+    Args:
+        job: Задача
+
+    Returns:
+        dict[str, typing.Any]: Запись с номером, строкой и состоянием
+    """
+    return {
+        'type': 'job',
+        'number': job.number,
+        'line': job.line,
+        'state': job.state,
+        'exit_code': job.exit_code,
+    }
+
+
+def format_job(record: dict[str, typing.Any]) -> str:
+    """Форматирует запись о задаче как jobs в bash.
+
+    Args:
+        record: Запись из job_record
+
+    Returns:
+        str: Строка вида ``[1]  Running    tar a.tar dir &``
+    """
+    return f'[{record["number"]}]  {record["state"]:<10} {record["line"]} &'
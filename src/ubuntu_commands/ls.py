@@ -1,11 +1,126 @@
+import concurrent.futures
+import dataclasses
 import datetime
+import functools
+import heapq
+import itertools
+import os
 import stat
 import typing
+from collections.abc import Callable, Iterable, Iterator
 from pathlib import Path
 
+import accounting
+import cancellation
+import stat_cache
+import workdir
+from constants import (
+    CANCEL_CHECK_LINES,
+    LS_OUTPUT_BATCH,
+    LS_PREFETCH,
+    LS_TIME_CACHE_SIZE,
+    LS_WORKERS,
+)
+from listing import CompactListing, Row
 from logger.logger_setup import terminal_logger
+from output import echo, emit, flushed, json_enabled
 
-correct_flags = {'l', 'a'}
+correct_flags = {'l', 'a', 'U', 'R', 'S', 't'}
+
+Order = Callable[[Iterable[os.DirEntry[str]]], Iterable[Row]]
+
+
+def make_record(
+    name: str,
+    path: str,
+    mode: int | None = None,
+    size: int = 0,
+    mtime: float = 0.0,
+) -> dict[str, typing.Any]:
+    """Собирает запись о файле из имени, пути и полей stat.
+
+    Args:
+        name: Имя файла
+        path: Путь к файлу
+        mode: st_mode для подробного формата или None
+        size: Размер в байтах
+        mtime: Время изменения
+
+    Returns:
+        dict[str, typing.Any]: Запись с полями name и path (и mode, size,
+            mtime, если задан mode)
+    """
+    record: dict[str, typing.Any] = {
+        'type': 'entry',
+        'name': name,
+        'path': path,
+    }
+
+    if mode is not None:
+        record['mode'] = stat.filemode(mode)
+        record['size'] = size
+        record['mtime'] = mtime
+
+    return record
+
+
+def entry_record(item_path: Path, long: bool = True) -> dict[str, typing.Any]:
+    """Собирает запись о файле для вывода ls.
+
+    Args:
+        item_path: Путь к файлу/директории
+        long: Добавить права, размер и время изменения
+
+    Returns:
+        dict[str, typing.Any]: Запись с полями name и path (и mode, size,
+            mtime для подробного формата)
+    """
+    if not long:
+        return make_record(item_path.name, str(item_path))
+
+    stat_info = stat_cache.stat_path(item_path)
+    return make_record(
+        item_path.name,
+        str(item_path),
+        stat_info.st_mode,
+        stat_info.st_size,
+        stat_info.st_mtime,
+    )
+
+
+@functools.lru_cache(maxsize=LS_TIME_CACHE_SIZE)
+def _format_minute(minute: int) -> str:
+    return datetime.datetime.fromtimestamp(minute * 60).strftime('%b %d %H:%M')
+
+
+def format_mtime(mtime: float) -> str:
+    """Форматирует время изменения с точностью до минуты.
+
+    Секунды в выводе не показываются, поэтому строка кэшируется по
+    номеру минуты: файлы директории обычно изменены в близкое время, и
+    strftime вызывается один раз на минуту, а не на файл.
+
+    Args:
+        mtime: Время изменения в секундах
+
+    Returns:
+        str: Дата вида ``Oct 17 04:07``
+    """
+    return _format_minute(int(mtime // 60))
+
+
+def render_long(record: dict[str, typing.Any]) -> str:
+    """Форматирует запись о файле для подробного вывода ls.
+
+    Args:
+        record: Запись из entry_record
+
+    Returns:
+        str: Отформатированная строка с правами, размером, датой и именем
+    """
+    date_time = format_mtime(record['mtime'])
+
+    return f'{record["mode"]} {record["size"]:>8} {date_time} {record["name"]}'
 
 
 def ls_long(item_path: Path) -> str:
@@ -17,27 +132,312 @@ def ls_long(item_path: Path) -> str:
     Returns:
         str: Отформатированная строка с правами, размером, датой и именем
     """
-    stat_info = item_path.stat()
+    return render_long(entry_record(item_path))
+
+
+def visible_entries(
+    scanner: Iterable[os.DirEntry[str]], show_all: bool
+) -> Iterator[os.DirEntry[str]]:
+    """Отбирает записи директории для вывода.
+
+    Args:
+        scanner: Записи из os.scandir
+        show_all: Показывать скрытые файлы
+
+    Yields:
+        os.DirEntry[str]: Записи в порядке файловой системы
+    """
+    for number, entry in enumerate(scanner, start=1):
+        if number % CANCEL_CHECK_LINES == 0:
+            cancellation.checkpoint()
+        if show_all or not entry.name.startswith('.'):
+            yield entry
+
+
+def entry_stat(entry: os.DirEntry[str]) -> os.stat_result:
+    """Возвращает stat записи директории с переходом по ссылкам.
+
+    DirEntry запоминает результат, поэтому повторный вызов не делает
+    системного вызова. Для битой ссылки возвращается stat самой ссылки.
+    Вызов учитывается в измерении ``time``, которому os.stat DirEntry
+    не виден.
+
+    Args:
+        entry: Запись директории
+
+    Returns:
+        os.stat_result: Результат stat
+    """
+    accounting.count_stat()
+    try:
+        return entry.stat()
+    except FileNotFoundError:
+        accounting.count_stat()
+        return entry.stat(follow_symlinks=False)
+
+
+def entry_row(entry: os.DirEntry[str], with_stat: bool = False) -> Row:
+    """Переводит запись директории в кортеж Row.
+
+    Args:
+        entry: Запись директории
+        with_stat: Заполнить права, размер и время изменения
+
+    Returns:
+        Row: Запись с признаком директории (ссылка им не считается)
+    """
+    is_dir = entry.is_dir(follow_symlinks=False)
+    if not with_stat:
+        return entry.name, is_dir, 0, 0, 0.0
+
+    stat_info = entry_stat(entry)
+    return (
+        entry.name,
+        is_dir,
+        stat_info.st_mode,
+        stat_info.st_size,
+        stat_info.st_mtime,
+    )
+
+
+def by_name(entry: os.DirEntry[str]) -> str:
+    """Ключ сортировки по имени."""
+    return entry.name
+
+
+def by_size(entry: os.DirEntry[str]) -> tuple[int, str]:
+    """Ключ сортировки: сначала большие файлы, при равенстве по имени."""
+    return -entry_stat(entry).st_size, entry.name
+
+
+def by_mtime(entry: os.DirEntry[str]) -> tuple[float, str]:
+    """Ключ сортировки: сначала новые файлы, при равенстве по имени."""
+    return -entry_stat(entry).st_mtime, entry.name
+
+
+ENTRY_KEYS: dict[str, Callable[[os.DirEntry[str]], typing.Any]] = {
+    'name': by_name,
+    'size': by_size,
+    'mtime': by_mtime,
+}
+
+
+def order_entries(
+    entries: Iterable[os.DirEntry[str]],
+    by: str = 'name',
+    top: int | None = None,
+    unsorted: bool = False,
+    with_stat: bool = False,
+) -> Iterable[Row]:
+    """Упорядочивает записи директории и оставляет первые top.
+
+    Полная сортировка идет в CompactListing: записи хранятся в
+    массивах, а не объектами DirEntry. С top записи не сортируются
+    целиком: heapq.nsmallest проходит их один раз и держит в куче
+    только top лучших, поэтому время - O(n log top), а память -
+    O(top) независимо от размера директории. Без сортировки (-U)
+    записи передаются дальше по мере чтения, с top - первые top.
+
+    Args:
+        entries: Записи директории
+        by: 'name', 'size' или 'mtime'
+        top: Сколько записей оставить или None для всех
+        unsorted: Не сортировать
+        with_stat: Заполнить в записях поля stat
+
+    Returns:
+        Iterable[Row]: Записи в порядке вывода
+    """
+    if unsorted:
+        rows = (entry_row(entry, with_stat) for entry in entries)
+        return rows if top is None else itertools.islice(rows, top)
+
+    if top is not None:
+        return [
+            entry_row(entry, with_stat)
+            for entry in heapq.nsmallest(top, entries, key=ENTRY_KEYS[by])
+        ]
+
+    with_stat = with_stat or by != 'name'
+    listing = CompactListing.from_rows(
+        (entry_row(entry, with_stat) for entry in entries), with_stat
+    )
+    listing.sort(by)
+    return listing
+
+
+def list_directory(
+    argument_path: Path, rows: Iterable[Row], long: bool
+) -> None:
+    """Выводит записи директории по мере их получения.
+
+    Args:
+        argument_path: Путь к директории, как его передали в ls
+        rows: Записи директории
+        long: Подробный формат
+    """
+    base = str(argument_path)
+    prefix = '' if base == '.' else os.path.join(base, '')
+
+    if long:
+        for name, _, mode, size, mtime in rows:
+            emit(
+                make_record(name, prefix + name, mode, size, mtime),
+                render_long,
+            )
+        return
+
+    if json_enabled():
+        for name, *_ in rows:
+            emit(make_record(name, prefix + name))
+        return
+
+    names = (row[0] for row in rows)
+    separator = ''
+    while batch := list(itertools.islice(names, LS_OUTPUT_BATCH)):
+        echo(separator + ' '.join(batch), end='')
+        separator = ' '
+    echo()
+
+
+@dataclasses.dataclass
+class Listing:
+    """Прочитанная директория для ls -R."""
+
+    rows: CompactListing
+    subdirectories: list[str]
+    error: str | None = None
+
+
+def read_directory(
+    path: str,
+    show_all: bool,
+    long: bool,
+    order: Order = order_entries,
+) -> Listing:
+    """Читает директорию для ls -R в потоке пула.
+
+    Для подробного формата stat записей вызывается здесь же, а
+    записи хранятся в CompactListing, пока основной поток не выведет
+    их.
+
+    Args:
+        path: Путь к директории, как его выводит ls
+        show_all: Показывать скрытые файлы
+        long: Подробный формат
+        order: Функция, упорядочивающая записи (см. order_entries)
+
+    Returns:
+        Listing: Записи, пути поддиректорий или текст ошибки
+    """
+    try:
+        with os.scandir(workdir.resolve(path)) as scanner:
+            rows = order(visible_entries(scanner, show_all))
+            if not isinstance(rows, CompactListing):
+                rows = CompactListing.from_rows(rows, long)
+    except OSError as e:
+        return Listing(CompactListing(), [], e.strerror)
 
-    permissions = stat.filemode(stat_info.st_mode)
+    return Listing(
+        rows,
+        [os.path.join(path, name) for name in rows.directory_names()],
+    )
+
+
+def walk_directories(
+    root: str, show_all: bool, long: bool, order: Order = order_entries
+) -> Iterator[tuple[str, Listing]]:
+    """Обходит дерево директорий в глубину, читая их в пуле потоков.
+
+    Директории возвращаются в том же порядке, что и при
+    последовательном обходе: каждая директория, затем ее
+    поддиректории по порядку. Пул заранее читает до LS_PREFETCH
+    директорий, которые будут выведены следующими, поэтому задержки
+    scandir на сетевых файловых системах перекрываются, а в памяти
+    держится ограниченное число прочитанных директорий. Ссылки на
+    директории не обходятся.
 
-    size = stat_info.st_size
+    Args:
+        root: Корень обхода
+        show_all: Показывать скрытые файлы и директории
+        long: Подробный формат
+        order: Функция, упорядочивающая записи
 
-    date_time = datetime.datetime.fromtimestamp(stat_info.st_mtime).strftime(
-        '%b %d %H:%M'
+    Yields:
+        tuple[str, Listing]: Путь директории и ее содержимое
+    """
+    executor = concurrent.futures.ThreadPoolExecutor(
+        max_workers=LS_WORKERS, thread_name_prefix='ls'
     )
+    pending: list[list[typing.Any]] = [[root, None]]
+    read = workdir.bind(accounting.bind(read_directory))
 
-    name = item_path.name
+    try:
+        while pending:
+            cancellation.checkpoint()
+            for item in pending[-LS_PREFETCH:]:
+                if item[1] is None:
+                    item[1] = executor.submit(
+                        read, item[0], show_all, long, order
+                    )
 
-    return f'{permissions} {size:>8} {date_time} {name}'
+            path, future = pending.pop()
+            listing = future.result()
+            yield path, listing
+
+            pending.extend(
+                [subdirectory, None]
+                for subdirectory in reversed(listing.subdirectories)
+            )
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
 
 
+def list_tree(
+    argument: str, show_all: bool, long: bool, order: Order = order_entries
+) -> None:
+    """Выводит дерево директорий для ls -R.
+
+    Args:
+        argument: Корень дерева, как его передали в ls
+        show_all: Показывать скрытые файлы и директории
+        long: Подробный формат
+        order: Функция, упорядочивающая записи
+    """
+    first = True
+    for path, listing in walk_directories(argument, show_all, long, order):
+        if listing.error is not None:
+            echo(f"ls: cannot open directory '{path}': {listing.error}")
+            terminal_logger.error(
+                f"ls: cannot open directory '{path}': {listing.error}"
+            )
+            continue
+
+        if not first and not json_enabled():
+            echo()
+        first = False
+
+        emit({'type': 'directory', 'path': path}, f'{path}/:')
+        list_directory(Path(path), listing.rows, long)
+
+
+@flushed
 def ls(arguments: list[str], flags: set[typing.Any] | None = None) -> int:
     """Выводит список файлов и директорий.
 
+    Директории читаются через os.scandir. С флагом -U записи выводятся
+    в порядке файловой системы по мере чтения, без сбора в список,
+    поэтому память не зависит от размера директории. С флагом -R
+    выводятся все поддиректории, их чтение идет в пуле потоков. С
+    ``--top N`` выводятся только N первых записей каждой директории,
+    отобранных через кучу без полной сортировки.
+
     Args:
         arguments: Пути для отображения (по умолчанию текущая директория)
-        flags: 'l' - подробный формат, 'a' - показывать скрытые файлы
+        flags: 'l' - подробный формат, 'a' - показывать скрытые файлы,
+            'U' - не сортировать, 'R' - рекурсивно, 'S' - по размеру,
+            't' - по времени изменения (при обоих - по времени),
+            'top=N' - только N первых записей
 
     Returns:
         int: 0 при успехе, 1 при ошибке
@@ -45,8 +445,18 @@ def ls(arguments: list[str], flags: set[typing.Any] | None = None) -> int:
     if flags is None:
         flags = set()
 
+    top = None
+    for flag in [flag for flag in flags if flag.startswith('top=')]:
+        flags.discard(flag)
+        value = flag.partition('=')[2]
+        if not (value.isascii() and value.isdigit()):
+            echo(f"ls: invalid number of entries: '{value}'")
+            terminal_logger.error(f"ls: invalid number of entries: '{value}'")
+            return 1
+        top = int(value)
+
     if not flags.issubset(correct_flags):
-        print(
+        echo(
             'ls: does not support the flags:',
             f' {", ".join(flags.difference(correct_flags))}',
         )
@@ -58,54 +468,79 @@ def ls(arguments: list[str], flags: set[typing.Any] | None = None) -> int:
 
     All = False
     long = False
+    unsorted = False
+    recursive = False
 
     if 'l' in flags:
         long = True
     if 'a' in flags:
         All = True
+    if 'U' in flags:
+        unsorted = True
+    if 'R' in flags:
+        recursive = True
+
+    by = 'name'
+    if 'S' in flags:
+        by = 'size'
+    if 't' in flags:
+        by = 'mtime'
+    order = functools.partial(
+        order_entries, by=by, top=top, unsorted=unsorted, with_stat=long
+    )
 
     if not arguments:
         arguments = ['.']
 
     for argument in arguments:
-        argument_path = Path(argument)
+        argument_path = workdir.resolve(argument)
 
-        if not argument_path.exists():
-            print(f"ls: cannot access '{argument}': No such file or directory")
+        if not stat_cache.exists(argument_path):
+            echo(f"ls: cannot access '{argument}': No such file or directory")
             terminal_logger.error(
                 f"ls: cannot access '{argument}': No such file or directory"
             )
             continue
 
-        if argument_path.is_file():
-            if long:
-                print(ls_long(argument_path))
-            else:
-                print(argument)
+        if stat_cache.is_file(argument_path):
+            record = entry_record(argument_path, long)
+            record['path'] = str(Path(argument))
+            emit(record, render_long if long else argument)
 
-        elif argument_path.is_dir():
-            items = []
+        elif recursive and stat_cache.is_dir(argument_path):
+            list_tree(argument, All, long, order)
 
-            for item in argument_path.iterdir():
-                if not All and item.name.startswith('.'):
-                    continue
-                items.append(item)
+            if (
+                len(arguments) > 1
+                and argument != arguments[-1]
+                and not json_enabled()
+            ):
+                echo()
 
-            items.sort(key=lambda x: x.name)
+        elif stat_cache.is_dir(argument_path):
+            try:
+                scanner = os.scandir(argument_path)
+            except OSError as e:
+                echo(f"ls: cannot open directory '{argument}': {e.strerror}")
+                terminal_logger.error(
+                    f"ls: cannot open directory '{argument}': {e.strerror}"
+                )
+                continue
 
             if len(arguments) > 1:
-                print(f'{argument}/:')
-
-            if long:
-                for item in items:
-                    print(ls_long(item))
+                emit({'type': 'directory', 'path': argument}, f'{argument}/:')
 
-            else:
-                item_names = ' '.join([item.name for item in items])
-                print(item_names)
+            with scanner:
+                list_directory(
+                    Path(argument), order(visible_entries(scanner, All)), long
+                )
 
-            if len(arguments) > 1 and argument != arguments[-1]:
-                print()
+            if (
+                len(arguments) > 1
+                and argument != arguments[-1]
+                and not json_enabled()
+            ):
+                echo()
 
     terminal_logger.info(f'ls: {" ".join(arguments)} - success')
     return 0
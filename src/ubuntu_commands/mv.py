@@ -2,11 +2,15 @@ import shutil
 import typing
 from pathlib import Path
 
+import stat_cache
+import workdir
 from constants import FOR_UNDO_HISTORY
-from logger.logger_setup import terminal_logger
+from logger.command_summary import CommandSummary
+from output import echo, emit, flushed
 from ubuntu_commands import helper_functions
 
 
+@flushed
 def mv(arguments: list[str], flags: set[typing.Any] | None = None) -> int:
     """Перемещает или переименовывает файлы и директории.
 
@@ -17,17 +21,36 @@ def mv(arguments: list[str], flags: set[typing.Any] | None = None) -> int:
     Returns:
         int: 0 при успехе, 1 при ошибке
     """
+    with CommandSummary('mv') as summary:
+        return _mv(arguments, flags, summary)
+
+
+def _mv(
+    arguments: list[str],
+    flags: set[typing.Any] | None,
+    summary: CommandSummary,
+) -> int:
+    """Выполняет mv, учитывая результаты в summary.
+
+    Args:
+        arguments: Аргументы команды
+        flags: Флаги команды
+        summary: Счетчики команды
+
+    Returns:
+        int: Код возврата команды
+    """
     if not flags:
         if not arguments:
-            print('mv: missing file operand')
-            terminal_logger.error('mv: missing file operand')
+            echo('mv: missing file operand')
+            summary.error('mv: missing file operand')
             return 1
 
         if len(arguments) == 1:
-            print(
+            echo(
                 f"mv: missing destination file operand after '{arguments[0]}'"
             )
-            terminal_logger.error(
+            summary.error(
                 f"mv: missing destination file operand after '{arguments[0]}'"
             )
             return 1
@@ -38,50 +61,59 @@ def mv(arguments: list[str], flags: set[typing.Any] | None = None) -> int:
             first_item = arguments[0]
             second_item = arguments[1]
 
-            if not Path(first_item).exists():
-                print(
+            if not stat_cache.exists(workdir.resolve(first_item)):
+                echo(
                     f"mv: cannot stat '{first_item}':",
                     ' No such file or directory',
                 )
-                terminal_logger.error(
-                    f"mv: cannot stat '{first_item}':",
-                    ' No such file or directory',
+                summary.error(
+                    f"mv: cannot stat '{first_item}':"
+                    + ' No such file or directory',
                 )
                 return 1
 
-            first_path = Path(first_item)
-            second_path = Path(second_item)
+            first_path = workdir.resolve(first_item)
+            second_path = workdir.resolve(second_item)
 
-            if first_path.is_dir():
-                if second_path.exists():
-                    if second_path.is_dir():
+            if stat_cache.is_dir(first_path):
+                if stat_cache.exists(second_path):
+                    if stat_cache.is_dir(second_path):
                         final_dest = second_path / first_path.name
                         try:
                             shutil.move(str(first_path), str(final_dest))
                             mv_items.append(str(first_path))
                             mv_items.append(str(final_dest))
-                            terminal_logger.info(
-                                f'mv: {first_item} -> {final_dest} - success'
+                            summary.item(
+                                'mv: %s -> %s - success',
+                                first_item,
+                                final_dest,
+                            )
+                            emit(
+                                {
+                                    'type': 'moved',
+                                    'source': first_item,
+                                    'destination': str(final_dest),
+                                }
                             )
 
                         except Exception as e:
-                            print(
+                            echo(
                                 f"mv: cannot move '{first_item}'",
                                 f" to '{final_dest}': {e}",
                             )
-                            terminal_logger.error(
-                                f"mv: cannot move '{first_item}'",
-                                f" to '{final_dest}': {e}",
+                            summary.error(
+                                f"mv: cannot move '{first_item}'"
+                                + f" to '{final_dest}': {e}",
                             )
                             return 1
                     else:
-                        print(
+                        echo(
                             'mv: cannot overwrite non-directory ',
                             f"'{second_item}' with directory '{first_item}'",
                         )
-                        terminal_logger.error(
-                            'mv: cannot overwrite non-directory ',
-                            f"'{second_item}' with directory '{first_item}'",
+                        summary.error(
+                            'mv: cannot overwrite non-directory '
+                            + f"'{second_item}' with directory '{first_item}'",
                         )
                         return 1
                 else:
@@ -93,47 +125,65 @@ def mv(arguments: list[str], flags: set[typing.Any] | None = None) -> int:
                             shutil.move(str(first_path), str(second_path))
                             mv_items.append(str(first_path))
                             mv_items.append(str(second_path))
-                            terminal_logger.info(
-                                f'mv: {first_item} -> {second_item} - success'
+                            summary.item(
+                                'mv: %s -> %s - success',
+                                first_item,
+                                second_item,
+                            )
+                            emit(
+                                {
+                                    'type': 'moved',
+                                    'source': first_item,
+                                    'destination': str(second_item),
+                                }
                             )
 
                         except Exception as e:
-                            print(
+                            echo(
                                 f"mv: cannot move '{first_item}'",
                                 f" to '{second_item}': {e}",
                             )
-                            terminal_logger.error(
-                                f"mv: cannot move '{first_item}'",
-                                f" to '{second_item}': {e}",
+                            summary.error(
+                                f"mv: cannot move '{first_item}'"
+                                + f" to '{second_item}': {e}",
                             )
                             return 1
                     else:
-                        print(
+                        echo(
                             f"mv: invalid directory name '{second_path.name}'"
                         )
-                        terminal_logger.error(
+                        summary.error(
                             f"mv: invalid directory name '{second_path.name}'"
                         )
                         return 1
 
-            elif first_path.is_file():
-                if second_path.exists() and second_path.is_dir():
+            elif stat_cache.is_file(first_path):
+                if stat_cache.exists(second_path) and stat_cache.is_dir(
+                    second_path
+                ):
                     try:
                         shutil.move(str(first_path), str(second_path))
                         mv_items.append(str(first_path))
                         mv_items.append(str(second_path))
-                        terminal_logger.info(
-                            f'mv: {first_item} -> {second_item} - success'
+                        summary.item(
+                            'mv: %s -> %s - success', first_item, second_item
+                        )
+                        emit(
+                            {
+                                'type': 'moved',
+                                'source': first_item,
+                                'destination': str(second_item),
+                            }
                         )
 
                     except Exception as e:
-                        print(
+                        echo(
                             f"mv: cannot move '{first_item}'",
                             f" to '{second_item}': {e}",
                         )
-                        terminal_logger.error(
-                            f"mv: cannot move '{first_item}'",
-                            f" to '{second_item}': {e}",
+                        summary.error(
+                            f"mv: cannot move '{first_item}'"
+                            + f" to '{second_item}': {e}",
                         )
                         return 1
                 else:
@@ -142,56 +192,61 @@ def mv(arguments: list[str], flags: set[typing.Any] | None = None) -> int:
                         shutil.move(str(first_path), str(second_path))
                         mv_items.append(str(first_path))
                         mv_items.append(str(second_path))
-                        terminal_logger.info(
-                            f'mv: {first_item}', f' -> {second_item} - success'
+                        summary.item(
+                            'mv: %s -> %s - success', first_item, second_item
+                        )
+                        emit(
+                            {
+                                'type': 'moved',
+                                'source': first_item,
+                                'destination': str(second_item),
+                            }
                         )
 
                     except Exception as e:
-                        print(
+                        echo(
                             f"mv: cannot move '{first_item}'",
                             f" to '{second_item}': {e}",
                         )
-                        terminal_logger.error(
-                            f"mv: cannot move '{first_item}'",
-                            f" to '{second_item}': {e}",
+                        summary.error(
+                            f"mv: cannot move '{first_item}'"
+                            + f" to '{second_item}': {e}",
                         )
                         return 1
             else:
-                print(
+                echo(
                     f"mv: cannot move '{first_item}':",
                     ' No such file or directory',
                 )
-                terminal_logger.error(
-                    f"mv: cannot move '{first_item}':",
-                    ' No such file or directory',
+                summary.error(
+                    f"mv: cannot move '{first_item}':"
+                    + ' No such file or directory',
                 )
                 return 1
 
         else:
             last_item = arguments[-1]
-            last_path = Path(last_item)
+            last_path = workdir.resolve(last_item)
 
-            if not last_path.exists():
-                print(f"mv: target '{last_item}': No such file or directory")
-                terminal_logger.error(
+            if not stat_cache.exists(last_path):
+                echo(f"mv: target '{last_item}': No such file or directory")
+                summary.error(
                     f"mv: target '{last_item}': No such file or directory"
                 )
                 return 1
 
-            if not last_path.is_dir():
-                print(f"mv: target '{last_item}' is not a directory")
-                terminal_logger.error(
-                    f"mv: target '{last_item}' is not a directory"
-                )
+            if not stat_cache.is_dir(last_path):
+                echo(f"mv: target '{last_item}' is not a directory")
+                summary.error(f"mv: target '{last_item}' is not a directory")
                 return 1
 
             for item in arguments[:-1]:
-                item_path = Path(item)
-                if not item_path.exists():
-                    print(
+                item_path = workdir.resolve(item)
+                if not stat_cache.exists(item_path):
+                    echo(
                         f"mv: cannot stat '{item}': No such file or directory"
                     )
-                    terminal_logger.error(
+                    summary.error(
                         f"mv: cannot stat '{item}': No such file or directory"
                     )
                     continue
@@ -199,13 +254,19 @@ def mv(arguments: list[str], flags: set[typing.Any] | None = None) -> int:
                 try:
                     final_path = last_path / item_path.name
                     shutil.move(str(item_path), str(final_path))
+                    stat_cache.invalidate()
                     mv_items.append(str(item_path))
-                    terminal_logger.info(
-                        f'mv: {item} -> {final_path} - success'
+                    summary.item('mv: %s -> %s - success', item, final_path)
+                    emit(
+                        {
+                            'type': 'moved',
+                            'source': item,
+                            'destination': str(final_path),
+                        }
                     )
                 except Exception as e:
-                    print(f"mv: cannot move '{item}' to '{final_path}': {e}")
-                    terminal_logger.error(
+                    echo(f"mv: cannot move '{item}' to '{final_path}': {e}")
+                    summary.error(
                         f"mv: cannot move '{item}' to '{final_path}': {e}"
                     )
                     continue
@@ -215,10 +276,9 @@ def mv(arguments: list[str], flags: set[typing.Any] | None = None) -> int:
 
         if mv_items:
             FOR_UNDO_HISTORY.append(['mv'] + mv_items + [Path('.')])
+
         return 0
 
-    print(f'mv: does not support the flags: {", ".join(flags)}')
-    terminal_logger.error(
-        f'mv: does not support the flags: {", ".join(flags)}'
-    )
+    echo(f'mv: does not support the flags: {", ".join(flags)}')
+    summary.error(f'mv: does not support the flags: {", ".join(flags)}')
     return 1
@@ -0,0 +1,291 @@
+import cProfile
+import itertools
+import os
+import pstats
+import shlex
+import time
+import tracemalloc
+import typing
+from pathlib import Path
+
+import parser
+from constants import PROFILE_DIR, PROFILE_MAX_DEPTH, PROFILE_TOP
+from logger.logger_setup import terminal_logger
+from output import echo, emit, flush, flushed, json_enabled
+
+correct_flags = {'m'}
+
+Function = tuple[str, int, str]
+
+_sequence = itertools.count(1)
+
+
+@flushed
+def profile_(
+    arguments: list[str], flags: set[typing.Any] | None = None
+) -> int:
+    """Выполняет команду под cProfile и выводит самые долгие функции.
+
+    Статистика сохраняется в PROFILE_DIR в формате pstats (для
+    ``python -m pstats`` и snakeviz) и в формате свернутых стеков (для
+    flamegraph.pl и speedscope).
+
+    Args:
+        arguments: Команда и ее аргументы
+        flags: Флаги:
+            'm' (--mem) - еще и места выделения памяти через tracemalloc
+
+    Returns:
+        int: Код возврата команды или 1 при ошибке самого profile
+    """
+    flags = flags or set()
+    if not flags.issubset(correct_flags):
+        echo(
+            'profile: does not support the flags: '
+            f'{", ".join(flags - correct_flags)}'
+        )
+        terminal_logger.error(f'profile: does not support the flags: {flags}')
+        return 1
+
+    if not arguments:
+        echo('Usage: profile [--mem] COMMAND [ARG]...')
+        terminal_logger.error('profile: insufficient arguments')
+        return 1
+
+    line = shlex.join(arguments)
+    try:
+        command = typing.cast(parser.Command, parser.compile_line(line))
+    except ValueError as e:
+        echo(f'profile: {e}')
+        terminal_logger.error(f'profile: {e}')
+        return 1
+
+    memory = 'm' in flags
+    started_tracing = memory and not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError as e:
+        echo(f'profile: {e}')
+        terminal_logger.error(f'profile: {e}')
+        return 1
+
+    try:
+        return command.run()
+
+    finally:
+        profiler.disable()
+        snapshot = tracemalloc.take_snapshot() if memory else None
+        if started_tracing:
+            tracemalloc.stop()
+
+        flush()
+        report(profiler, snapshot, line)
+
+
+def report(
+    profiler: cProfile.Profile,
+    snapshot: tracemalloc.Snapshot | None,
+    line: str,
+) -> None:
+    """Выводит самые долгие функции и места выделения памяти и сохраняет
+    статистику в файлы.
+
+    Ошибка сохранения выводится и записывается в лог, но не заменяет
+    код возврата и ошибку самой команды.
+
+    Args:
+        profiler: Остановленный профилировщик
+        snapshot: Снимок tracemalloc или None без ``--mem``
+        line: Строка профилируемой команды
+    """
+    stats = pstats.Stats(profiler)
+    entries: dict[Function, tuple] = stats.stats  # type: ignore[attr-defined]
+
+    hotspots = sorted(entries.items(), key=lambda item: -item[1][2])
+    if not json_enabled():
+        echo(f'{"ncalls":>9} {"tottime":>10} {"cumtime":>10}  function')
+    for function, (_, calls, own, total, _) in hotspots[:PROFILE_TOP]:
+        emit(
+            {
+                'type': 'hotspot',
+                'function': function_name(function),
+                'calls': calls,
+                'tottime': own,
+                'cumtime': total,
+            },
+            format_hotspot,
+        )
+
+    if snapshot is not None:
+        if not json_enabled():
+            echo(f'{"size":>9} {"blocks":>8}  allocation site')
+        for statistic in snapshot.statistics('lineno')[:PROFILE_TOP]:
+            frame = statistic.traceback[0]
+            emit(
+                {
+                    'type': 'allocation',
+                    'site': f'{Path(frame.filename).name}:{frame.lineno}',
+                    'size': statistic.size,
+                    'count': statistic.count,
+                },
+                format_allocation,
+            )
+
+    try:
+        pstats_path, collapsed_path = save(stats, entries, line)
+    except Exception as e:
+        echo(f'profile: cannot save profile: {e}')
+        terminal_logger.error(f'profile: cannot save profile: {e}')
+        return
+
+    emit(
+        {
+            'type': 'profile',
+            'line': line,
+            'pstats': str(pstats_path),
+            'collapsed': str(collapsed_path),
+        },
+        lambda record: f'profile: {record["pstats"]}, {record["collapsed"]}',
+    )
+    terminal_logger.info(f'profile: {line} - {pstats_path}')
+
+
+def save(
+    stats: pstats.Stats, entries: dict[Function, tuple], line: str
+) -> tuple[Path, Path]:
+    """Сохраняет статистику в PROFILE_DIR.
+
+    Имя файла - время, pid процесса, номер профиля в процессе и
+    команда, поэтому профили одной команды, снятые в одну секунду, не
+    перезаписывают друг друга.
+
+    Args:
+        stats: Статистика профилировщика
+        entries: Статистика pstats.Stats.stats
+        line: Строка профилируемой команды
+
+    Returns:
+        tuple[Path, Path]: Пути файлов pstats и свернутых стеков
+
+    Raises:
+        OSError: Если файлы нельзя записать
+    """
+    PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+    base = PROFILE_DIR / (
+        f'{time.strftime("%Y%m%d-%H%M%S")}-{os.getpid()}'
+        f'-{next(_sequence)}-{line.split()[0]}'
+    )
+    pstats_path = base.with_suffix('.pstats')
+    collapsed_path = base.with_suffix('.collapsed')
+
+    stats.dump_stats(pstats_path)
+    with open(collapsed_path, 'w', encoding='utf-8') as collapsed_file:
+        for stack, microseconds in collapsed_stacks(entries):
+            collapsed_file.write(f'{stack} {microseconds}\n')
+
+    return pstats_path, collapsed_path
+
+
+def function_name(function: Function) -> str:
+    """Форматирует функцию из статистики cProfile.
+
+    Args:
+        function: Ключ статистики (файл, строка, имя)
+
+    Returns:
+        str: ``ls.py:38(render_long)`` или имя встроенной функции
+    """
+    filename, lineno, name = function
+    if filename == '~':
+        return name
+    return f'{Path(filename).name}:{lineno}({name})'
+
+
+def collapsed_stacks(
+    entries: dict[Function, tuple],
+) -> typing.Iterator[tuple[str, int]]:
+    """Строит свернутые стеки из статистики cProfile.
+
+    cProfile хранит только пары вызывающий - вызываемый, поэтому стеки
+    восстанавливаются обходом от корней, а время функции делится между
+    вызывающими пропорционально времени вызовов из каждого. Рекурсия
+    обрезается, а стеки глубже PROFILE_MAX_DEPTH не строятся.
+
+    Args:
+        entries: Статистика pstats.Stats.stats
+
+    Yields:
+        tuple[str, int]: Стек ``a;b;c`` и собственное время в
+            микросекундах
+    """
+    children: dict[Function, dict[Function, float]] = {}
+    for function, (*_, callers) in entries.items():
+        for caller, edge in callers.items():
+            children.setdefault(caller, {})[function] = edge[3]
+
+    roots = [
+        function
+        for function, (*_, callers) in entries.items()
+        if not any(caller in entries for caller in callers)
+    ]
+
+    def walk(
+        function: Function,
+        stack: tuple[str, ...],
+        share: float,
+        path: set[Function],
+    ) -> typing.Iterator[tuple[str, int]]:
+        _, _, own, total, _ = entries[function]
+        stack = stack + (function_name(function),)
+
+        microseconds = round(own * share * 1_000_000)
+        if microseconds:
+            yield ';'.join(stack), microseconds
+
+        if len(stack) >= PROFILE_MAX_DEPTH or not total:
+            return
+
+        for child, edge_total in children.get(function, {}).items():
+            child_total = entries[child][3]
+            if child in path or not child_total:
+                continue
+            child_share = share * min(edge_total / child_total, 1.0)
+            if child_share * child_total * 1_000_000 < 1:
+                continue
+            path.add(child)
+            yield from walk(child, stack, child_share, path)
+            path.discard(child)
+
+    for root in roots:
+        yield from walk(root, (), 1.0, {root})
+
+
+def format_hotspot(record: dict[str, typing.Any]) -> str:
+    """Форматирует запись о функции как строку pstats.
+
+    Args:
+        record: Запись hotspot
+
+    Returns:
+        str: Число вызовов, собственное и общее время и функция
+    """
+    return (
+        f'{record["calls"]:>9} {record["tottime"]:>10.6f} '
+        f'{record["cumtime"]:>10.6f}  {record["function"]}'
+    )
+
+
+def format_allocation(record: dict[str, typing.Any]) -> str:
+    """Форматирует запись о месте выделения памяти.
+
+    Args:
+        record: Запись allocation
+
+    Returns:
+        str: Размер, число блоков и место выделения
+    """
+    return f'{record["size"]:>9} {record["count"]:>8}  {record["site"]}'
@@ -2,12 +2,18 @@ import shutil
 import typing
 from pathlib import Path
 
+import stat_cache
+import workdir
 from constants import FOR_UNDO_HISTORY, TRASH_PATH
+from logger.command_summary import CommandSummary
 from logger.logger_setup import terminal_logger
+from output import ask, echo, emit, flushed
+from ubuntu_commands import helper_functions
 
 correct_flags = {'r'}
 
 
+@flushed
 def rm(arguments: list[str], flags: set[typing.Any] | None = None) -> int:
     """Удаляет файлы и директории.
 
@@ -18,23 +24,42 @@ def rm(arguments: list[str], flags: set[typing.Any] | None = None) -> int:
     Returns:
         int: 0 при успехе, 1 при ошибке
     """
+    with CommandSummary('rm') as summary:
+        return _rm(arguments, flags, summary)
+
+
+def _rm(
+    arguments: list[str],
+    flags: set[typing.Any] | None,
+    summary: CommandSummary,
+) -> int:
+    """Выполняет rm, учитывая результаты в summary.
+
+    Args:
+        arguments: Аргументы команды
+        flags: Флаги команды
+        summary: Счетчики команды
+
+    Returns:
+        int: Код возврата команды
+    """
     if flags is None:
         flags = set()
 
     if not flags.issubset(correct_flags):
-        print(
+        echo(
             'rm: does not support the flags:',
             f' {", ".join(flags.difference(correct_flags))}',
         )
-        terminal_logger.error(
-            'rm: does not support the flags:',
-            f' {", ".join(flags.difference(correct_flags))}',
+        summary.error(
+            'rm: does not support the flags:'
+            + f' {", ".join(flags.difference(correct_flags))}',
         )
         return 1
 
     if not arguments:
-        print('rm: missing operand')
-        terminal_logger.error('rm: missing operand')
+        echo('rm: missing operand')
+        summary.error('rm: missing operand')
         return 1
 
     rm_items = []
@@ -43,96 +68,115 @@ def rm(arguments: list[str], flags: set[typing.Any] | None = None) -> int:
     if 'r' in flags:
         recursive = True
 
-    for argument in arguments:
-        argument_path = Path(argument)
-
-        if not argument_path.exists():
-            print(f"rm: cannot remove '{argument}': No such file or directory")
-            terminal_logger.error(
-                f"rm: cannot remove '{argument}': No such file or directory"
-            )
-            continue
-
-        if argument_path.is_dir():
-            if not recursive:
-                print(f'rm: cannot remove {argument}: Is a directory')
-                terminal_logger.error(
-                    f'rm: cannot remove {argument}: Is a directory'
-                )
-                continue
-
-            forbidden_path = argument_path.resolve()
-            current_dir = Path('.').resolve()
+    try:
+        for argument in arguments:
+            argument_path = workdir.resolve(argument)
 
-            if forbidden_path == forbidden_path.root:
-                print(
-                    f"rm: cannot remove '{argument}':",
-                    ' Permission denied - root directory',
+            if not stat_cache.exists(argument_path):
+                echo(
+                    f"rm: cannot remove '{argument}':"
+                    ' No such file or directory'
                 )
-                terminal_logger.error(
-                    f"rm: attempt to remove root directory '{argument}'"
+                summary.error(
+                    f"rm: cannot remove '{argument}':"
+                    ' No such file or directory'
                 )
                 continue
 
-            if forbidden_path == current_dir.parent:
-                print(
-                    f"rm: cannot remove '{argument}':",
-                    ' Permission denied - parent directory',
-                )
-                terminal_logger.error(
-                    f"rm: attempt to remove parent directory '{argument}'"
+            if stat_cache.is_dir(argument_path):
+                if not recursive:
+                    echo(f'rm: cannot remove {argument}: Is a directory')
+                    summary.error(
+                        f'rm: cannot remove {argument}: Is a directory'
+                    )
+                    continue
+
+                forbidden_path = argument_path.resolve()
+                current_dir = workdir.resolve('.').resolve()
+
+                if forbidden_path == forbidden_path.root:
+                    echo(
+                        f"rm: cannot remove '{argument}':",
+                        ' Permission denied - root directory',
+                    )
+                    summary.error(
+                        f"rm: attempt to remove root directory '{argument}'"
+                    )
+                    continue
+
+                if forbidden_path == current_dir.parent:
+                    echo(
+                        f"rm: cannot remove '{argument}':",
+                        ' Permission denied - parent directory',
+                    )
+                    summary.error(
+                        f"rm: attempt to remove parent directory '{argument}'"
+                    )
+                    continue
+
+                answer = (
+                    ask(f"rm: remove directory '{argument}'? [y/n] ")
+                    .strip()
+                    .lower()
                 )
-                continue
-
-            answer = (
-                input(f"rm: remove directory '{argument}'? [y/n] ")
-                .strip()
-                .lower()
-            )
-
-            if answer not in ('y', 'yes'):
-                print(f"rm: skipping directory '{argument}'")
-                terminal_logger.info(f"rm: skipping directory '{argument}'")
-                continue
-
-            try:
-                trash_argument_path = TRASH_PATH / argument_path.name
-
-                if trash_argument_path.exists():
-                    if trash_argument_path.is_dir():
-                        shutil.rmtree(trash_argument_path)
-                    else:
-                        trash_argument_path.unlink()
 
-                rm_items.append(str(argument_path))
-                shutil.copytree(argument_path, trash_argument_path)
-                shutil.rmtree(argument_path)
-                terminal_logger.info(f'rm: {argument} - success')
-
-            except Exception as e:
-                print(f"rm: cannot remove '{argument}': {e}")
-                terminal_logger.error(f"rm: cannot remove '{argument}': {e}")
-                continue
-
-        elif argument_path.is_file():
-            try:
-                rm_items.append(str(argument_path))
-                shutil.copy2(argument_path, TRASH_PATH)
-                argument_path.unlink()
-                terminal_logger.info(f'rm: {argument} - success')
-
-            except Exception as e:
-                print(f"rm: cannot remove '{argument}': {e}")
-                terminal_logger.error(f"rm: cannot remove '{argument}': {e}")
+                if answer not in ('y', 'yes'):
+                    echo(f"rm: skipping directory '{argument}'")
+                    terminal_logger.info(
+                        f"rm: skipping directory '{argument}'"
+                    )
+                    continue
+
+                try:
+                    TRASH_PATH.mkdir(exist_ok=True)
+                    trash_argument_path = TRASH_PATH / argument_path.name
+
+                    if stat_cache.exists(trash_argument_path):
+                        if stat_cache.is_dir(trash_argument_path):
+                            shutil.rmtree(trash_argument_path)
+                        else:
+                            trash_argument_path.unlink()
+
+                    helper_functions.copy_tree(
+                        argument_path, trash_argument_path, summary.copy2
+                    )
+                    rm_items.append(str(argument_path))
+                    shutil.rmtree(argument_path)
+                    stat_cache.invalidate()
+                    summary.item('rm: %s - success', argument)
+                    emit({'type': 'removed', 'path': argument})
+
+                except Exception as e:
+                    echo(f"rm: cannot remove '{argument}': {e}")
+                    summary.error(f"rm: cannot remove '{argument}': {e}")
+                    continue
+
+            elif stat_cache.is_file(argument_path):
+                try:
+                    TRASH_PATH.mkdir(exist_ok=True)
+                    summary.copy2(argument_path, TRASH_PATH)
+                    rm_items.append(str(argument_path))
+                    argument_path.unlink()
+                    stat_cache.invalidate()
+                    summary.item('rm: %s - success', argument)
+                    emit({'type': 'removed', 'path': argument})
+
+                except Exception as e:
+                    echo(f"rm: cannot remove '{argument}': {e}")
+                    summary.error(f"rm: cannot remove '{argument}': {e}")
+                    continue
+            else:
+                echo(
+                    f"rm: cannot remove '{argument}':"
+                    ' No such file or directory'
+                )
+                summary.error(
+                    f"rm: cannot remove '{argument}':"
+                    ' No such file or directory'
+                )
                 continue
-        else:
-            print(f"rm: cannot remove '{argument}': No such file or directory")
-            terminal_logger.error(
-                f"rm: cannot remove '{argument}': No such file or directory"
-            )
-            continue
-
-    if rm_items:
-        FOR_UNDO_HISTORY.append(['rm'] + rm_items + [Path('.')])
+    finally:
+        if rm_items:
+            FOR_UNDO_HISTORY.append(['rm'] + rm_items + [Path('.')])
 
     return 0
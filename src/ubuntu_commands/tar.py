@@ -2,10 +2,13 @@ import shutil
 import typing
 from pathlib import Path
 
+import workdir
 from logger.logger_setup import terminal_logger
+from output import echo, flushed
 from ubuntu_commands import helper_functions
 
 
+@flushed
 def tar(arguments: list[str], flags: set[typing.Any] | None = None) -> int:
     """Создает tar-архив из файлов и директорий.
 
@@ -18,22 +21,22 @@ def tar(arguments: list[str], flags: set[typing.Any] | None = None) -> int:
     """
     if not flags:
         if len(arguments) == 2:
-            print('tar: missing arguments')
+            echo('tar: missing arguments')
             terminal_logger.error('tar: missing arguments')
             return 1
 
         if len(arguments) == 1:
             archive_name = arguments[0]
-            argument_path = Path(archive_name)
+            argument_path = workdir.resolve(archive_name)
 
             if not argument_path.exists():
-                print(
+                echo(
                     f"tar: cannot stat '{archive_name}':",
                     ' No such file or directory',
                 )
                 terminal_logger.error(
-                    f"tar: cannot stat '{archive_name}':",
-                    ' No such file or directory',
+                    f"tar: cannot stat '{archive_name}':"
+                    + ' No such file or directory',
                 )
                 return 1
 
@@ -45,7 +48,7 @@ def tar(arguments: list[str], flags: set[typing.Any] | None = None) -> int:
             archive_name = Path(archive_name).stem
 
         if not helper_functions.is_valid_filename(archive_name):
-            print(f"tar: invalid archive name '{archive_name}'")
+            echo(f"tar: invalid archive name '{archive_name}'")
             terminal_logger.error(
                 f"tar: invalid archive name '{archive_name}'"
             )
@@ -53,12 +56,12 @@ def tar(arguments: list[str], flags: set[typing.Any] | None = None) -> int:
 
         missing_arguments = []
         for argument in arguments:
-            if not Path(argument).exists():
+            if not workdir.resolve(argument).exists():
                 missing_arguments.append(argument)
 
         if missing_arguments:
             for missing in missing_arguments:
-                print(
+                echo(
                     f"tar: cannot stat '{missing}': No such file or directory"
                 )
                 terminal_logger.error(
@@ -66,33 +69,36 @@ def tar(arguments: list[str], flags: set[typing.Any] | None = None) -> int:
                 )
             return 1
 
-        temp_dir = Path(f'temp_tar_{archive_name}')
+        temp_dir = workdir.resolve(f'temp_tar_{archive_name}')
         try:
             temp_dir.mkdir(exist_ok=True)
 
             for argument in arguments:
-                argument_path = Path(argument)
+                argument_path = workdir.resolve(argument)
                 final_path = temp_dir / argument_path.name
 
                 if argument_path.is_file():
-                    shutil.copy2(argument_path, final_path)
+                    helper_functions.checked_copy2(argument_path, final_path)
 
                 elif argument_path.is_dir():
-                    shutil.copytree(argument_path, final_path)
+                    helper_functions.copy_tree(argument_path, final_path)
 
-            shutil.make_archive(archive_name, 'gztar', temp_dir)
+            helper_functions.add_tree_metrics('tar', temp_dir)
+            shutil.make_archive(
+                str(workdir.resolve(archive_name)), 'gztar', temp_dir
+            )
             terminal_logger.info(f'tar: {arguments} - success')
             return 0
 
         except Exception as e:
-            print(f'tar: error creating archive: {e}')
+            echo(f'tar: error creating archive: {e}')
             terminal_logger.error(f'tar: error creating archive: {e}')
             return 1
 
         finally:
             shutil.rmtree(temp_dir, ignore_errors=True)
 
-    print(f'tar: does not support the flags: {", ".join(flags)}')
+    echo(f'tar: does not support the flags: {", ".join(flags)}')
     terminal_logger.error(
         f'tar: does not support the flags: {", ".join(flags)}'
     )
@@ -0,0 +1,53 @@
+import shlex
+import typing
+
+import accounting
+import parser
+from logger.logger_setup import terminal_logger
+from output import echo, emit, flush, flushed
+
+
+@flushed
+def time_(arguments: list[str], flags: set[typing.Any] | None = None) -> int:
+    """Выполняет команду и выводит потраченные ею ресурсы.
+
+    Выводятся время (общее, пользовательское и системное), прочитанные и
+    записанные байты, число открытых файлов, вызовов stat и пиковая
+    память. Ресурсы выводятся и тогда, когда команду отменили.
+
+    Args:
+        arguments: Команда и ее аргументы
+        flags: Флаги (не поддерживаются)
+
+    Returns:
+        int: Код возврата команды или 1 при ошибке самого time
+    """
+    if flags:
+        echo(f'time: does not support the flags: {", ".join(flags)}')
+        terminal_logger.error(
+            f'time: does not support the flags: {", ".join(flags)}'
+        )
+        return 1
+
+    if not arguments:
+        echo('Usage: time COMMAND [ARG]...')
+        terminal_logger.error('time: insufficient arguments')
+        return 1
+
+    line = shlex.join(arguments)
+    try:
+        command = parser.compile_line(line)
+    except ValueError as e:
+        echo(f'time: {e}')
+        terminal_logger.error(f'time: {e}')
+        return 1
+
+    usage = accounting.Usage()
+    try:
+        with accounting.measure() as usage:
+            return typing.cast(parser.Command, command).run()
+
+    finally:
+        flush()
+        emit(accounting.usage_record(usage, line), accounting.format_usage)
+        terminal_logger.info(f'time: {line} - {accounting.format_log(usage)}')
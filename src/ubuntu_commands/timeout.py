@@ -0,0 +1,69 @@
+import shlex
+import typing
+
+import cancellation
+import parser
+from logger.logger_setup import terminal_logger
+from output import echo, flushed
+
+
+@flushed
+def timeout(arguments: list[str], flags: set[typing.Any] | None = None) -> int:
+    """Выполняет команду со сроком выполнения.
+
+    Отмена кооперативная: команда останавливается в ближайшей
+    контрольной точке после истечения срока и убирает за собой
+    частичный результат (например, недокопированное дерево cp -r).
+
+    Args:
+        arguments: Срок в секундах (0 - без срока), команда и ее
+            аргументы
+        flags: Флаги (не поддерживаются)
+
+    Returns:
+        int: Код возврата команды, 124 если срок истек, 125 при ошибке
+            самого timeout
+    """
+    if flags:
+        echo(f'timeout: does not support the flags: {", ".join(flags)}')
+        terminal_logger.error(
+            f'timeout: does not support the flags: {", ".join(flags)}'
+        )
+        return 125
+
+    if len(arguments) < 2:
+        echo('Usage: timeout DURATION COMMAND [ARG]...')
+        terminal_logger.error('timeout: insufficient arguments')
+        return 125
+
+    try:
+        duration = float(arguments[0])
+    except ValueError:
+        duration = -1.0
+
+    if not duration >= 0:
+        echo(f"timeout: invalid time interval '{arguments[0]}'")
+        terminal_logger.error(
+            f"timeout: invalid time interval '{arguments[0]}'"
+        )
+        return 125
+
+    try:
+        command = parser.compile_line(shlex.join(arguments[1:]))
+    except ValueError as e:
+        echo(f'timeout: {e}')
+        terminal_logger.error(f'timeout: {e}')
+        return 125
+
+    token = cancellation.CancelToken(duration or None, cancellation.current())
+
+    try:
+        with cancellation.scope(token):
+            return typing.cast(parser.Command, command).run()
+
+    except cancellation.Cancelled as e:
+        if token.reason != cancellation.TIMED_OUT:
+            raise
+
+        terminal_logger.error(f'timeout: {arguments[1:]} - timed out')
+        return e.exit_code
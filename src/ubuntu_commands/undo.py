@@ -1,11 +1,13 @@
 import shutil
 import typing
-from pathlib import Path
 
+import workdir
 from constants import FOR_UNDO_HISTORY, TRASH_PATH
 from logger.logger_setup import terminal_logger
+from output import echo, flushed
 
 
+@flushed
 def undo(arguments: list[str], flags: set[typing.Any] | None = None) -> int:
     """Отменяет последнюю команду (cp, mv, rm).
 
@@ -17,7 +19,7 @@ def undo(arguments: list[str], flags: set[typing.Any] | None = None) -> int:
         int: 0 при успехе, 1 при ошибке
     """
     if not FOR_UNDO_HISTORY:
-        print('undo: no commands to undo')
+        echo('undo: no commands to undo')
         terminal_logger.error('undo: no commands to undo')
         return 1
 
@@ -28,11 +30,11 @@ def undo(arguments: list[str], flags: set[typing.Any] | None = None) -> int:
     try:
         if command == 'cp':
             if len(arguments) > 1:
-                final_path = Path(arguments[-1])
+                final_path = workdir.resolve(arguments[-1])
 
                 if final_path.is_dir():
                     for argument in arguments[:-1]:
-                        argument_path = Path(argument)
+                        argument_path = workdir.resolve(argument)
                         cp_item = final_path / argument_path.name
                         if cp_item.exists():
                             if cp_item.is_file():
@@ -45,22 +47,22 @@ def undo(arguments: list[str], flags: set[typing.Any] | None = None) -> int:
 
         elif command == 'mv':
             if len(arguments) > 1:
-                final_path = Path(arguments[-1])
+                final_path = workdir.resolve(arguments[-1])
 
                 if final_path.is_dir():
                     for argument in arguments[:-1]:
-                        argument_path = Path(argument)
+                        argument_path = workdir.resolve(argument)
                         mv_item = final_path / argument_path.name
                         if mv_item.exists():
                             shutil.move(str(mv_item), str(argument_path))
                 else:
                     if final_path.exists():
-                        argument_path = Path(arguments[0])
+                        argument_path = workdir.resolve(arguments[0])
                         shutil.move(str(final_path), str(argument_path))
 
         elif command == 'rm':
             for argument in arguments:
-                argument_path = Path(argument)
+                argument_path = workdir.resolve(argument)
                 trash_item_path = TRASH_PATH / argument_path.name
 
                 if trash_item_path.exists():
@@ -70,7 +72,7 @@ def undo(arguments: list[str], flags: set[typing.Any] | None = None) -> int:
                         shutil.copy2(trash_item_path, argument_path)
 
         else:
-            print(f"undo: unknown command '{command}'")
+            echo(f"undo: unknown command '{command}'")
             terminal_logger.error(f"undo: unknown command '{command}'")
             FOR_UNDO_HISTORY.append(last_line)
             return 1
@@ -79,7 +81,7 @@ def undo(arguments: list[str], flags: set[typing.Any] | None = None) -> int:
         return 0
 
     except Exception as e:
-        print(f'undo: error during undo operation: {e}')
+        echo(f'undo: error during undo operation: {e}')
         terminal_logger.error(f'undo: error during undo operation: {e}')
         FOR_UNDO_HISTORY.append(last_line)
         return 1
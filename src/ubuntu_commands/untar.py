@@ -2,7 +2,9 @@ import shutil
 import typing
 from pathlib import Path
 
+import workdir
 from logger.logger_setup import terminal_logger
+from output import echo, flushed
 from ubuntu_commands import helper_functions
 
 
@@ -26,6 +28,7 @@ def is_tar_gz_archive(file_path: Path) -> bool:
     )
 
 
+@flushed
 def untar(arguments: list[str], flags: set[typing.Any] | None = None) -> int:
     """Распаковывает tar-архивы.
 
@@ -38,27 +41,27 @@ def untar(arguments: list[str], flags: set[typing.Any] | None = None) -> int:
     """
     if not flags:
         if not arguments:
-            print('untar: missing archive operand')
+            echo('untar: missing archive operand')
             terminal_logger.error('untar: missing archive operand')
             return 1
 
         if len(arguments) == 1:
-            extract_folder = Path('.')
+            extract_folder = workdir.resolve('.')
             archives = arguments
         else:
-            first_argument = Path(arguments[0])
+            first_argument = workdir.resolve(arguments[0])
             if first_argument.is_dir():
                 extract_folder = first_argument
                 archives = arguments[1:]
             else:
-                extract_folder = Path('.')
+                extract_folder = workdir.resolve('.')
                 archives = arguments
 
         for archive in archives:
-            archive_path = Path(archive)
+            archive_path = workdir.resolve(archive)
 
             if not archive_path.exists():
-                print(f"untar:  cannot find or open '{archive}'")
+                echo(f"untar:  cannot find or open '{archive}'")
                 terminal_logger.error(
                     f"untar:  cannot find or open '{archive}'"
                 )
@@ -66,19 +69,20 @@ def untar(arguments: list[str], flags: set[typing.Any] | None = None) -> int:
                 continue
 
             if not is_tar_gz_archive(archive_path):
-                print(f"untar: '{archive}' is not tarfile")
+                echo(f"untar: '{archive}' is not tarfile")
                 terminal_logger.error(f"untar: '{archive}' is not tarfile")
                 archives.remove(archive)
                 continue
 
         for archive in archives:
-            archive_path = Path(archive)
+            archive_path = workdir.resolve(archive)
 
             try:
-                temp_dir = Path('temp_untar')
+                temp_dir = workdir.resolve('temp_untar')
                 temp_dir.mkdir(exist_ok=True)
 
-                shutil.unpack_archive(archive, temp_dir)
+                shutil.unpack_archive(archive_path, temp_dir)
+                helper_functions.add_tree_metrics('untar', temp_dir)
 
                 helper_functions.extracting_files(
                     temp_dir, extract_folder, archive
@@ -89,7 +93,7 @@ def untar(arguments: list[str], flags: set[typing.Any] | None = None) -> int:
                 terminal_logger.info(f'untar: {archive} - success')
 
             except Exception as e:
-                print(f"untar: error extracting '{archive}': {e}")
+                echo(f"untar: error extracting '{archive}': {e}")
                 terminal_logger.error(
                     f"untar: error extracting '{archive}': {e}"
                 )
@@ -97,7 +101,7 @@ def untar(arguments: list[str], flags: set[typing.Any] | None = None) -> int:
 
         return 0
 
-    print(f'untar: does not support the flags: {", ".join(flags)}')
+    echo(f'untar: does not support the flags: {", ".join(flags)}')
     terminal_logger.error(
         f'untar: does not support the flags: {", ".join(flags)}'
     )
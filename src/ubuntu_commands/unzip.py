@@ -2,7 +2,9 @@ import shutil
 import typing
 from pathlib import Path
 
+import workdir
 from logger.logger_setup import terminal_logger
+from output import echo, flushed
 from ubuntu_commands import helper_functions
 
 
@@ -19,6 +21,7 @@ def is_zip_archive(file_path: Path) -> bool:
     return path.exists() and path.is_file() and path.suffix.lower() == '.zip'
 
 
+@flushed
 def unzip(arguments: list[str], flags: set[typing.Any] | None = None) -> int:
     """Распаковывает zip-архивы.
 
@@ -31,27 +34,27 @@ def unzip(arguments: list[str], flags: set[typing.Any] | None = None) -> int:
     """
     if not flags:
         if not arguments:
-            print('unzip: missing archive operand')
+            echo('unzip: missing archive operand')
             terminal_logger.error('unzip: missing archive operand')
             return 1
 
         if len(arguments) == 1:
-            extract_folder = Path('.')
+            extract_folder = workdir.resolve('.')
             archives = arguments
         else:
-            first_argument = Path(arguments[0])
+            first_argument = workdir.resolve(arguments[0])
             if first_argument.is_dir():
                 extract_folder = first_argument
                 archives = arguments[1:]
             else:
-                extract_folder = Path('.')
+                extract_folder = workdir.resolve('.')
                 archives = arguments
 
         for archive in archives:
-            archive_path = Path(archive)
+            archive_path = workdir.resolve(archive)
 
             if not archive_path.exists():
-                print(f"unzip:  cannot find or open '{archive}'")
+                echo(f"unzip:  cannot find or open '{archive}'")
                 terminal_logger.error(
                     f"unzip:  cannot find or open '{archive}'"
                 )
@@ -59,19 +62,20 @@ def unzip(arguments: list[str], flags: set[typing.Any] | None = None) -> int:
                 continue
 
             if not is_zip_archive(archive_path):
-                print(f"unzip: '{archive}' is not zipfile")
+                echo(f"unzip: '{archive}' is not zipfile")
                 terminal_logger.error(f"unzip: '{archive}' is not zipfile")
                 archives.remove(archive)
                 continue
 
         for archive in archives:
-            archive_path = Path(archive)
+            archive_path = workdir.resolve(archive)
 
             try:
-                temp_dir = Path('temp_unzip')
+                temp_dir = workdir.resolve('temp_unzip')
                 temp_dir.mkdir(exist_ok=True)
 
-                shutil.unpack_archive(archive, temp_dir)
+                shutil.unpack_archive(archive_path, temp_dir)
+                helper_functions.add_tree_metrics('unzip', temp_dir)
 
                 helper_functions.extracting_files(
                     temp_dir, extract_folder, archive
@@ -82,7 +86,7 @@ def unzip(arguments: list[str], flags: set[typing.Any] | None = None) -> int:
                 terminal_logger.info(f'unzip: {archive} - success')
 
             except Exception as e:
-                print(f"unzip: error extracting '{archive}': {e}")
+                echo(f"unzip: error extracting '{archive}': {e}")
                 terminal_logger.error(
                     f"unzip: error extracting '{archive}': {e}"
                 )
@@ -90,7 +94,7 @@ def unzip(arguments: list[str], flags: set[typing.Any] | None = None) -> int:
 
         return 0
 
-    print(f'unzip: does not support the flags: {", ".join(flags)}')
+    echo(f'unzip: does not support the flags: {", ".join(flags)}')
     terminal_logger.error(
         f'unzip: does not support the flags: {", ".join(flags)}'
     )
@@ -0,0 +1,111 @@
+import contextlib
+import functools
+import os
+import threading
+import typing
+from collections.abc import Iterator
+from pathlib import Path
+
+
+class _WorkdirLocal(threading.local):
+    path: str | None = None
+
+
+_local = _WorkdirLocal()
+
+
+def current() -> str | None:
+    """Возвращает рабочую директорию команды текущего потока.
+
+    Returns:
+        str | None: Абсолютный путь или None, если команда работает в
+            рабочей директории процесса
+    """
+    return _local.path
+
+
+@contextlib.contextmanager
+def scope(path: str | None) -> Iterator[None]:
+    """Задает рабочую директорию команд текущего потока.
+
+    Рабочая директория процесса общая для всех потоков, поэтому
+    фоновая задача не может сменить ее для себя. Вместо этого команды
+    задачи разрешают относительные пути через resolve от директории,
+    из которой задача запущена, и cd в задаче не трогает директорию
+    процесса.
+
+    Args:
+        path: Абсолютный путь или None для рабочей директории процесса
+
+    Yields:
+        None
+    """
+    previous = _local.path
+    _local.path = path
+    try:
+        yield
+    finally:
+        _local.path = previous
+
+
+def resolve(path: str | os.PathLike[str]) -> Path:
+    """Разрешает путь от рабочей директории команды.
+
+    Вне scope путь не меняется, поэтому команды переднего плана
+    по-прежнему работают с относительными путями.
+
+    Args:
+        path: Путь, как его передали команде
+
+    Returns:
+        Path: Путь от рабочей директории команды
+    """
+    base = _local.path
+    if base is None:
+        return Path(path)
+    return Path(base, path)
+
+
+def change(path: str | os.PathLike[str]) -> None:
+    """Меняет рабочую директорию команды для cd.
+
+    В scope меняется только директория команд текущего потока, а
+    директория процесса, от которой работают передний план и другие
+    задачи, остается прежней.
+
+    Args:
+        path: Абсолютный путь к директории
+
+    Raises:
+        OSError: Если директорию нельзя сделать рабочей
+    """
+    if _local.path is None:
+        os.chdir(path)
+    else:
+        _local.path = os.fspath(path)
+
+
+def bind(
+    function: typing.Callable[..., typing.Any],
+) -> typing.Callable[..., typing.Any]:
+    """Переносит рабочую директорию текущего потока в поток function.
+
+    Как и accounting.bind, нужен потокам, которые команда запускает и
+    дожидается (конвейер, пул ls -R).
+
+    Args:
+        function: Функция для другого потока
+
+    Returns:
+        typing.Callable[..., typing.Any]: function или обертка над ней
+    """
+    path = _local.path
+    if path is None:
+        return function
+
+    @functools.wraps(function)
+    def wrapper(*args: typing.Any, **kwargs: typing.Any) -> typing.Any:
+        with scope(path):
+            return function(*args, **kwargs)
+
+    return wrapper
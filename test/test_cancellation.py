@@ -0,0 +1,125 @@
+import os
+import pytest
+import signal
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import cancellation
+import output
+import pipeline
+from src import parser
+
+
+def test_checkpoint_without_token():
+    """Тест: вне отменяемой команды контрольная точка ничего не делает"""
+    cancellation.checkpoint()
+
+
+def test_cancelled_token_raises():
+    """Тест: отмененный токен прерывает команду в контрольной точке"""
+    token = cancellation.CancelToken()
+    token.cancel()
+
+    with cancellation.scope(token):
+        with pytest.raises(cancellation.Cancelled) as error:
+            cancellation.checkpoint()
+
+    assert error.value.exit_code == 130
+    assert cancellation.current() is None
+
+
+def test_token_deadline():
+    """Тест: токен отменяется сам по истечении срока"""
+    token = cancellation.CancelToken(0.05)
+    assert token.cancelled() is None
+
+    time.sleep(0.06)
+
+    assert token.cancelled() == cancellation.TIMED_OUT
+    with pytest.raises(cancellation.Cancelled) as error:
+        token.check()
+    assert error.value.exit_code == 124
+
+
+def test_token_parent():
+    """Тест: отмена родителя отменяет дочерний токен"""
+    parent = cancellation.CancelToken()
+    child = cancellation.CancelToken(60, parent)
+
+    parent.cancel()
+
+    assert child.cancelled() == cancellation.INTERRUPTED
+    assert child.reason is None
+
+
+def test_token_callbacks():
+    """Тест: callback вызывается один раз при отмене"""
+    token = cancellation.CancelToken()
+    calls = []
+    token.on_cancel(lambda: calls.append(token.reason))
+
+    token.cancel()
+    token.cancel(cancellation.TIMED_OUT)
+
+    assert calls == [cancellation.INTERRUPTED]
+
+
+def test_interrupt_twice_raises_keyboard_interrupt():
+    """Тест: второй Ctrl-C прерывает оболочку"""
+    token = cancellation.CancelToken()
+
+    cancellation.interrupt(token)
+    assert token.reason == cancellation.INTERRUPTED
+
+    with pytest.raises(KeyboardInterrupt):
+        cancellation.interrupt(token)
+
+
+def test_sigint_cancels_token():
+    """Тест: SIGINT отменяет токен вместо KeyboardInterrupt"""
+    token = cancellation.CancelToken()
+    previous = signal.getsignal(signal.SIGINT)
+
+    with cancellation.sigint_cancels(token):
+        os.kill(os.getpid(), signal.SIGINT)
+        time.sleep(0.01)
+
+    assert token.reason == cancellation.INTERRUPTED
+    assert signal.getsignal(signal.SIGINT) is previous
+
+
+def test_pipeline_stages_share_token(capsys):
+    """Тест: отмена останавливает все команды конвейера"""
+    started = threading.Event()
+
+    def producer(arguments, flags):
+        while True:
+            started.set()
+            output.echo('line')
+            cancellation.checkpoint()
+
+    def consumer(arguments, flags):
+        started.wait(5)
+        token.cancel()
+        for line in pipeline.piped_input():
+            cancellation.checkpoint()
+        return 0
+
+    token = cancellation.CancelToken()
+    stages = (
+        parser.Command('producer', producer, (), frozenset(), 'producer'),
+        parser.Command('consumer', consumer, (), frozenset(), 'consumer'),
+    )
+
+    with cancellation.scope(token):
+        result = parser.Pipeline(stages, 'producer | consumer').run()
+
+    assert result == 130
+
+
+if __name__ == '__main__':
+    pytest.main()
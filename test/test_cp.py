@@ -8,6 +8,7 @@ import shutil
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+import cancellation
 from src.ubuntu_commands import cp
 
 
@@ -358,5 +359,112 @@ def test_cp_invalid_dirname(mock_temp_directory, capsys):
         assert "cp: invalid directory name 'invalid*dir'" in captured.out
 
 
+def cancel_after_first_copy(token):
+    """Отменяет token после копирования первого файла"""
+    real_copy2 = shutil.copy2
+
+    def copy2(source, destination, **kwargs):
+        result = real_copy2(source, destination, **kwargs)
+        token.cancel()
+        return result
+
+    return patch('shutil.copy2', side_effect=copy2)
+
+
+def test_cp_cancelled_directory_copy_removes_partial_tree(tmp_path):
+    """Отмена cp -r удаляет недокопированное дерево"""
+    source = tmp_path / 'source'
+    source.mkdir()
+    for number in range(5):
+        (source / f'file{number}.txt').write_text('content')
+
+    token = cancellation.CancelToken()
+    with patch('src.ubuntu_commands.cp.FOR_UNDO_HISTORY', []) as mock_history, \
+         cancel_after_first_copy(token), cancellation.scope(token):
+        with pytest.raises(cancellation.Cancelled):
+            cp.cp([str(source), str(tmp_path / 'copy')], {'r'})
+
+    assert not (tmp_path / 'copy').exists()
+    assert mock_history == []
+
+
+def test_cp_cancelled_keeps_undo_for_copied_items(tmp_path):
+    """Отмена cp сохраняет запись undo для уже скопированных элементов"""
+    source_file = tmp_path / 'file.txt'
+    source_file.write_text('content')
+    source_dir = tmp_path / 'dir'
+    source_dir.mkdir()
+    (source_dir / 'inner.txt').write_text('content')
+    target = tmp_path / 'target'
+    target.mkdir()
+
+    token = cancellation.CancelToken()
+    with patch('src.ubuntu_commands.cp.FOR_UNDO_HISTORY', []) as mock_history, \
+         cancel_after_first_copy(token), cancellation.scope(token):
+        with pytest.raises(cancellation.Cancelled):
+            cp.cp([str(source_file), str(source_dir), str(target)], {'r'})
+
+    assert [path.name for path in target.iterdir()] == ['file.txt']
+    assert mock_history == [
+        ['cp', str(source_file), str(target), Path('.')]
+    ]
+
+
+@pytest.mark.parametrize(
+    'arguments, flags',
+    [(['nope', 'x'], set()), (['x'], set()), (['a', 'b'], {'z'})],
+)
+def test_cp_error_logs_summary(tmp_path, monkeypatch, capsys, arguments, flags):
+    """Ошибка cp тоже дает итоговую запись с числом ошибок"""
+    monkeypatch.chdir(tmp_path)
+
+    with patch('logger.command_summary.terminal_logger') as mock_logger:
+        result = cp.cp(arguments, flags)
+
+    assert result == 1
+    summary = mock_logger.info.call_args.kwargs['extra']['summary']
+    assert summary['command'] == 'cp'
+    assert summary['errors'] == 1
+
+
+def test_cp_cancelled_logs_summary_with_copied_bytes(tmp_path):
+    """Отмененный cp -r пишет итог с уже скопированными байтами"""
+    source = tmp_path / 'source'
+    source.mkdir()
+    for number in range(5):
+        (source / f'file{number}.txt').write_text('content')
+
+    token = cancellation.CancelToken()
+    with patch('src.ubuntu_commands.cp.FOR_UNDO_HISTORY', []), \
+         patch('logger.command_summary.terminal_logger') as mock_logger, \
+         cancel_after_first_copy(token), cancellation.scope(token):
+        with pytest.raises(cancellation.Cancelled):
+            cp.cp([str(source), str(tmp_path / 'copy')], {'r'})
+
+    summary = mock_logger.info.call_args.kwargs['extra']['summary']
+    assert summary['files'] == 1
+    assert summary['bytes'] == len('content')
+
+
 if __name__ == '__main__':
-    pytest.main()
\ No newline at end of file
+    pytest.main()
+
+def test_cp_logs_summary_with_files_and_bytes(mock_temp_directory, capsys):
+    """cp -r пишет одну итоговую запись с количеством файлов и байт"""
+    source = Path(mock_temp_directory) / 'source'
+    (source / 'nested').mkdir(parents=True)
+    (source / 'a.txt').write_text("12345")
+    (source / 'nested' / 'b.txt').write_text("1234567890")
+
+    with patch('logger.command_summary.terminal_logger') as mock_logger, \
+         patch('src.ubuntu_commands.cp.FOR_UNDO_HISTORY', []):
+        result = cp.cp([str(source), str(Path(mock_temp_directory) / 'copy')], {'r'})
+
+    assert result == 0
+    mock_logger.info.assert_called_once()
+    summary = mock_logger.info.call_args.kwargs['extra']['summary']
+    assert summary['command'] == 'cp'
+    assert summary['items'] == 1
+    assert summary['files'] == 2
+    assert summary['bytes'] == 15
+    assert summary['errors'] == 0
@@ -1,3 +1,4 @@
+import json
 import pytest
 import tempfile
 from pathlib import Path
@@ -6,6 +7,8 @@ import sys
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+import cancellation
+from src import parser
 from src.ubuntu_commands import grep
 
 
@@ -374,5 +377,145 @@ def test_grep_case_sensitive_by_default(mock_temp_files, capsys):
     assert "TEST pattern" not in captured.out
 
 
+
+def test_grep_piped_input(capsys):
+    """grep без файлов фильтрует вход конвейера"""
+    lines = ['hello world\n', 'test pattern\n', 'HELLO again\n']
+
+    with patch('src.ubuntu_commands.grep.pipeline.piped_input',
+               return_value=iter(lines)):
+        result = grep.grep(['hello'], {'i'})
+
+    captured = capsys.readouterr()
+    assert result == 0
+    assert captured.out == 'hello world\nHELLO again\n'
+
+
+def test_grep_pattern_only_without_pipe(capsys):
+    """grep только с шаблоном вне конвейера показывает usage"""
+    result = grep.grep(['hello'], set())
+
+    captured = capsys.readouterr()
+    assert result == 1
+    assert 'Usage: grep' in captured.out
+
+
+def test_grep_json_records(mock_temp_files, capsys):
+    """grep --json выводит совпадения и итог записями NDJSON"""
+    result = parser.parser(f'grep --json pattern {mock_temp_files[0]}')
+
+    captured = capsys.readouterr()
+    records = [json.loads(line) for line in captured.out.splitlines()]
+    assert result == 0
+    assert records[0] == {
+        'type': 'match',
+        'path': mock_temp_files[0],
+        'line_number': 2,
+        'line': 'test pattern',
+    }
+    assert records[1]['type'] == 'summary'
+    assert records[1]['items'] == 1
+
+
+
+def test_grep_json_error_has_summary(capsys):
+    """grep --json с ошибкой тоже выводит итог последней записью"""
+    parser.parser('grep --json pattern missing.txt')
+
+    captured = capsys.readouterr()
+    records = [json.loads(line) for line in captured.out.splitlines()]
+    assert records[-1]['type'] == 'summary'
+    assert records[-1]['errors'] == 1
+
+def test_grep_recursive_cancelled_between_files(mock_temp_directory, capsys):
+    """Отмененный grep -r останавливается до следующего файла"""
+    for number in range(3):
+        (Path(mock_temp_directory) / f'file{number}.txt').write_text('match\n')
+
+    token = cancellation.CancelToken()
+    real_emit = grep.emit
+
+    def emit(*args, **kwargs):
+        real_emit(*args, **kwargs)
+        token.cancel()
+
+    with patch('src.ubuntu_commands.grep.emit', side_effect=emit), \
+         cancellation.scope(token):
+        with pytest.raises(cancellation.Cancelled):
+            grep.grep(['match', mock_temp_directory], {'r'})
+
+    captured = capsys.readouterr()
+    assert captured.out.count('match') == 1
+
+
+def test_grep_long_file_cancelled(tmp_path, capsys):
+    """grep проверяет отмену внутри длинного файла"""
+    path = tmp_path / 'long.txt'
+    path.write_text('line\n' * (grep.CANCEL_CHECK_LINES * 2))
+
+    with patch.object(
+        cancellation, 'checkpoint', side_effect=[None, cancellation.Cancelled()]
+    ) as mock_checkpoint:
+        with pytest.raises(cancellation.Cancelled):
+            grep.grep(['nomatch', str(path)], set())
+
+    assert mock_checkpoint.call_count == 2
+
+
+def test_grep_timeout(mock_temp_directory, capsys):
+    """timeout прерывает grep -r с кодом 124"""
+    (Path(mock_temp_directory) / 'file.txt').write_text('match\n')
+
+    result = parser.parser(
+        f'timeout 0.000001 grep -r match {mock_temp_directory}'
+    )
+
+    captured = capsys.readouterr()
+    assert result == 124
+    assert captured.out == ''
+
+
 if __name__ == '__main__':
-    pytest.main()
\ No newline at end of file
+    pytest.main()
+
+def test_grep_logs_one_summary_record(mock_temp_directory, capsys):
+    """grep пишет в лог одну итоговую запись вместо записи на совпадение"""
+    for number in range(3):
+        with open(Path(mock_temp_directory) / f'file{number}.txt', 'w') as f:
+            f.write("error one\nok\nerror two\n")
+
+    with patch('logger.command_summary.terminal_logger') as mock_logger:
+        result = grep.grep(['error', mock_temp_directory], {'r'})
+
+    assert result == 0
+    mock_logger.error.assert_not_called()
+    mock_logger.info.assert_called_once()
+    message = mock_logger.info.call_args.args[0]
+    summary = mock_logger.info.call_args.kwargs['extra']['summary']
+    assert message.startswith("grep: summary items=6 files=3 bytes=69 errors=0 elapsed=")
+    assert summary['items'] == 6
+    assert summary['files'] == 3
+
+
+def test_grep_logs_matches_with_verbosity(mock_temp_files, capsys):
+    """grep пишет отдельные совпадения при повышенной подробности лога"""
+    temp_path1, _ = mock_temp_files
+
+    with patch('logger.command_summary.terminal_logger') as mock_logger, \
+         patch('logger.command_summary.LOG_VERBOSITY', 1):
+        grep.grep(['o', temp_path1], set())
+
+    assert mock_logger.info.call_count == 3
+    assert mock_logger.info.call_args_list[0].args == ('grep: %s:%s - found', temp_path1, 1)
+
+
+def test_grep_logs_sampled_matches(mock_temp_directory, capsys):
+    """grep пишет в лог каждое N-е совпадение при выборочном логировании"""
+    with open(Path(mock_temp_directory) / 'file.txt', 'w') as f:
+        f.write("match\n" * 100)
+
+    with patch('logger.command_summary.terminal_logger') as mock_logger, \
+         patch('logger.command_summary.LOG_SAMPLE_RATE', 0.1):
+        grep.grep(['match', mock_temp_directory], {'r'})
+
+    assert mock_logger.info.call_count == 11
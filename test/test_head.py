@@ -0,0 +1,105 @@
+import pytest
+import tempfile
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import output
+from src import parser
+from src.ubuntu_commands import head
+
+
+@pytest.fixture
+def mock_temp_file():
+    """Создает временный файл из 20 строк для тестов head"""
+    with tempfile.NamedTemporaryFile(mode='w', delete=False, encoding='utf-8') as temp_file:
+        temp_file.write(''.join(f'line {number}\n' for number in range(1, 21)))
+        temp_path = temp_file.name
+
+    yield temp_path
+
+    Path(temp_path).unlink()
+
+
+def producer(total, produced):
+    """Создает команду, печатающую total строк и считающую их"""
+    def handler(arguments, flags):
+        for number in range(total):
+            output.echo(f'line {number}')
+            produced.append(number)
+        return 0
+
+    return parser.Command('producer', handler, (), frozenset(), 'producer')
+
+
+def test_head_default_lines(mock_temp_file, capsys):
+    """Тест: по умолчанию выводятся первые 10 строк файла"""
+    result = head.head([mock_temp_file], set())
+
+    captured = capsys.readouterr()
+    assert result == 0
+    assert captured.out.splitlines() == [f'line {n}' for n in range(1, 11)]
+
+
+def test_head_count(mock_temp_file, capsys):
+    """Тест: выводится заданное количество строк"""
+    head.head(['3', mock_temp_file], set())
+
+    captured = capsys.readouterr()
+    assert captured.out == 'line 1\nline 2\nline 3\n'
+
+
+def test_head_nonexistent_file(capsys):
+    """Тест: head с несуществующим файлом"""
+    head.head(['nonexistent.txt'], set())
+
+    captured = capsys.readouterr()
+    assert "cannot open 'nonexistent.txt'" in captured.out
+
+
+def test_head_without_input(capsys):
+    """Тест: head без файлов вне конвейера"""
+    result = head.head(['5'], set())
+
+    captured = capsys.readouterr()
+    assert result == 1
+    assert 'missing input' in captured.out
+
+
+def test_head_with_flags(capsys):
+    """Тест: head с флагами"""
+    result = head.head(['5'], {'r'})
+
+    captured = capsys.readouterr()
+    assert result == 1
+    assert 'does not support the flags' in captured.out
+
+
+def test_pipeline_head_stops_upstream(capsys):
+    """Тест: head в конвейере останавливает предыдущую команду"""
+    produced = []
+    head_command = parser.compile_line('head 5')
+    pipeline = parser.Pipeline(
+        (producer(1_000_000, produced), head_command), 'producer | head 5'
+    )
+
+    result = pipeline.run()
+
+    captured = capsys.readouterr()
+    assert result == 0
+    assert captured.out == ''.join(f'line {n}\n' for n in range(5))
+    assert len(produced) < 10_000
+
+
+def test_pipeline_grep_head(mock_temp_file, capsys):
+    """Тест: строки проходят через несколько команд конвейера"""
+    result = parser.parser(f'cat {mock_temp_file} | grep 1 | head 3')
+
+    captured = capsys.readouterr()
+    assert result == 0
+    assert captured.out == 'line 1\nline 10\nline 11\n'
+
+
+if __name__ == '__main__':
+    pytest.main()
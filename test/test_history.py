@@ -1,12 +1,16 @@
 import pytest
+import json
+import threading
 import tempfile
 import os
 from unittest.mock import patch
 import sys
+from pathlib import Path
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
-from src.ubuntu_commands import history
+import output
+from src.ubuntu_commands import helper_functions, history
 
 
 @pytest.fixture
@@ -24,6 +28,7 @@ def mock_history_file():
         yield temp_path
     
     os.unlink(temp_path)
+    Path(temp_path + '.idx').unlink(missing_ok=True)
 
 
 def test_history_no_args_shows_all_commands(mock_history_file, capsys):
@@ -180,4 +185,434 @@ def test_history_number_greater_than_available_commands(mock_history_file, capsy
     expected_output = "1. ls\n2. cd /home\n3. pwd\n4. cat file.txt\n5. mkdir test\n"
     
     assert result == 0
-    assert captured.out == expected_output
\ No newline at end of file
+    assert captured.out == expected_output
+
+@pytest.fixture
+def fresh_history_file(tmp_path):
+    """Создает пустой файл истории и сбрасывает кэш write_history"""
+    history_path = tmp_path / '.history'
+    history_path.touch()
+
+    with patch.object(helper_functions, 'HISTORY_PATH', history_path), \
+         patch.object(helper_functions, '_history_size', -1), \
+         patch.object(helper_functions, '_history_last_number', 0):
+        yield history_path
+
+
+def test_write_history_numbers_records(fresh_history_file):
+    """write_history нумерует записи по порядку"""
+    helper_functions.write_history('ls')
+    helper_functions.write_history('cd /home')
+    helper_functions.write_history('pwd')
+
+    assert fresh_history_file.read_text() == "1. ls\n2. cd /home\n3. pwd\n"
+
+
+def test_write_history_continues_existing_file(fresh_history_file):
+    """write_history продолжает нумерацию существующей истории"""
+    fresh_history_file.write_text("1. ls\n2. pwd\n41. cat file.txt\n")
+
+    helper_functions.write_history('ls -l')
+
+    assert fresh_history_file.read_text().endswith("41. cat file.txt\n42. ls -l\n")
+
+
+def test_write_history_does_not_reread_file(fresh_history_file):
+    """write_history не перечитывает файл, если его никто не менял"""
+    helper_functions.write_history('ls')
+
+    with patch.object(helper_functions, '_read_last_history_number') as mock_read:
+        helper_functions.write_history('pwd')
+        helper_functions.write_history('cat file.txt')
+
+    mock_read.assert_not_called()
+    assert fresh_history_file.read_text() == "1. ls\n2. pwd\n3. cat file.txt\n"
+
+
+def test_write_history_detects_external_append(fresh_history_file):
+    """write_history учитывает записи, добавленные другой сессией"""
+    helper_functions.write_history('ls')
+
+    with open(fresh_history_file, 'a') as f:
+        f.write("2. pwd\n")
+
+    helper_functions.write_history('cat file.txt')
+
+    assert fresh_history_file.read_text() == "1. ls\n2. pwd\n3. cat file.txt\n"
+
+
+def test_write_history_recovers_after_truncation(fresh_history_file):
+    """write_history начинает заново после обрезания файла"""
+    helper_functions.write_history('ls')
+    helper_functions.write_history('pwd')
+
+    fresh_history_file.write_text("")
+
+    helper_functions.write_history('cat file.txt')
+
+    assert fresh_history_file.read_text() == "1. cat file.txt\n"
+
+
+def test_write_history_recovers_after_torn_write(fresh_history_file):
+    """write_history дописывает перевод строки после оборванной записи"""
+    fresh_history_file.write_text("1. ls\n2. cat fi")
+
+    helper_functions.write_history('pwd')
+
+    assert fresh_history_file.read_text() == "1. ls\n2. cat fi\n3. pwd\n"
+
+
+def test_write_history_reads_number_across_blocks(fresh_history_file):
+    """write_history находит номер, даже если последняя строка длиннее блока"""
+    fresh_history_file.write_text("1. ls\n2. " + "x" * 100 + "\n")
+
+    with patch.object(helper_functions, 'HISTORY_BLOCK_SIZE', 16):
+        helper_functions.write_history('pwd')
+
+    assert fresh_history_file.read_text().endswith("\n3. pwd\n")
+
+
+def test_history_reads_last_commands_across_blocks(mock_history_file, capsys):
+    """history N находит последние команды, читая файл маленькими блоками"""
+    with open(mock_history_file, 'w') as f:
+        for number in range(1, 201):
+            f.write(f"{number}. echo {number}\n")
+
+    with patch('src.ubuntu_commands.history.helper_functions.HISTORY_BLOCK_SIZE', 7):
+        result = history.history(["3"], None)
+
+    captured = capsys.readouterr()
+
+    assert result == 0
+    assert captured.out == "198. echo 198\n199. echo 199\n200. echo 200\n"
+
+
+def test_history_last_line_without_newline(mock_history_file, capsys):
+    """history N выводит последнюю строку без перевода строки как есть"""
+    with open(mock_history_file, 'w') as f:
+        f.write("1. ls\n2. pwd")
+
+    result = history.history(["1"], None)
+
+    captured = capsys.readouterr()
+
+    assert result == 0
+    assert captured.out == "2. pwd"
+
+
+def test_history_does_not_read_whole_file(mock_history_file, capsys):
+    """history N не читает весь файл истории"""
+    with patch('src.ubuntu_commands.history.open', create=True) as mock_open:
+        result = history.history(["2"], None)
+
+    captured = capsys.readouterr()
+
+    assert result == 0
+    mock_open.assert_not_called()
+    assert captured.out == "4. cat file.txt\n5. mkdir test\n"
+
+
+def test_history_search_finds_matching_commands(mock_history_file, capsys):
+    """history -s выводит команды, подходящие под шаблон"""
+    result = history.history(["cat"], {'s'})
+
+    captured = capsys.readouterr()
+
+    assert result == 0
+    assert captured.out == "4. cat file.txt\n"
+
+
+def test_history_search_builds_index_next_to_history(mock_history_file, capsys):
+    """history -s строит индекс рядом с файлом истории"""
+    history.history(["file"], {'s'})
+
+    index_file = Path(mock_history_file + '.idx')
+    assert index_file.exists()
+    assert "file.txt\t" in index_file.read_text()
+
+
+def test_history_search_regex_and_substring(mock_history_file, capsys):
+    """history -s понимает регулярные выражения и подстроки"""
+    history.history([r"^(ls|pwd)$"], {'s'})
+    history.history(["ome"], {'s'})
+    history.history([r"mk\w+ te"], {'s'})
+
+    captured = capsys.readouterr()
+
+    assert captured.out == "1. ls\n3. pwd\n2. cd /home\n5. mkdir test\n"
+
+
+def test_history_search_ignore_case(mock_history_file, capsys):
+    """history -si ищет без учета регистра"""
+    history.history(["CAT"], {'s'})
+    history.history(["CAT"], {'s', 'i'})
+
+    captured = capsys.readouterr()
+
+    assert captured.out == "4. cat file.txt\n"
+
+
+def test_history_search_invalid_pattern(mock_history_file, capsys):
+    """history -s с некорректным шаблоном показывает ошибку"""
+    result = history.history(["(unclosed"], {'s'})
+
+    captured = capsys.readouterr()
+
+    assert result == 1
+    assert captured.out.startswith("-bash: history: (unclosed: invalid pattern")
+
+
+def test_history_search_requires_pattern(mock_history_file, capsys):
+    """history -s без шаблона показывает ошибку"""
+    result = history.history([], {'s'})
+
+    captured = capsys.readouterr()
+
+    assert result == 1
+    assert captured.out == "-bash: history: -s: pattern required\n"
+
+
+def test_history_search_uses_index_for_new_records(fresh_history_file, capsys):
+    """write_history дописывает новые команды в уже построенный индекс"""
+    helper_functions.write_history('ls -la')
+    helper_functions.write_history('grep error logs')
+
+    with patch('src.ubuntu_commands.history.HISTORY_PATH', fresh_history_file):
+        history.history(["error"], {'s'})
+        helper_functions.write_history('cat errors.txt')
+
+        index_text = Path(f'{fresh_history_file}.idx').read_text()
+        assert "errors.txt\t" in index_text
+
+        history.history(["error"], {'s'})
+
+    captured = capsys.readouterr()
+
+    assert captured.out == (
+        "2. grep error logs\n"
+        "2. grep error logs\n3. cat errors.txt\n"
+    )
+
+
+def test_history_search_after_truncation(fresh_history_file, capsys):
+    """history -s не возвращает удаленные записи после обрезания истории"""
+    helper_functions.write_history('grep error logs')
+
+    with patch('src.ubuntu_commands.history.HISTORY_PATH', fresh_history_file):
+        history.history(["error"], {'s'})
+
+        fresh_history_file.write_text("")
+        helper_functions.write_history('ls')
+        helper_functions.write_history('cat errors.txt')
+
+        history.history(["error"], {'s'})
+
+    captured = capsys.readouterr()
+
+    assert captured.out == "1. grep error logs\n2. cat errors.txt\n"
+
+
+@pytest.fixture
+def sqlite_history(tmp_path):
+    """Переключает историю на SQLite с временной базой"""
+    history_db = history.history_db
+
+    with patch('src.ubuntu_commands.history.HISTORY_BACKEND', 'sqlite'), \
+         patch.object(history_db, 'HISTORY_DB_PATH', tmp_path / 'history.sqlite3'):
+        yield history_db
+        history_db.close()
+
+
+def test_history_sqlite_records_commands(sqlite_history, capsys):
+    """История в SQLite выводится в том же формате, что и файловая"""
+    writer = sqlite_history.writer()
+    for command in ['ls', 'cd /home', 'pwd']:
+        token = writer.begin(command, '/tmp')
+        writer.finish(token, 0, 0.01)
+
+    history.history([], None)
+    history.history(["2"], None)
+
+    captured = capsys.readouterr()
+
+    assert captured.out == "1. ls\n2. cd /home\n3. pwd\n2. cd /home\n3. pwd\n"
+
+
+def test_history_sqlite_stores_metadata(sqlite_history):
+    """История в SQLite хранит директорию, код возврата и длительность"""
+    writer = sqlite_history.writer()
+    token = writer.begin('rm -r build', '/home/user')
+    writer.finish(token, 1, 2.5)
+    writer.flush()
+
+    connection = sqlite_history.connect(sqlite_history.HISTORY_DB_PATH)
+    row = connection.execute(
+        'SELECT cwd, command, exit_code, duration FROM history'
+    ).fetchone()
+    journal_mode = connection.execute('PRAGMA journal_mode').fetchone()
+    connection.close()
+
+    assert row == ('/home/user', 'rm -r build', 1, 2.5)
+    assert journal_mode == ('wal',)
+
+
+def test_history_sqlite_numbering_across_sessions(sqlite_history, capsys):
+    """Несколько писателей одной базы не путают нумерацию"""
+    first = sqlite_history.HistoryWriter(sqlite_history.HISTORY_DB_PATH)
+    second = sqlite_history.HistoryWriter(sqlite_history.HISTORY_DB_PATH)
+
+    for number in range(10):
+        first.begin(f'first {number}', '/')
+        second.begin(f'second {number}', '/')
+    first.close()
+    second.close()
+
+    history.history([], None)
+
+    captured = capsys.readouterr()
+    numbers = [int(line.split('.')[0]) for line in captured.out.splitlines()]
+
+    assert numbers == list(range(1, 21))
+
+
+def test_history_sqlite_slowest(sqlite_history, capsys):
+    """history -S N показывает самые долгие команды за сегодня"""
+    writer = sqlite_history.writer()
+    for command, duration in [('ls', 0.1), ('tar big.tar.gz big', 9.0), ('cp -r a b', 3.0)]:
+        token = writer.begin(command, '/')
+        writer.finish(token, 0, duration)
+
+    result = history.history(["2"], {'S'})
+
+    captured = capsys.readouterr()
+
+    assert result == 0
+    assert captured.out == (
+        "2. tar big.tar.gz big  # 9.000s, exit 0\n"
+        "3. cp -r a b  # 3.000s, exit 0\n"
+    )
+
+
+def test_history_sqlite_slowest_json(sqlite_history, capsys):
+    """history -S --json выводит записи NDJSON с длительностью"""
+    writer = sqlite_history.writer()
+    for command, duration in [('ls', 0.1), ('cp -r a b', 3.0)]:
+        token = writer.begin(command, '/')
+        writer.finish(token, 0, duration)
+
+    with output.json_records():
+        result = history.history(["1"], {'S'})
+
+    captured = capsys.readouterr()
+
+    assert result == 0
+    assert [json.loads(line) for line in captured.out.splitlines()] == [
+        {
+            'type': 'history',
+            'number': 2,
+            'command': 'cp -r a b',
+            'duration': 3.0,
+            'exit_code': 0,
+        }
+    ]
+
+
+def test_history_sqlite_slowest_uses_composite_index(sqlite_history):
+    """Запрос history -S читается из составного индекса без сортировки"""
+    connection = sqlite_history.connect(sqlite_history.HISTORY_DB_PATH)
+    connection.executescript(
+        'CREATE INDEX history_started ON history (started);'
+        'CREATE INDEX history_duration ON history (duration);'
+    )
+    connection.close()
+
+    connection = sqlite_history.connect(sqlite_history.HISTORY_DB_PATH)
+    plan = ' '.join(
+        row[-1]
+        for row in connection.execute(
+            'EXPLAIN QUERY PLAN ' + sqlite_history.SLOWEST_QUERY, (0.0, 5)
+        )
+    )
+    connection.close()
+
+    assert 'USING INDEX history_duration_started' in plan
+    assert 'TEMP B-TREE' not in plan
+
+
+def test_history_sqlite_search(sqlite_history, capsys):
+    """history -s ищет по истории в SQLite"""
+    writer = sqlite_history.writer()
+    for command in ['grep ERROR logs', 'ls', 'cat errors_50%.txt']:
+        writer.begin(command, '/')
+
+    history.history([r"error"], {'s', 'i'})
+    history.history([r"s_50%"], {'s'})
+
+    captured = capsys.readouterr()
+
+    assert captured.out == (
+        "1. grep ERROR logs\n3. cat errors_50%.txt\n3. cat errors_50%.txt\n"
+    )
+
+
+
+def test_history_sqlite_search_inline_flags(sqlite_history, capsys):
+    """history -s -i принимает шаблон со своими флагами"""
+    writer = sqlite_history.writer()
+    for command in ['grep FOO logs', 'ls']:
+        writer.begin(command, '/')
+
+    result = history.history(["(?x) f o o"], {'s', 'i'})
+
+    captured = capsys.readouterr()
+
+    assert result == 0
+    assert captured.out == "1. grep FOO logs\n"
+
+
+def flush_in_time(writer):
+    """Вызывает flush в отдельном потоке и проверяет, что он вернулся"""
+    thread = threading.Thread(target=writer.flush, daemon=True)
+    thread.start()
+    thread.join(5)
+    return not thread.is_alive()
+
+
+def test_history_sqlite_writer_survives_errors(sqlite_history):
+    """Ошибка SQLite пишется в лог, а flush не зависает"""
+    writer = sqlite_history.HistoryWriter(sqlite_history.HISTORY_DB_PATH)
+    writer.begin('ls', '/')
+    assert flush_in_time(writer)
+
+    connection = sqlite_history.connect(sqlite_history.HISTORY_DB_PATH)
+    connection.execute('DROP TABLE history')
+    connection.close()
+
+    with patch.object(sqlite_history, 'terminal_logger') as mock_logger:
+        writer.begin('pwd', '/')
+        assert flush_in_time(writer)
+        writer.close()
+
+    assert 'no such table: history' in mock_logger.error.call_args.args[0]
+
+
+def test_history_sqlite_writer_unopenable_database(tmp_path):
+    """Если базу нельзя открыть, flush и close не зависают"""
+    history_db = history.history_db
+
+    with patch.object(history_db, 'terminal_logger') as mock_logger:
+        writer = history_db.HistoryWriter(tmp_path)
+        writer.begin('ls', '/')
+        assert flush_in_time(writer)
+        writer.close()
+
+    mock_logger.error.assert_called_once()
+
+def test_history_slowest_requires_sqlite(mock_history_file, capsys):
+    """history -S с файловой историей показывает ошибку"""
+    result = history.history(["5"], {'S'})
+
+    captured = capsys.readouterr()
+
+    assert result == 1
+    assert captured.out == "-bash: history: -S: requires the sqlite history backend\n"
@@ -0,0 +1,247 @@
+import pytest
+import sys
+import threading
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import job_control
+import output
+from src import parser
+
+
+@pytest.fixture(autouse=True)
+def clean_jobs():
+    """Очищает таблицу фоновых задач после теста"""
+    yield
+    job_control.wait_all()
+    job_control._jobs.clear()
+
+
+@pytest.fixture
+def work_dir(tmp_path, monkeypatch):
+    """Создает рабочую директорию с файлом для команд"""
+    (tmp_path / 'file.txt').write_text('content', encoding='utf-8')
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def blocking(release, before='before', after='after'):
+    """Создает команду, которая ждет события между двумя строками вывода"""
+    def handler(arguments, flags):
+        output.echo(before)
+        release.wait(5)
+        output.echo(after)
+        output.flush()
+        return 3
+
+    return parser.Command('blocking', handler, (), frozenset(), 'blocking')
+
+
+def test_background_job_output_is_captured(work_dir, capsys):
+    """Тест: вывод фоновой задачи не попадает в терминал"""
+    assert parser.parser('cat file.txt &') == 0
+    assert parser.parser('wait 1') == 0
+
+    captured = capsys.readouterr()
+    assert captured.out == '[1] cat file.txt\n'
+
+
+def test_fg_prints_captured_output(work_dir, capsys):
+    """Тест: fg выводит накопленный вывод и удаляет задачу"""
+    parser.parser('cat file.txt &')
+    capsys.readouterr()
+
+    assert parser.parser('fg') == 0
+
+    captured = capsys.readouterr()
+    assert captured.out == 'cat file.txt\ncontent\n'
+    assert job_control.all_jobs() == []
+
+
+def test_fg_streams_running_job(capsys):
+    """Тест: после fg задача пишет прямо в терминал"""
+    release = threading.Event()
+    job = job_control.start(blocking(release))
+
+    threading.Timer(0.1, release.set).start()
+    assert parser.parser(f'fg {job.number}') == 3
+
+    captured = capsys.readouterr()
+    assert captured.out == 'blocking\nbefore\nafter\n'
+
+
+def test_jobs_lists_states(capsys):
+    """Тест: jobs показывает выполняющиеся и завершенные задачи"""
+    release = threading.Event()
+    job_control.start(blocking(release))
+
+    parser.parser('jobs')
+    release.set()
+    parser.parser('wait')
+    parser.parser('jobs')
+
+    captured = capsys.readouterr()
+    assert captured.out.splitlines() == [
+        '[1]  Running    blocking &',
+        '[1]  Exit 3     blocking &',
+    ]
+
+
+def test_jobs_json(capsys):
+    """Тест: jobs --json выводит записи о задачах"""
+    release = threading.Event()
+    release.set()
+    job_control.start(blocking(release))
+    parser.parser('wait')
+
+    parser.parser('jobs --json')
+
+    captured = capsys.readouterr()
+    assert captured.out == (
+        '{"type": "job", "number": 1, "line": "blocking",'
+        ' "state": "Exit 3", "exit_code": 3}\n'
+    )
+
+
+def test_wait_returns_exit_code(capsys):
+    """Тест: wait N возвращает код возврата задачи"""
+    release = threading.Event()
+    release.set()
+    job = job_control.start(blocking(release))
+
+    assert parser.parser(f'wait %{job.number}') == 3
+
+
+def test_no_such_job(capsys):
+    """Тест: несуществующая задача"""
+    assert parser.parser('fg') == 1
+    assert parser.parser('fg 7') == 1
+    assert parser.parser('wait 7') == 127
+
+    captured = capsys.readouterr()
+    assert captured.out.splitlines() == [
+        '-bash: fg: current: no such job',
+        '-bash: fg: 7: no such job',
+        '-bash: wait: 7: no such job',
+    ]
+
+
+def test_background_question_gets_empty_answer(capsys):
+    """Тест: вопрос фоновой задачи попадает в ее вывод"""
+    def handler(arguments, flags):
+        output.echo(f'answer: {output.ask("continue?")!r}')
+        output.flush()
+        return 0
+
+    job = job_control.start(
+        parser.Command('ask', handler, (), frozenset(), 'ask')
+    )
+    job.future.result()
+    parser.parser('fg')
+
+    captured = capsys.readouterr()
+    assert captured.out == "ask\ncontinue?\nanswer: ''\n"
+
+
+def test_collect_finished_keeps_jobs_with_output():
+    """Тест: завершенная задача без вывода удаляется после сообщения"""
+    silent = job_control.start(
+        parser.Command('silent', lambda a, f: 0, (), frozenset(), 'silent')
+    )
+    release = threading.Event()
+    release.set()
+    loud = job_control.start(blocking(release))
+    job_control.wait_all()
+
+    assert job_control.collect_finished() == [silent, loud]
+    assert job_control.collect_finished() == []
+    assert job_control.all_jobs() == [loud]
+
+
+def delayed(release, line):
+    """Создает команду, которая после события выполняет строку оболочки"""
+    def handler(arguments, flags):
+        release.wait(5)
+        return parser.parser(line)
+
+    return parser.Command('delayed', handler, (), frozenset(), 'delayed')
+
+
+def test_cd_does_not_wait_for_jobs(work_dir, capsys):
+    """Тест: cd сразу меняет директорию, а задача работает в своей"""
+    (work_dir / 'sub').mkdir()
+    release = threading.Event()
+    job = job_control.start(delayed(release, 'cp file.txt sub'))
+
+    assert parser.parser('cd sub') == 0
+    assert not job.future.done()
+    release.set()
+    job_control.wait_for([job])
+
+    assert (work_dir / 'sub' / 'file.txt').read_text() == 'content'
+    assert Path.cwd() == work_dir / 'sub'
+
+
+@pytest.mark.parametrize(
+    'line, expected',
+    [
+        ('cat file.txt', 'content'),
+        ('ls -R', './:\nfile.txt sub\n\n./sub/:\ninner.txt'),
+        ('grep -r in sub', 'inner.txt:  1. inner'),
+        ('cat file.txt | grep con', 'content'),
+    ],
+)
+def test_job_resolves_paths_from_its_directory(
+    work_dir, tmp_path_factory, capsys, line, expected
+):
+    """Тест: пути задачи, конвейера и пула ls -R идут от ее директории"""
+    (work_dir / 'sub').mkdir()
+    (work_dir / 'sub' / 'inner.txt').write_text('inner\n', encoding='utf-8')
+    release = threading.Event()
+    job = job_control.start(delayed(release, line))
+
+    assert parser.parser(f'cd {tmp_path_factory.mktemp("other")}') == 0
+    release.set()
+    job_control.wait_for([job])
+    capsys.readouterr()
+
+    assert parser.parser('fg') == 0
+    assert capsys.readouterr().out.strip() == f'delayed\n{expected}'
+
+
+def test_cd_in_job_changes_only_job_directory(work_dir, capsys):
+    """Тест: cd в задаче не меняет директорию оболочки"""
+    (work_dir / 'sub').mkdir()
+    (work_dir / 'sub' / 'file.txt').write_text('inner', encoding='utf-8')
+
+    def handler(arguments, flags):
+        parser.parser('cd sub')
+        return parser.parser('cat file.txt')
+
+    job = job_control.start(
+        parser.Command('inner', handler, (), frozenset(), 'inner')
+    )
+    job_control.wait_for([job])
+    capsys.readouterr()
+
+    assert parser.parser('fg') == 0
+    assert capsys.readouterr().out == 'inner\ninner\n'
+    assert Path.cwd() == work_dir
+
+
+def test_background_parse_error(capsys):
+    """Тест: ошибка разбора фоновой команды выводится сразу"""
+    assert parser.parser('nope &') == 1
+    assert parser.parser('&') == 1
+
+    captured = capsys.readouterr()
+    assert captured.out.splitlines() == [
+        'nope: command not found',
+        "syntax error near unexpected token `&'",
+    ]
+    assert job_control.all_jobs() == []
+
+
+if __name__ == '__main__':
+    pytest.main()
@@ -0,0 +1,122 @@
+import pytest
+import sys
+import tracemalloc
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from listing import CompactListing
+
+ROWS = [
+    ('b.txt', False, 0o100644, 10, 300.0),
+    ('abc', True, 0o40755, 4096, 100.0),
+    ('ab', False, 0o100644, 10, 200.0),
+    ('ёлка', False, 0o100644, 7, 300.0),
+    ('A', False, 0o100644, 0, -5.5),
+]
+
+
+def names(listing):
+    return [row[0] for row in listing]
+
+
+def test_round_trip():
+    """Тест: листинг возвращает те же записи в исходном порядке"""
+    listing = CompactListing.from_rows(ROWS, with_stat=True)
+
+    assert len(listing) == len(ROWS)
+    assert list(listing) == ROWS
+    assert listing.name(3) == 'ёлка'
+
+
+def test_without_stat():
+    """Тест: без with_stat поля stat не хранятся и равны нулю"""
+    listing = CompactListing.from_rows(ROWS)
+
+    assert list(listing)[1] == ('abc', True, 0, 0, 0.0)
+    assert len(listing.sizes) == 0
+
+
+@pytest.mark.parametrize(
+    'by, expected',
+    [
+        ('name', sorted(row[0] for row in ROWS)),
+        ('size', ['abc', 'ab', 'b.txt', 'ёлка', 'A']),
+        ('mtime', ['b.txt', 'ёлка', 'ab', 'abc', 'A']),
+    ],
+)
+def test_sort(by, expected):
+    """Тест: сортировка как у sorted, равные значения идут по имени"""
+    listing = CompactListing.from_rows(ROWS, with_stat=True)
+
+    listing.sort(by)
+
+    assert names(listing) == expected
+
+
+@pytest.mark.parametrize('by', ['name', 'size', 'mtime'])
+def test_sort_merges_runs(by):
+    """Тест: слияние отсортированных участков дает полную сортировку"""
+    full = CompactListing.from_rows(ROWS, with_stat=True)
+    full.sort(by)
+    listing = CompactListing.from_rows(ROWS, with_stat=True)
+
+    with patch('listing.LISTING_SORT_RUN', 2):
+        listing.sort(by)
+
+    assert names(listing) == names(full)
+
+
+def test_sort_peak_memory():
+    """Тест: сортировка не держит ключ на каждую запись листинга"""
+    rows = (
+        (f'file_{index * 7919 % 50_000:06}.txt', False, 0, index, 0.0)
+        for index in range(50_000)
+    )
+    listing = CompactListing.from_rows(rows, with_stat=True)
+
+    with patch('listing.LISTING_SORT_RUN', 1024):
+        tracemalloc.start()
+        try:
+            listing.sort('size')
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+    assert peak < listing.nbytes() / 2
+
+
+def test_directory_names():
+    """Тест: имена директорий идут в порядке вывода"""
+    listing = CompactListing.from_rows(
+        [('b', True, 0, 0, 0.0), ('c', False, 0, 0, 0.0)] + ROWS
+    )
+
+    listing.sort()
+
+    assert list(listing.directory_names()) == ['abc', 'b']
+
+
+def test_undecodable_name():
+    """Тест: имя, не декодируемое в UTF-8, сохраняется без потерь"""
+    name = b'\xff.bin'.decode(sys.getfilesystemencoding(), 'surrogateescape')
+    listing = CompactListing.from_rows([(name, False, 0, 0, 0.0)])
+
+    assert listing.name(0) == name
+
+
+def test_compact_size():
+    """Тест: запись с полями stat занимает десятки байт"""
+    rows = (
+        (f'file_{index:06}.txt', False, 0o100644, index, float(index))
+        for index in range(10_000)
+    )
+    listing = CompactListing.from_rows(rows, with_stat=True)
+    listing.sort('size')
+
+    assert listing.nbytes() < 10_000 * 50
+
+
+if __name__ == '__main__':
+    pytest.main()
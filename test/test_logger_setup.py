@@ -0,0 +1,94 @@
+import logging
+import pytest
+import queue
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from logger import logger_setup
+
+
+def make_record(message):
+    """Создает запись лога уровня INFO"""
+    return logging.LogRecord(
+        'test', logging.INFO, __file__, 0, message, None, None
+    )
+
+
+@pytest.fixture
+def log_handler(tmp_path):
+    """Создает обработчик с ротацией по 1000 байт"""
+    handler = logger_setup.BatchRotatingFileHandler(
+        tmp_path / 'shell.log',
+        maxBytes=1000,
+        backupCount=3,
+        encoding='utf-8',
+        delay=True,
+    )
+    handler.setFormatter(logging.Formatter('%(message)s'))
+    yield handler
+    handler.close()
+
+
+def test_rotation_counts_bytes(log_handler, tmp_path):
+    """Тест: ротация по байтам, а не по символам кириллицы"""
+    for _ in range(40):
+        log_handler.emit(make_record('запись ' * 10))
+    log_handler.flush()
+
+    files = sorted(tmp_path.glob('shell.log*'))
+    assert len(files) == 4
+    assert all(path.stat().st_size <= 1000 for path in files)
+
+
+def test_rotation_continues_existing_file(log_handler, tmp_path):
+    """Тест: размер уже записанного файла учитывается после запуска"""
+    (tmp_path / 'shell.log').write_text('x' * 990, encoding='utf-8')
+
+    log_handler.emit(make_record('новая запись'))
+    log_handler.flush()
+
+    assert (tmp_path / 'shell.log.1').stat().st_size == 990
+    assert (tmp_path / 'shell.log').read_text(encoding='utf-8') == (
+        'новая запись\n'
+    )
+
+
+def test_emit_does_not_flush(log_handler, tmp_path):
+    """Тест: записи копятся в буфере до сброса обработчика"""
+    log_handler.emit(make_record('first'))
+    log_handler.emit(make_record('second'))
+
+    assert (tmp_path / 'shell.log').read_text(encoding='utf-8') == ''
+
+    log_handler.flush()
+
+    assert (tmp_path / 'shell.log').read_text(encoding='utf-8') == (
+        'first\nsecond\n'
+    )
+
+
+def test_stop_logging_writes_queued_records(log_handler, tmp_path):
+    """Тест: при остановке записываются все записи из очереди"""
+    records = queue.SimpleQueue()
+    queue_handler = logger_setup.BatchQueueHandler(records)
+    listener = logger_setup.BatchQueueListener(records, log_handler)
+    log_handler.maxBytes = 0
+
+    with (
+        patch.object(logger_setup, 'terminal_logger_listener', listener),
+        patch.object(logger_setup, 'terminal_logger_handler', log_handler),
+    ):
+        listener.start()
+        for number in range(500):
+            queue_handler.handle(make_record(f'record {number}'))
+        logger_setup.stop_logging()
+
+    lines = (tmp_path / 'shell.log').read_text(encoding='utf-8').splitlines()
+    assert lines == [f'record {number}' for number in range(500)]
+
+
+if __name__ == '__main__':
+    pytest.main()
@@ -1,3 +1,5 @@
+import json
+import os
 import pytest
 import tempfile
 from pathlib import Path
@@ -6,6 +8,8 @@ import sys
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+import cancellation
+from src import parser
 from src.ubuntu_commands import ls
 
 
@@ -345,5 +349,193 @@ def test_ls_parent_directory(capsys):
     assert len(captured.out) > 0
 
 
+def test_ls_json_records(mock_temp_directory, capsys):
+    """ls --json выводит по записи NDJSON на каждый элемент"""
+    (Path(mock_temp_directory) / 'b.txt').write_text('content')
+    (Path(mock_temp_directory) / 'a').mkdir()
+
+    result = parser.parser(f'ls -l --json {mock_temp_directory}')
+
+    captured = capsys.readouterr()
+    records = [json.loads(line) for line in captured.out.splitlines()]
+    assert result == 0
+    assert [record['name'] for record in records] == ['a', 'b.txt']
+    assert records[1]['size'] == 7
+    assert records[1]['mode'].startswith('-rw')
+    assert records[1]['path'] == str(Path(mock_temp_directory) / 'b.txt')
+
+
+def test_ls_long_renders_record(mock_temp_files, capsys):
+    """ls -l выводит записи в прежнем текстовом формате"""
+    result = ls.ls([mock_temp_files[0]], {'l'})
+
+    captured = capsys.readouterr()
+    assert result == 0
+    assert captured.out == ls.ls_long(Path(mock_temp_files[0])) + '\n'
+
+
+
+def test_ls_unsorted_scandir_order(mock_temp_directory, capsys):
+    """ls -U выводит записи в порядке файловой системы"""
+    for name in ['c_file', 'a_file', '.hidden', 'b_file']:
+        (Path(mock_temp_directory) / name).write_text('content')
+
+    result = parser.parser(f'ls -U {mock_temp_directory}')
+
+    captured = capsys.readouterr()
+    expected = [
+        name
+        for name in os.listdir(mock_temp_directory)
+        if not name.startswith('.')
+    ]
+    assert result == 0
+    assert captured.out == ' '.join(expected) + '\n'
+
+
+def test_ls_long_formats_minute_once(mock_temp_directory, capsys):
+    """ls -l форматирует время один раз на минуту изменения"""
+    for number in range(20):
+        file_path = Path(mock_temp_directory) / f'file_{number}'
+        file_path.write_text('content')
+        os.utime(file_path, (1_700_000_000 + number, 1_700_000_000 + number))
+    ls._format_minute.cache_clear()
+
+    result = ls.ls([mock_temp_directory], {'l'})
+
+    captured = capsys.readouterr()
+    assert result == 0
+    assert len(captured.out.splitlines()) == 20
+    assert ls._format_minute.cache_info().misses == 1
+
+
+def test_ls_long_broken_symlink(mock_temp_directory, capsys):
+    """ls -l показывает битую ссылку вместо ошибки"""
+    (Path(mock_temp_directory) / 'link').symlink_to('missing')
+
+    result = ls.ls([mock_temp_directory], {'l'})
+
+    captured = capsys.readouterr()
+    assert result == 0
+    assert captured.out.startswith('l')
+    assert captured.out.rstrip().endswith('link')
+
+
+
+def make_tree(root, fanout=3, depth=3):
+    """Создает дерево директорий с файлом в каждой"""
+    directories = [root]
+    for _ in range(depth):
+        directories = [
+            directory / f'dir_{number}'
+            for directory in directories
+            for number in range(fanout)
+        ]
+        for directory in directories:
+            directory.mkdir()
+            (directory / 'file.txt').write_text('content')
+
+
+def test_ls_recursive(mock_temp_directory, capsys, monkeypatch):
+    """ls -R выводит поддиректории в глубину, ссылки не обходит"""
+    monkeypatch.chdir(mock_temp_directory)
+    Path('a/b').mkdir(parents=True)
+    Path('c').mkdir()
+    Path('a/file.txt').write_text('content')
+    Path('link').symlink_to('a')
+
+    result = ls.ls([], {'R'})
+
+    captured = capsys.readouterr()
+    assert result == 0
+    assert captured.out == (
+        './:\na c link\n\n./a/:\nb file.txt\n\n./a/b/:\n\n\n./c/:\n\n'
+    )
+
+
+def test_ls_recursive_deterministic(mock_temp_directory, capsys):
+    """ls -R выводит одно и то же при любом окне чтения и числе потоков"""
+    make_tree(Path(mock_temp_directory))
+
+    with (
+        patch('src.ubuntu_commands.ls.LS_WORKERS', 1),
+        patch('src.ubuntu_commands.ls.LS_PREFETCH', 1),
+    ):
+        ls.ls([mock_temp_directory], {'R', 'l'})
+    sequential = capsys.readouterr().out
+
+    with patch('src.ubuntu_commands.ls.LS_PREFETCH', 3):
+        ls.ls([mock_temp_directory], {'R', 'l'})
+    parallel = capsys.readouterr().out
+
+    assert parallel == sequential
+    assert sequential.count('/:\n') == 1 + 3 + 9 + 27
+
+
+def test_ls_recursive_cancelled(mock_temp_directory, capsys):
+    """ls -R останавливается между директориями при отмене"""
+    make_tree(Path(mock_temp_directory))
+    token = cancellation.CancelToken()
+    token.cancel()
+
+    with cancellation.scope(token):
+        with pytest.raises(cancellation.Cancelled):
+            ls.ls([mock_temp_directory], {'R'})
+
+
+
+@pytest.fixture
+def sized_files(mock_temp_directory):
+    """Создает файлы разного размера и времени изменения"""
+    for number, (name, size) in enumerate(
+        [('small', 1), ('large', 300), ('medium', 20), ('same', 20)]
+    ):
+        file_path = Path(mock_temp_directory) / name
+        file_path.write_text('x' * size)
+        os.utime(file_path, (1_700_000_000, 1_700_000_000 + number * 60))
+    return mock_temp_directory
+
+
+@pytest.mark.parametrize(
+    'line, names',
+    [
+        ('ls -S', 'large medium same small'),
+        ('ls -t', 'same medium large small'),
+        ('ls -S --top 2', 'large medium'),
+        ('ls --top=3 -t', 'same medium large'),
+        ('ls --top 2', 'large medium'),
+    ],
+)
+def test_ls_sort_and_top(sized_files, capsys, line, names):
+    """ls -S и -t сортируют по размеру и времени, --top оставляет первые"""
+    result = parser.parser(f'{line} {sized_files}')
+
+    captured = capsys.readouterr()
+    assert result == 0
+    assert captured.out == names + '\n'
+
+
+def test_ls_top_selects_with_heap(sized_files, capsys):
+    """ls --top не сортирует директорию целиком"""
+    with patch('listing.CompactListing.from_rows') as from_rows, \
+         patch('listing.CompactListing.sort') as full_sort:
+        result = ls.ls([sized_files], {'t', 'top=1'})
+
+    captured = capsys.readouterr()
+    assert result == 0
+    assert captured.out == 'same\n'
+    from_rows.assert_not_called()
+    full_sort.assert_not_called()
+
+
+@pytest.mark.parametrize('value', ['many', '²', '١٢', '-1'])
+def test_ls_top_invalid(capsys, value):
+    """ls --top с нечисловым значением возвращает ошибку"""
+    result = ls.ls(['.'], {f'top={value}'})
+
+    captured = capsys.readouterr()
+    assert result == 1
+    assert captured.out == f"ls: invalid number of entries: '{value}'\n"
+
+
 if __name__ == '__main__':
     pytest.main()
\ No newline at end of file
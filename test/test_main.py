@@ -0,0 +1,155 @@
+import os
+import pytest
+import subprocess
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src import main
+
+
+@pytest.fixture(autouse=True)
+def home(tmp_path):
+    """Подменяет историю и корзину в домашней директории"""
+    home = tmp_path / 'home'
+    home.mkdir()
+    with patch('ubuntu_commands.helper_functions.HISTORY_PATH', home / '.history'), \
+         patch('ubuntu_commands.helper_functions.TRASH_PATH', home / '.trash'), \
+         patch('ubuntu_commands.helper_functions.TRASH_ARCHIVE_PATH', home / '.trash.old'), \
+         patch('ubuntu_commands.helper_functions.TRASH_RETENTION_DAYS', 1):
+        yield home
+
+
+@pytest.fixture
+def work_dir(tmp_path, monkeypatch):
+    """Создает рабочую директорию с файлом для команд"""
+    (tmp_path / 'file.txt').write_text('content', encoding='utf-8')
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def test_main_commands_mode(work_dir, capsys):
+    """Тест: -c выполняет команды без приглашения"""
+    result = main.main(['-c', 'cat file.txt; cat file.txt'])
+
+    captured = capsys.readouterr()
+    assert result == 0
+    assert captured.out == 'content\ncontent\n'
+
+
+def test_main_commands_mode_exit_code(work_dir, capsys):
+    """Тест: код возврата - код последней команды"""
+    assert main.main(['-c', 'cat file.txt; cd missing']) == 1
+    assert main.main(['-c', 'cd missing; cat file.txt']) == 0
+
+
+def test_main_stop_on_error(work_dir, capsys):
+    """Тест: -e останавливает выполнение на первой ошибке"""
+    result = main.main(['-e', '-c', 'cd missing; cat file.txt'])
+
+    captured = capsys.readouterr()
+    assert result == 1
+    assert 'content' not in captured.out
+
+
+def test_main_script_mode(work_dir, capsys):
+    """Тест: команды выполняются из файла сценария"""
+    script = work_dir / 'script.sh'
+    script.write_text(
+        '#!/usr/bin/env terminal\n\ncat file.txt\n# comment\ncd missing\n',
+        encoding='utf-8',
+    )
+
+    result = main.main([str(script)])
+
+    captured = capsys.readouterr()
+    assert result == 1
+    assert captured.out.startswith('content\n')
+    assert 'No such file or directory' in captured.out
+
+
+def test_main_script_not_found(work_dir, capsys):
+    """Тест: отсутствующий сценарий дает код 127"""
+    result = main.main(['missing.sh'])
+
+    captured = capsys.readouterr()
+    assert result == 127
+    assert 'main.py: missing.sh: No such file or directory' in captured.out
+
+
+def test_main_does_not_record_history(work_dir, capsys):
+    """Тест: неинтерактивные команды не пишутся в историю"""
+    with patch.object(main.helper_functions, 'write_history') as mock_write:
+        main.main(['-c', 'cat file.txt'])
+
+    mock_write.assert_not_called()
+
+
+
+def test_main_script_syntax_error_runs_nothing(work_dir, capsys):
+    """Тест: сценарий с ошибкой разбора не выполняется вовсе"""
+    script = work_dir / 'script.sh'
+    script.write_text(
+        'cat file.txt\n' * 1000 + 'ls -z\n', encoding='utf-8'
+    )
+
+    with patch('src.main.run_command') as mock_run:
+        result = main.main([str(script)])
+
+    captured = capsys.readouterr()
+    assert result == 2
+    assert captured.out == 'main.py: line 1001: a non-existent flags\n'
+    mock_run.assert_not_called()
+
+
+def test_main_commands_mode_waits_for_jobs(work_dir, capsys):
+    """Тест: -c ждет фоновые задачи перед выходом"""
+    (work_dir / 'copy').mkdir()
+
+    result = main.main(['-c', 'cp file.txt copy &'])
+
+    captured = capsys.readouterr()
+    assert result == 0
+    assert captured.out == '[1] cp file.txt copy\n'
+    assert (work_dir / 'copy' / 'file.txt').exists()
+
+
+@pytest.mark.parametrize('script', [False, True])
+def test_main_rotates_trash(work_dir, home, capsys, script):
+    """Тест: -c и сценарий откладывают корзину прошлой сессии"""
+    (home / '.trash').mkdir()
+    (home / '.trash' / 'old.txt').write_text('old', encoding='utf-8')
+    (work_dir / 'script.sh').write_text('cat file.txt\n', encoding='utf-8')
+
+    if script:
+        assert main.main(['script.sh']) == 0
+    else:
+        assert main.main(['-c', 'cat file.txt']) == 0
+
+    assert list((home / '.trash').iterdir()) == []
+    [archived] = (home / '.trash.old').iterdir()
+    assert (archived / 'old.txt').read_text(encoding='utf-8') == 'old'
+
+
+def test_interactive_background_job(tmp_path):
+    """Тест: интерактивная оболочка запускает задачу в фоне и fg"""
+    (tmp_path / 'file.txt').write_text('content', encoding='utf-8')
+
+    result = subprocess.run(
+        [sys.executable, str(Path(main.__file__))],
+        input='cat file.txt &\nwait\nfg\n',
+        capture_output=True,
+        text=True,
+        env={**os.environ, 'HOME': str(tmp_path)},
+        timeout=30,
+    )
+
+    assert '[1] cat file.txt\n' in result.stdout
+    assert '[1]  Done       cat file.txt  (fg to see output)' in result.stdout
+    assert 'cat file.txt\ncontent\n' in result.stdout
+
+
+if __name__ == '__main__':
+    pytest.main()
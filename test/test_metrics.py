@@ -0,0 +1,140 @@
+import os
+import pytest
+import stat
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import metrics
+from src import parser
+
+
+@pytest.fixture
+def metrics_path(tmp_path, monkeypatch):
+    """Включает метрики с файлом во временной директории"""
+    path = tmp_path / 'terminal.prom'
+    monkeypatch.chdir(tmp_path)
+    with (
+        patch('metrics.METRICS_PATH', path),
+        patch('metrics._start_writer'),
+        patch.dict('metrics._commands', clear=True),
+    ):
+        yield path
+
+
+def test_render_histogram(metrics_path):
+    """Тест: корзины гистограммы накопительные"""
+    metrics.observe('tar', 0.003, False)
+    metrics.observe('tar', 0.2, False)
+    metrics.observe('tar', 1000.0, True)
+
+    lines = metrics.render().splitlines()
+
+    assert 'terminal_command_invocations_total{command="tar"} 3' in lines
+    assert 'terminal_command_errors_total{command="tar"} 1' in lines
+    assert (
+        'terminal_command_duration_seconds_bucket{command="tar",le="0.005"} 1'
+        in lines
+    )
+    assert (
+        'terminal_command_duration_seconds_bucket{command="tar",le="0.25"} 2'
+        in lines
+    )
+    assert (
+        'terminal_command_duration_seconds_bucket{command="tar",le="300"} 2'
+        in lines
+    )
+    assert (
+        'terminal_command_duration_seconds_bucket{command="tar",le="+Inf"} 3'
+        in lines
+    )
+    assert 'terminal_command_duration_seconds_count{command="tar"} 3' in lines
+    assert (
+        'terminal_command_duration_seconds_sum{command="tar"} 1000.203000'
+        in lines
+    )
+
+
+def test_command_run_observed(metrics_path, capsys):
+    """Тест: запуск, ошибка и байты команды попадают в метрики"""
+    (metrics_path.parent / 'file.txt').write_text('content')
+
+    parser.parser('cd missing')
+    parser.parser('grep -r content .')
+
+    assert metrics._commands['cd'].invocations == 1
+    assert metrics._commands['cd'].errors == 1
+    assert metrics._commands['grep'].errors == 0
+    assert metrics._commands['grep'].files == 1
+    assert metrics._commands['grep'].bytes == len('content')
+
+
+
+def test_archive_commands_observed(metrics_path, capsys):
+    """Тест: архивные команды учитывают файлы и байты"""
+    source = metrics_path.parent / 'source'
+    source.mkdir()
+    (source / 'a.txt').write_text('12345')
+    (source / 'b.txt').write_text('1234567890')
+    (metrics_path.parent / 'out').mkdir()
+
+    parser.parser('tar archive source/a.txt source/b.txt')
+    parser.parser('untar out archive.tar.gz')
+
+    for command in ('tar', 'untar'):
+        assert metrics._commands[command].errors == 0
+        assert metrics._commands[command].files == 2
+        assert metrics._commands[command].bytes == 15
+
+
+def test_closed_pipe_is_not_error(metrics_path, capsys):
+    """Тест: команда, которой закрыли выход конвейера, не ошибка"""
+    (metrics_path.parent / 'big.txt').write_text('line\n' * 100_000)
+
+    parser.parser('grep line big.txt | head 1')
+
+    assert metrics._commands['grep'].invocations == 1
+    assert metrics._commands['grep'].errors == 0
+
+def test_write_is_atomic(metrics_path):
+    """Тест: файл метрик заменяется целиком и доступен на чтение всем"""
+    metrics_path.write_text('old\n')
+    metrics.observe('ls', 0.01, False)
+
+    metrics.write()
+
+    assert 'terminal_command_invocations_total{command="ls"} 1' in (
+        metrics_path.read_text()
+    )
+    assert stat.S_IMODE(os.stat(metrics_path).st_mode) == 0o644
+    assert os.listdir(metrics_path.parent) == ['terminal.prom']
+
+
+def test_write_error_keeps_old_file(metrics_path):
+    """Тест: ошибка записи не портит прежний файл"""
+    metrics_path.write_text('old\n')
+
+    with patch('metrics.os.replace', side_effect=OSError('read-only')):
+        metrics.write()
+
+    assert metrics_path.read_text() == 'old\n'
+    assert os.listdir(metrics_path.parent) == ['terminal.prom']
+
+
+def test_metrics_disabled(tmp_path):
+    """Тест: без TERMINAL_METRICS_PATH метрики не собираются"""
+    with (
+        patch('metrics.METRICS_PATH', None),
+        patch.dict('metrics._commands', clear=True),
+    ):
+        metrics.observe('ls', 0.01, False)
+        metrics.add('ls', 1, 10)
+
+        assert metrics._commands == {}
+        assert not metrics.enabled()
+
+
+if __name__ == '__main__':
+    pytest.main()
@@ -0,0 +1,134 @@
+import io
+import pytest
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src import output
+
+
+class CountingBuffer(io.BytesIO):
+    """Байтовый буфер, считающий вызовы write"""
+
+    def __init__(self):
+        super().__init__()
+        self.writes = 0
+
+    def write(self, data):
+        self.writes += 1
+        return super().write(data)
+
+
+@pytest.fixture
+def counting_stdout():
+    """Создает текстовый поток над буфером с подсчетом записей"""
+    buffer = CountingBuffer()
+    return io.TextIOWrapper(buffer, encoding='utf-8'), buffer
+
+
+def test_echo_mirrors_print():
+    """Тест: echo форматирует значения так же, как print"""
+    with output.capture() as captured:
+        output.echo('a', 1, None)
+        output.echo('b', 'c', sep='-', end='!')
+        output.echo()
+
+    expected = io.StringIO()
+    print('a', 1, None, file=expected)
+    print('b', 'c', sep='-', end='!', file=expected)
+    print(file=expected)
+    assert captured.getvalue() == expected.getvalue()
+
+
+def test_capture_restores_sink():
+    """Тест: после capture вывод снова идет в stdout"""
+    with output.capture() as outer:
+        with output.capture() as inner:
+            output.echo('inner')
+        output.echo('outer')
+
+    assert inner.getvalue() == 'inner\n'
+    assert outer.getvalue() == 'outer\n'
+    assert output.current_sink() is output._stdout_sink
+
+
+def test_stream_sink_writes_blocks(counting_stdout):
+    """Тест: тысяча строк уходит в stdout несколькими записями"""
+    stream, buffer = counting_stdout
+    sink = output.StreamSink(buffer_size=4096)
+
+    with patch('sys.stdout', stream):
+        for number in range(1000):
+            sink.write(f'line {number}\n')
+        sink.flush()
+
+    data = buffer.getvalue().decode()
+    assert data == ''.join(f'line {number}\n' for number in range(1000))
+    assert buffer.writes < 5
+
+
+def test_stream_sink_keeps_order_with_print(counting_stdout):
+    """Тест: текст из print выводится раньше накопленного блока"""
+    stream, buffer = counting_stdout
+    sink = output.StreamSink()
+
+    with patch('sys.stdout', stream):
+        print('first')
+        sink.write('second\n')
+        sink.flush()
+
+    assert buffer.getvalue() == b'first\nsecond\n'
+
+
+def test_flushed_flushes_on_error():
+    """Тест: вывод команды сбрасывается даже при исключении"""
+    sink = output.CaptureSink()
+
+    @output.flushed
+    def failing_command(arguments, flags):
+        output.echo('partial')
+        raise RuntimeError('boom')
+
+    with output.use_sink(sink), patch.object(sink, 'flush') as mock_flush:
+        with pytest.raises(RuntimeError):
+            failing_command([], set())
+
+    mock_flush.assert_called_once()
+
+
+def test_ask_flushes_before_input(counting_stdout):
+    """Тест: накопленный вывод сбрасывается перед вопросом"""
+    stream, buffer = counting_stdout
+
+    def fake_input(prompt):
+        assert buffer.getvalue() == b'question\n'
+        return 'y'
+
+    with patch('sys.stdout', stream), \
+         patch('builtins.input', side_effect=fake_input):
+        output.echo('question')
+        assert output.ask('? ') == 'y'
+
+
+def test_emit_text_and_json():
+    """Тест: emit выводит текст, а в режиме JSON - запись NDJSON"""
+    record = {'type': 'entry', 'name': 'файл'}
+
+    with output.capture() as captured:
+        output.emit(record, lambda item: item['name'].upper())
+        output.emit({'type': 'summary'})
+        with output.json_records():
+            output.emit(record, 'unused')
+            output.echo('note')
+
+    assert captured.getvalue().splitlines() == [
+        'ФАЙЛ',
+        '{"type": "entry", "name": "файл"}',
+        '{"type": "message", "text": "note"}',
+    ]
+
+
+if __name__ == '__main__':
+    pytest.main()
@@ -0,0 +1,191 @@
+import pytest
+import sys
+from pathlib import Path
+from unittest.mock import MagicMock
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src import parser
+
+
+def test_split_commands_single():
+    """Тест: строка без ';' остается одной командой"""
+    assert parser.split_commands('ls -l') == ['ls -l']
+
+
+def test_split_commands_several():
+    """Тест: команды разделяются по ';' с удалением пробелов"""
+    assert parser.split_commands('cd /tmp; ls ;cat a') == [
+        'cd /tmp',
+        'ls',
+        'cat a',
+    ]
+
+
+def test_split_commands_quoted_semicolon():
+    """Тест: ';' в кавычках и после '\\' не разделяет команды"""
+    line = r"""grep 'a;b' f; grep "c;d" g; cat e\;f"""
+
+    assert parser.split_commands(line) == [
+        "grep 'a;b' f",
+        'grep "c;d" g',
+        r'cat e\;f',
+    ]
+
+
+def test_split_commands_skips_empty():
+    """Тест: пустые команды между ';' пропускаются"""
+    assert parser.split_commands(';; ls ;  ; ') == ['ls']
+
+
+
+def test_compile_line_resolves_command():
+    """Тест: строка разбирается в команду с функцией и флагами"""
+    command = parser.compile_line('grep -r -i error logs')
+
+    assert command.name == 'grep'
+    assert command.handler is parser.get_command('grep')
+    assert command.arguments == ('error', 'logs')
+    assert command.flags == frozenset({'r', 'i'})
+    assert command.line == 'grep -r -i error logs'
+
+
+def test_compile_line_cached():
+    """Тест: одинаковые строки переиспользуют разобранную команду"""
+    assert parser.compile_line('ls -l') is parser.compile_line('ls -l')
+    assert parser.compile_line('   ') is None
+
+
+def test_compile_line_errors():
+    """Тест: неизвестные команды и флаги отклоняются при разборе"""
+    with pytest.raises(parser.ParseError, match='command not found'):
+        parser.compile_line('missing_command')
+
+    with pytest.raises(parser.ParseError, match='a non-existent flags'):
+        parser.compile_line('ls -z')
+
+
+def test_compile_line_value_flags():
+    """Тест: флаг со значением задается через пробел или через '='"""
+    spaced = parser.compile_line('ls --top 5 -t logs')
+    joined = parser.compile_line('ls -t --top=5 logs')
+
+    assert spaced.flags == joined.flags == {'top=5', 't'}
+    assert spaced.arguments == joined.arguments == ('logs',)
+
+    with pytest.raises(parser.ParseError, match='requires an argument'):
+        parser.compile_line('ls --top')
+
+
+def test_compile_line_value_flag_repeated():
+    """Тест: при повторе флага со значением действует последний"""
+    command = parser.compile_line('ls --top 5 --top=2 -t --top 3 logs')
+
+    assert command.flags == {'top=3', 't'}
+
+
+@pytest.mark.parametrize(
+    'line', ['grep --top 5 x f', 'grep --top=5 x f', 'cat --top 1 f']
+)
+def test_compile_line_value_flag_other_command(line):
+    """Тест: флаг со значением другой команды - неизвестный флаг"""
+    with pytest.raises(parser.ParseError, match='a non-existent flags'):
+        parser.compile_line(line)
+
+
+def test_command_run_gets_copies():
+    """Тест: функция команды получает копии аргументов и флагов"""
+    handler = MagicMock(return_value=0)
+    command = parser.Command('ls', handler, ('a',), frozenset({'l'}), 'ls')
+
+    assert command.run() == 0
+    handler.assert_called_once_with(['a'], {'l'})
+
+
+def test_compile_script_reports_line_number():
+    """Тест: ошибка разбора сценария содержит номер строки"""
+    lines = ['# comment', 'ls', '', 'cd ..; missing_command']
+
+    with pytest.raises(parser.ParseError, match='line 4: missing_command'):
+        parser.compile_script(lines)
+
+
+def test_compile_script_plan():
+    """Тест: сценарий разбирается в список команд по порядку"""
+    plan = parser.compile_script(['cd ..; ls', '# comment', 'cat a'])
+
+    assert [command.name for command in plan] == ['cd', 'ls', 'cat']
+
+
+
+def test_compile_line_pipeline():
+    """Тест: строка с '|' разбирается в конвейер команд"""
+    command = parser.compile_line("grep -r 'a|b' logs | head 20")
+
+    assert isinstance(command, parser.Pipeline)
+    assert [stage.name for stage in command.stages] == ['grep', 'head']
+    assert command.stages[0].arguments == ('a|b', 'logs')
+    assert command.stages[1].arguments == ('20',)
+
+
+def test_compile_line_pipeline_empty_stage():
+    """Тест: '|' без команды с одной из сторон - ошибка разбора"""
+    with pytest.raises(parser.ParseError, match='unexpected token'):
+        parser.compile_line('ls |')
+
+
+def test_compile_line_json_flag():
+    """Тест: --json убирается из аргументов и включает вывод записей"""
+    command = parser.compile_line('ls --json -l logs')
+
+    assert command.json_output is True
+    assert command.arguments == ('logs',)
+    assert command.flags == frozenset({'l'})
+    assert parser.compile_line('ls -l logs').json_output is False
+
+
+@pytest.mark.parametrize(
+    'line, arguments',
+    [
+        ('grep -- --json file', ('--json', 'file')),
+        ('rm -- --json', ('--json',)),
+        ('grep pattern --json', ('pattern', '--json')),
+    ],
+)
+def test_compile_line_json_operand(line, arguments):
+    """Тест: --json после -- или после операнда остается операндом"""
+    command = parser.compile_line(line)
+
+    assert command.json_output is False
+    assert command.arguments == arguments
+
+
+def test_split_background():
+    """Тест: & в конце команды запускает ее в фоне"""
+    assert parser.split_background('tar a.tar dir &') == ('tar a.tar dir', True)
+    assert parser.split_background('ls -l&') == ('ls -l', True)
+    assert parser.split_background('ls') == ('ls', False)
+    assert parser.split_background("grep '&' file") == ("grep '&' file", False)
+    assert parser.split_background("grep 'a &'") == ("grep 'a &'", False)
+    assert parser.split_background(r'grep \&') == (r'grep \&', False)
+
+
+def test_compile_line_background():
+    """Тест: команда с & разбирается в фоновую задачу"""
+    command = parser.compile_line('cat a | head 1 &')
+
+    assert isinstance(command, parser.Background)
+    assert isinstance(command.command, parser.Pipeline)
+    assert command.line == 'cat a | head 1'
+
+
+def test_compile_line_background_without_command():
+    """Тест: & без команды - синтаксическая ошибка"""
+    with pytest.raises(parser.ParseError):
+        parser.compile_line('&')
+    with pytest.raises(parser.ParseError):
+        parser.compile_line('ls &&')
+
+
+if __name__ == '__main__':
+    pytest.main()
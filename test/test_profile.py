@@ -0,0 +1,149 @@
+import json
+import pstats
+import pytest
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import output
+from src import parser
+from src.ubuntu_commands import profile_
+
+
+@pytest.fixture
+def work_dir(tmp_path, monkeypatch):
+    """Создает рабочую директорию с файлами и папку для профилей"""
+    (tmp_path / 'file.txt').write_text('content', encoding='utf-8')
+    (tmp_path / 'other.txt').write_text('other', encoding='utf-8')
+    monkeypatch.chdir(tmp_path)
+    with patch(
+        'src.ubuntu_commands.profile_.PROFILE_DIR', tmp_path / 'profiles'
+    ):
+        yield tmp_path
+
+
+def test_profile_prints_hotspots(work_dir, capsys):
+    """Тест: profile выводит вывод команды и самые долгие функции"""
+    result = profile_.profile_(['ls'], set())
+
+    captured = capsys.readouterr()
+    lines = captured.out.splitlines()
+    assert result == 0
+    assert 'file.txt' in lines[0]
+    assert lines[1].split() == ['ncalls', 'tottime', 'cumtime', 'function']
+    assert any('ls.py:' in line and '(ls)' in line for line in lines)
+    assert lines[-1].startswith('profile: ')
+
+
+def test_profile_writes_files(work_dir, capsys):
+    """Тест: статистика сохраняется в pstats и свернутые стеки"""
+    with output.json_records():
+        profile_.profile_(['cat', 'file.txt'], set())
+
+    records = [
+        json.loads(line) for line in capsys.readouterr().out.splitlines()
+    ]
+    assert {record['type'] for record in records} == {
+        'file',
+        'hotspot',
+        'profile',
+    }
+
+    summary = records[-1]
+    stats = pstats.Stats(summary['pstats'])
+    assert any(name == 'cat' for _, _, name in stats.stats)
+
+    stacks = Path(summary['collapsed']).read_text().splitlines()
+    assert stacks
+    assert all(int(line.rsplit(' ', 1)[1]) > 0 for line in stacks)
+    assert any('cat.py:' in line for line in stacks)
+
+
+def test_profile_memory(work_dir, capsys):
+    """Тест: --mem выводит места выделения памяти"""
+    result = parser.parser('profile --mem cat file.txt other.txt')
+
+    captured = capsys.readouterr()
+    assert result == 0
+    assert 'allocation site' in captured.out
+
+
+def test_profile_exit_code(work_dir, capsys):
+    """Тест: profile возвращает код команды"""
+    assert profile_.profile_(['cd', 'missing'], set()) == 1
+
+
+def test_profile_same_second_does_not_overwrite(work_dir, capsys):
+    """Тест: два профиля одной команды в одну секунду - разные файлы"""
+    with patch('time.strftime', return_value='20260101-000000'):
+        profile_.profile_(['cat', 'file.txt'], set())
+        profile_.profile_(['cat', 'file.txt'], set())
+
+    assert len(list((work_dir / 'profiles').iterdir())) == 4
+
+
+def test_profile_save_error_keeps_exit_code(work_dir, capsys):
+    """Тест: ошибка сохранения профиля не заменяет код команды"""
+    (work_dir / 'profiles').write_text('not a directory')
+
+    result = profile_.profile_(['cd', 'missing'], set())
+
+    captured = capsys.readouterr()
+    assert result == 1
+    assert captured.out.splitlines()[-1].startswith(
+        'profile: cannot save profile: '
+    )
+
+
+def test_profile_errors(capsys):
+    """Тест: profile без команды, с неизвестной командой и флагом"""
+    assert profile_.profile_([], set()) == 1
+    assert profile_.profile_(['nope'], set()) == 1
+    assert profile_.profile_(['ls'], {'r'}) == 1
+
+    captured = capsys.readouterr()
+    assert captured.out.splitlines() == [
+        'Usage: profile [--mem] COMMAND [ARG]...',
+        'profile: nope: command not found',
+        'profile: does not support the flags: r',
+    ]
+
+
+def test_collapsed_stacks_split_time_between_callers():
+    """Тест: время функции делится между вызывающими"""
+    main = ('main.py', 1, 'main')
+    first = ('a.py', 1, 'first')
+    second = ('b.py', 1, 'second')
+    shared = ('c.py', 1, 'shared')
+
+    entries = {
+        main: (1, 1, 0.001, 0.010, {}),
+        first: (1, 1, 0.001, 0.004, {main: (1, 1, 0.001, 0.004)}),
+        second: (1, 1, 0.001, 0.006, {main: (1, 1, 0.001, 0.006)}),
+        shared: (
+            4,
+            4,
+            0.008,
+            0.008,
+            {
+                first: (1, 1, 0.002, 0.002),
+                second: (3, 3, 0.006, 0.006),
+            },
+        ),
+    }
+
+    stacks = dict(profile_.collapsed_stacks(entries))
+
+    assert stacks == {
+        'main.py:1(main)': 1000,
+        'main.py:1(main);a.py:1(first)': 1000,
+        'main.py:1(main);a.py:1(first);c.py:1(shared)': 2000,
+        'main.py:1(main);b.py:1(second)': 1000,
+        'main.py:1(main);b.py:1(second);c.py:1(shared)': 6000,
+    }
+
+
+if __name__ == '__main__':
+    pytest.main()
@@ -7,6 +7,8 @@ import shutil
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+import cancellation
+from src import trash
 from src.ubuntu_commands import rm
 
 
@@ -339,5 +341,80 @@ def test_rm_forbidden_paths_root(mock_trash_path, capsys):
         ])
 
 
+def test_trash_rotate_moves_old_trash_aside(tmp_path):
+    """Тест: корзина прошлой сессии откладывается одним переименованием"""
+    trash_path = tmp_path / '.trash'
+    archive_path = tmp_path / '.trash.old'
+    (trash_path / 'dir').mkdir(parents=True)
+    (trash_path / 'dir' / 'file.txt').write_text('content')
+
+    archived_path = trash.rotate(trash_path, archive_path)
+
+    assert list(trash_path.iterdir()) == []
+    assert archived_path.parent == archive_path
+    assert (archived_path / 'dir' / 'file.txt').read_text() == 'content'
+
+
+def test_trash_rotate_without_trash(tmp_path):
+    """Тест: при отсутствии корзины создается пустая"""
+    trash_path = tmp_path / '.trash'
+
+    assert trash.rotate(trash_path, tmp_path / '.trash.old') is None
+    assert trash_path.is_dir()
+
+
+def test_trash_purge_respects_retention(tmp_path):
+    """Тест: удаляются только корзины старше срока хранения"""
+    now = 10 * trash.SECONDS_PER_DAY
+    old = tmp_path / str(int((now - 3 * trash.SECONDS_PER_DAY) * 1e9))
+    recent = tmp_path / str(int((now - trash.SECONDS_PER_DAY) * 1e9))
+    old.mkdir()
+    recent.mkdir()
+
+    assert trash.expired(tmp_path, 2, now=now) == [old]
+    assert sorted(trash.expired(tmp_path, 0, now=now)) == [old, recent]
+
+
+def test_trash_purge_in_background(tmp_path):
+    """Тест: старые корзины удаляются в фоновом потоке"""
+    archived_path = tmp_path / '1'
+    (archived_path / 'dir').mkdir(parents=True)
+
+    thread = trash.purge_in_background(tmp_path, 0)
+    thread.join()
+
+    assert list(tmp_path.iterdir()) == []
+    assert trash.purge_in_background(tmp_path, 0) is None
+
+
+def test_rm_cancelled_keeps_directory_and_undo(tmp_path, mock_trash_path):
+    """Отмена rm -r оставляет директорию и запись undo для удаленного"""
+    removed = tmp_path / 'removed.txt'
+    removed.write_text('content')
+    directory = tmp_path / 'dir'
+    directory.mkdir()
+    for number in range(3):
+        (directory / f'file{number}.txt').write_text('content')
+
+    token = cancellation.CancelToken()
+    real_copy2 = shutil.copy2
+
+    def copy2(source, destination, **kwargs):
+        result = real_copy2(source, destination, **kwargs)
+        token.cancel()
+        return result
+
+    with patch('src.ubuntu_commands.rm.FOR_UNDO_HISTORY', []) as mock_history, \
+         patch('builtins.input', return_value='y'), \
+         patch('shutil.copy2', side_effect=copy2), cancellation.scope(token):
+        with pytest.raises(cancellation.Cancelled):
+            rm.rm([str(removed), str(directory)], {'r'})
+
+    assert not removed.exists()
+    assert len(list(directory.iterdir())) == 3
+    assert not (Path(mock_trash_path) / 'dir').exists()
+    assert mock_history == [['rm', str(removed), Path('.')]]
+
+
 if __name__ == '__main__':
-    pytest.main()
\ No newline at end of file
+    pytest.main()
@@ -0,0 +1,229 @@
+import json
+import pytest
+import socket
+import sys
+import threading
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import output
+import parser
+import protocol
+from src import client, server
+
+
+@pytest.fixture
+def shell_server(tmp_path):
+    """Запускает сервер оболочки на временном сокете"""
+    socket_path = tmp_path / 'shell.sock'
+    shell = server.ShellServer(socket_path, parser.parser)
+    thread = threading.Thread(target=shell.serve_forever, daemon=True)
+    thread.start()
+
+    yield socket_path
+
+    shell.shutdown()
+    shell.server_close()
+    thread.join()
+
+
+@pytest.fixture
+def connection(shell_server):
+    """Подключается к серверу и возвращает потоки чтения и записи"""
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.connect(str(shell_server))
+    with sock:
+        yield sock.makefile('rb'), sock.makefile('wb')
+
+
+def test_server_streams_output(connection, tmp_path, capsys):
+    """Тест: вывод команды передается клиенту"""
+    (tmp_path / 'file.txt').write_text('content', encoding='utf-8')
+
+    exit_code, cwd = client.request(
+        *connection, 'cat file.txt', str(tmp_path)
+    )
+
+    captured = capsys.readouterr()
+    assert exit_code == 0
+    assert cwd == str(tmp_path)
+    assert captured.out == 'content\n'
+
+
+def test_server_keeps_connection(connection, tmp_path, capsys):
+    """Тест: одно соединение выполняет несколько строк"""
+    (tmp_path / 'sub').mkdir()
+
+    exit_code, cwd = client.request(*connection, 'cd sub', str(tmp_path))
+    assert exit_code == 0
+    assert cwd == str(tmp_path / 'sub')
+
+    exit_code, cwd = client.request(*connection, 'cd missing', cwd)
+    captured = capsys.readouterr()
+    assert exit_code == 1
+    assert cwd == str(tmp_path / 'sub')
+    assert 'No such file or directory' in captured.out
+
+
+def test_server_stop_on_error(connection, tmp_path, capsys):
+    """Тест: stop_on_error останавливает строку на первой ошибке"""
+    (tmp_path / 'file.txt').write_text('content\n', encoding='utf-8')
+
+    exit_code, _ = client.request(
+        *connection, 'cd missing; cat file.txt', str(tmp_path), True
+    )
+
+    captured = capsys.readouterr()
+    assert exit_code == 1
+    assert 'content' not in captured.out
+
+
+def test_server_missing_cwd(connection, tmp_path, capsys):
+    """Тест: несуществующая рабочая директория клиента"""
+    exit_code, _ = client.request(
+        *connection, 'ls', str(tmp_path / 'missing')
+    )
+
+    captured = capsys.readouterr()
+    assert exit_code == 1
+    assert 'No such file or directory' in captured.out
+
+
+def test_server_forwards_questions(tmp_path, capsys):
+    """Тест: вопрос команды задается пользователю клиента"""
+    socket_path = tmp_path / 'shell.sock'
+
+    def execute(line):
+        output.echo(f'answer: {output.ask("continue? ")}')
+        return 0
+
+    shell = server.ShellServer(socket_path, execute)
+    thread = threading.Thread(target=shell.serve_forever, daemon=True)
+    thread.start()
+
+    try:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.connect(str(socket_path))
+        with sock, patch('builtins.input', return_value='y') as mock_input:
+            exit_code, _ = client.request(
+                sock.makefile('rb'), sock.makefile('wb'), 'ask', str(tmp_path)
+            )
+    finally:
+        shell.shutdown()
+        shell.server_close()
+        thread.join()
+
+    captured = capsys.readouterr()
+    assert exit_code == 0
+    mock_input.assert_called_once_with('continue? ')
+    assert captured.out == 'answer: y\n'
+
+
+
+@pytest.fixture
+def asking_server(tmp_path):
+    """Запускает сервер, команда ask которого задает вопрос"""
+    socket_path = tmp_path / 'shell.sock'
+
+    def execute(line):
+        if line == 'ask':
+            answer = output.ask('continue? ')
+            output.echo(f'answer: {answer!r} in {Path.cwd().name}')
+        else:
+            output.echo(f'in {Path.cwd().name}')
+        return 0
+
+    shell = server.ShellServer(socket_path, execute)
+    thread = threading.Thread(target=shell.serve_forever, daemon=True)
+    thread.start()
+
+    yield socket_path
+
+    shell.shutdown()
+    shell.server_close()
+    thread.join()
+
+
+def send_request(socket_path, line, cwd):
+    """Отправляет строку серверу и возвращает потоки соединения"""
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.connect(str(socket_path))
+    reader, writer = sock.makefile('rb'), sock.makefile('wb')
+    protocol.write_frame(
+        writer,
+        protocol.REQUEST,
+        json.dumps({'line': line, 'cwd': str(cwd)}).encode(),
+    )
+    return sock, reader, writer
+
+
+def test_server_question_does_not_block_clients(
+    asking_server, tmp_path, capsys
+):
+    """Тест: пока один клиент отвечает, команды другого выполняются"""
+    (tmp_path / 'a').mkdir()
+    (tmp_path / 'b').mkdir()
+
+    sock, reader, writer = send_request(asking_server, 'ask', tmp_path / 'a')
+    with sock:
+        assert protocol.read_frame(reader) == (protocol.QUESTION, b'continue? ')
+
+        other = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        other.connect(str(asking_server))
+        with other:
+            exit_code, _ = client.request(
+                other.makefile('rb'), other.makefile('wb'), 'pwd',
+                str(tmp_path / 'b'),
+            )
+        assert capsys.readouterr().out == 'in b\n'
+
+        protocol.write_frame(writer, protocol.ANSWER, b'y')
+        assert protocol.read_frame(reader) == (
+            protocol.OUTPUT, b"answer: 'y' in a\n"
+        )
+        assert protocol.read_frame(reader)[0] == protocol.EXIT
+
+
+def test_server_question_timeout(asking_server, tmp_path):
+    """Тест: без ответа клиента вопрос получает пустой ответ"""
+    with patch('src.server.SERVER_ANSWER_TIMEOUT', 0.1):
+        sock, reader, _ = send_request(asking_server, 'ask', tmp_path)
+        with sock:
+            assert protocol.read_frame(reader)[0] == protocol.QUESTION
+            assert protocol.read_frame(reader) == (
+                protocol.OUTPUT, f"answer: '' in {tmp_path.name}\n".encode()
+            )
+            assert protocol.read_frame(reader)[0] == protocol.EXIT
+            assert protocol.read_frame(reader) is None
+
+def test_remove_stale_socket(tmp_path):
+    """Тест: сокет завершившегося сервера удаляется"""
+    socket_path = tmp_path / 'shell.sock'
+    stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    stale.bind(str(socket_path))
+    stale.close()
+
+    assert server.remove_stale_socket(socket_path) is True
+    assert not socket_path.exists()
+
+
+def test_remove_stale_socket_running(shell_server):
+    """Тест: сокет работающего сервера не удаляется"""
+    assert server.remove_stale_socket(shell_server) is False
+    assert shell_server.exists()
+
+
+def test_client_server_not_running(tmp_path, capsys):
+    """Тест: клиент без сервера"""
+    socket_path = tmp_path / 'missing.sock'
+    result = client.main(['--socket', str(socket_path), '-c', 'ls'])
+
+    captured = capsys.readouterr()
+    assert result == 1
+    assert 'client.py:' in captured.out
+
+
+if __name__ == '__main__':
+    pytest.main()
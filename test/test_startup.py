@@ -0,0 +1,90 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+SRC_PATH = Path(__file__).parent.parent / 'src'
+
+
+def run_python(code, home):
+    """Выполняет код в отдельном интерпретаторе из директории src"""
+    return subprocess.run(
+        [sys.executable, '-c', code],
+        cwd=SRC_PATH,
+        env={**os.environ, 'HOME': str(home)},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+
+@pytest.fixture
+def empty_home(tmp_path):
+    """Создает пустую домашнюю директорию для запускаемой оболочки"""
+    home = tmp_path / 'home'
+    home.mkdir()
+    return home
+
+
+def test_import_parser_does_not_import_commands(empty_home):
+    """Тест: импорт парсера не загружает модули команд"""
+    result = run_python(
+        'import sys, parser\n'
+        'print(sorted(name for name in sys.modules'
+        " if name.startswith('ubuntu_commands.')))",
+        empty_home,
+    )
+
+    assert result.stdout.strip() == "['ubuntu_commands.helper_functions']"
+
+
+def test_command_module_imported_on_first_use(empty_home):
+    """Тест: модуль команды загружается при первом вызове"""
+    result = run_python(
+        'import sys, parser\n'
+        "parser.parser('cd .')\n"
+        "print('ubuntu_commands.cd' in sys.modules,"
+        " 'ubuntu_commands.zip_' in sys.modules)",
+        empty_home,
+    )
+
+    assert result.stdout.strip() == 'True False'
+
+
+def test_import_constants_does_not_touch_home(empty_home):
+    """Тест: импорт констант не создает файлов в домашней директории"""
+    run_python('import constants', empty_home)
+
+    assert list(empty_home.iterdir()) == []
+
+
+def test_first_prompt_does_not_import_commands(empty_home):
+    """Тест: до первого приглашения модули команд не загружаются"""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', str(SRC_PATH / 'main.py')],
+        cwd=SRC_PATH,
+        env={**os.environ, 'HOME': str(empty_home)},
+        stdin=subprocess.DEVNULL,
+        capture_output=True,
+        text=True,
+    )
+    imported = {
+        line.rsplit('|', 1)[1].strip()
+        for line in result.stderr.splitlines()
+        if line.startswith('import time:') and '|' in line
+    }
+
+    assert result.stdout.endswith(' ')
+    assert 'repl' in imported
+    assert {
+        name for name in imported if name.startswith('ubuntu_commands.')
+    } == {'ubuntu_commands.helper_functions'}
+    assert imported.isdisjoint({'listing', 'tarfile', 'zipfile', 'sqlite3'})
+    assert (empty_home / '.history').exists()
+    assert (empty_home / '.trash').is_dir()
+
+
+if __name__ == '__main__':
+    pytest.main()
@@ -0,0 +1,182 @@
+import collections
+import os
+import pytest
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import stat_cache
+from src import parser
+
+
+@pytest.fixture
+def work_dir(tmp_path, monkeypatch):
+    """Создает файл и директорию с вложенными файлами"""
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'file.txt').write_text('content\n')
+    (tmp_path / 'dir' / 'sub').mkdir(parents=True)
+    (tmp_path / 'dir' / 'a.txt').write_text('content\n')
+    (tmp_path / 'dir' / 'sub' / 'b.txt').write_text('content\n')
+    with patch('ubuntu_commands.rm.TRASH_PATH', tmp_path / 'trash'):
+        yield tmp_path
+
+
+def count_stats(line):
+    """Выполняет команду и считает вызовы os.stat по путям"""
+    calls = collections.Counter()
+    real_stat = os.stat
+
+    def recording_stat(path, *args, **kwargs):
+        calls[os.fspath(path)] += 1
+        return real_stat(path, *args, **kwargs)
+
+    with patch('os.stat', side_effect=recording_stat):
+        parser.parser(line)
+    return calls
+
+
+@pytest.mark.parametrize(
+    'line, paths',
+    [
+        ('ls -l file.txt', {'file.txt': 1}),
+        ('grep content file.txt', {'file.txt': 1}),
+        ('grep -r content dir', {'dir': 1}),
+    ],
+)
+def test_stat_once(work_dir, capsys, line, paths):
+    """Тест: каждый путь проверяется одним вызовом stat"""
+    assert count_stats(line) == paths
+
+
+@pytest.mark.parametrize(
+    'line, mutation',
+    [
+        ('cp file.txt dir', 'logger.command_summary.CommandSummary.copy2'),
+        ('mv file.txt dir', 'shutil.move'),
+        ('rm file.txt dir/a.txt', 'pathlib.Path.unlink'),
+    ],
+)
+def test_checks_stat_once(work_dir, capsys, line, mutation):
+    """Тест: проверки cp, mv и rm делают один stat на путь
+
+    Само копирование и перемещение заменены, чтобы считать только
+    проверки команды, а не вызовы внутри shutil."""
+    with (
+        patch(mutation),
+        patch('logger.command_summary.CommandSummary.copy2'),
+    ):
+        calls = count_stats(line)
+
+    assert set(calls.values()) == {1}
+    assert set(line.split()[1:]) <= set(calls)
+
+
+def test_invalidated_after_remove(work_dir, capsys):
+    """Тест: после удаления файла кэш не считает его существующим"""
+    parser.parser('rm file.txt file.txt')
+
+    captured = capsys.readouterr()
+    assert (
+        "rm: cannot remove 'file.txt': No such file or directory"
+        in captured.out
+    )
+
+
+def test_fallback_outside_command(work_dir):
+    """Тест: вне команды проверки вызывают методы Path"""
+    with patch('pathlib.Path.exists', return_value=False) as exists:
+        assert not stat_cache.exists(Path('file.txt'))
+
+    exists.assert_called_once()
+    assert stat_cache.current() is None
+
+
+def test_scope_caches_missing_path(work_dir):
+    """Тест: отсутствие пути тоже запоминается до сброса кэша"""
+    with stat_cache.scope():
+        assert not stat_cache.exists(Path('new.txt'))
+        Path('new.txt').write_text('')
+        assert not stat_cache.exists(Path('new.txt'))
+
+        stat_cache.invalidate()
+        assert stat_cache.is_file(Path('new.txt'))
+
+
+def test_iter_files_order(work_dir):
+    """Тест: обход дает те же файлы и в том же порядке, что rglob"""
+    (work_dir / 'dir' / 'link').symlink_to(work_dir / 'dir' / 'sub')
+    (work_dir / 'dir' / 'sub' / 'c.txt').write_text('')
+
+    expected = [
+        path for path in Path('dir').rglob('*') if not path.is_dir()
+    ]
+
+    assert list(stat_cache.iter_files(Path('dir'))) == expected
+
+
+
+@pytest.fixture
+def directory_cache():
+    """Включает кэш директорий без окна для недавно измененных"""
+    cache = stat_cache.DirectoryCache()
+    with (
+        patch('stat_cache._directories', cache),
+        patch('stat_cache.DIRECTORY_CACHE_RACY_SECONDS', 0),
+        patch('stat_cache.scan', wraps=stat_cache.scan) as scan,
+    ):
+        yield cache, scan
+
+
+def test_directory_cache_reused_across_commands(work_dir, directory_cache):
+    """Тест: повторный grep -r не читает неизмененные директории"""
+    _, scan = directory_cache
+
+    parser.parser('grep -r content dir')
+    parser.parser('grep -r content dir')
+
+    assert scan.call_count == 2
+
+
+def test_directory_cache_sees_changes(work_dir, directory_cache):
+    """Тест: изменение директории сбрасывает ее запись в кэше"""
+    cache, scan = directory_cache
+    before = list(stat_cache.iter_files(Path('dir')))
+
+    (work_dir / 'dir' / 'c.txt').write_text('')
+    (work_dir / 'dir' / 'a.txt').unlink()
+
+    assert list(stat_cache.iter_files(Path('dir'))) == [
+        path for path in Path('dir').rglob('*') if not path.is_dir()
+    ]
+    assert Path('dir/a.txt') in before
+    assert scan.call_count == 3
+
+
+def test_directory_cache_skips_recent_directories(work_dir):
+    """Тест: только что измененная директория не сохраняется"""
+    cache = stat_cache.DirectoryCache()
+
+    with patch('stat_cache.scan', wraps=stat_cache.scan) as scan:
+        cache.read('dir')
+        cache.read('dir')
+
+    assert scan.call_count == 2
+
+
+def test_directory_cache_evicts_oldest(work_dir, directory_cache):
+    """Тест: кэш держит не больше заданного числа имен"""
+    cache, scan = directory_cache
+    cache.names = 2
+
+    cache.read('dir')
+    cache.read('dir/sub')
+    cache.read('dir/sub')
+    cache.read('dir')
+
+    assert scan.call_count == 3
+
+
+if __name__ == '__main__':
+    pytest.main()
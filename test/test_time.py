@@ -0,0 +1,196 @@
+import json
+import os
+import pytest
+import sys
+import threading
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import accounting
+import output
+from src import main
+from src.ubuntu_commands import time_
+
+
+@pytest.fixture
+def work_dir(tmp_path, monkeypatch):
+    """Создает рабочую директорию с файлами для команд"""
+    (tmp_path / 'file.txt').write_text('content', encoding='utf-8')
+    (tmp_path / 'other.txt').write_text('other', encoding='utf-8')
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def test_time_reports_usage(work_dir, capsys):
+    """Тест: time выводит вывод команды, а затем ее ресурсы"""
+    result = time_.time_(['cat', 'file.txt'], set())
+
+    captured = capsys.readouterr()
+    assert result == 0
+    assert captured.out.startswith('content\n')
+
+    rows = dict(
+        line.split('\t') for line in captured.out.splitlines() if '\t' in line
+    )
+    assert list(rows) == [
+        'real',
+        'user',
+        'sys',
+        'read',
+        'written',
+        'opened',
+        'stat',
+        'maxrss',
+    ]
+    assert rows['real'].startswith('0m')
+    assert rows['opened'] == '1'
+
+
+def test_time_counts_files_and_stat_calls(work_dir, capsys):
+    """Тест: открытые файлы и вызовы stat считаются для команды"""
+    with output.json_records():
+        time_.time_(['cat', 'file.txt', 'other.txt'], set())
+
+    records = [
+        json.loads(line)
+        for line in capsys.readouterr().out.splitlines()
+        if line.startswith('{')
+    ]
+    usage = records[-1]
+    assert usage['type'] == 'time'
+    assert usage['line'] == 'cat file.txt other.txt'
+    assert usage['files_opened'] == 2
+    assert usage['stat_calls'] >= 2
+    assert usage['read_bytes'] >= len('content') + len('other')
+
+
+def test_time_exit_code(work_dir, capsys):
+    """Тест: time возвращает код команды"""
+    assert time_.time_(['cd', 'missing'], set()) == 1
+
+    captured = capsys.readouterr()
+    assert 'real\t' in captured.out
+
+
+def test_time_errors(capsys):
+    """Тест: time без команды и с неизвестной командой"""
+    assert time_.time_([], set()) == 1
+    assert time_.time_(['nope'], set()) == 1
+
+    captured = capsys.readouterr()
+    assert captured.out.splitlines() == [
+        'Usage: time COMMAND [ARG]...',
+        'time: nope: command not found',
+    ]
+
+
+@pytest.mark.skipif(
+    not accounting.PROC_CLEAR_REFS_PATH.exists(),
+    reason='сброс пика памяти поддерживается только в Linux',
+)
+def test_nested_measure_keeps_outer_peak():
+    """Тест: вложенное измерение не сбрасывает пик внешнего"""
+    with accounting.measure() as outer:
+        data = bytearray(32 * 1024 * 1024)
+        data[::4096] = b'x' * len(data[::4096])
+        del data
+        with accounting.measure() as inner:
+            pass
+
+    assert outer.peak_rss is not None and inner.peak_rss is not None
+    assert outer.peak_rss >= inner.peak_rss + 16 * 1024 * 1024
+
+
+
+def test_measure_ignores_other_threads(work_dir):
+    """Тест: stat и открытия других потоков не попадают в измерение"""
+    started = threading.Event()
+    release = threading.Event()
+
+    def other():
+        started.set()
+        release.wait(5)
+        for _ in range(50):
+            os.stat('file.txt')
+            Path('file.txt').read_text()
+
+    thread = threading.Thread(target=other)
+    thread.start()
+    started.wait(5)
+    with accounting.measure() as usage:
+        release.set()
+        thread.join()
+        os.stat('file.txt')
+
+    assert usage.stat_calls == 1
+    assert usage.files_opened == 0
+
+
+def test_measure_restores_stat():
+    """Тест: после измерения os.stat и os.lstat снова исходные"""
+    original_stat, original_lstat = os.stat, os.lstat
+
+    with accounting.measure():
+        assert os.stat is not original_stat
+
+    assert os.stat is original_stat
+    assert os.lstat is original_lstat
+    assert original_stat in os.supports_fd
+
+
+def test_time_counts_ls_entry_stats(work_dir, capsys):
+    """Тест: stat записей ls -lR из пула потоков учитываются"""
+    (work_dir / 'dir' / 'sub').mkdir(parents=True)
+    for number in range(5):
+        (work_dir / 'dir' / 'sub' / f'{number}.txt').write_text('')
+
+    with output.json_records():
+        time_.time_(['ls', '-lR', 'dir'], set())
+
+    usage = json.loads(capsys.readouterr().out.splitlines()[-1])
+    assert usage['stat_calls'] >= 6
+
+def test_accounting_log(work_dir, capsys):
+    """Тест: TERMINAL_ACCOUNTING=1 записывает ресурсы каждой команды"""
+    with (
+        patch('accounting.ACCOUNTING_LOG', True),
+        patch('accounting.terminal_logger') as logger,
+        patch('ubuntu_commands.helper_functions.prepare_home'),
+    ):
+        main.main(['-c', 'cat file.txt; cd missing'])
+
+    messages = [call.args[0] for call in logger.info.call_args_list]
+    assert messages[0].startswith('cat file.txt - real=')
+    assert 'opened=1 ' in messages[0]
+    assert messages[1].startswith('cd missing - real=')
+
+
+def test_accounting_log_disabled(work_dir, capsys):
+    """Тест: без TERMINAL_ACCOUNTING ресурсы не записываются"""
+    with (
+        patch('accounting.terminal_logger') as logger,
+        patch('ubuntu_commands.helper_functions.prepare_home'),
+    ):
+        main.main(['-c', 'cat file.txt'])
+
+    logger.info.assert_not_called()
+
+
+def test_format_size():
+    """Тест: размеры выводятся как в ls -h"""
+    assert accounting.format_size(None) == '-'
+    assert accounting.format_size(512) == '512'
+    assert accounting.format_size(4096) == '4.0K'
+    assert accounting.format_size(3 * 1024 * 1024) == '3.0M'
+
+
+def test_format_seconds():
+    """Тест: время выводится как в bash"""
+    assert accounting.format_seconds(1.25) == '0m1.250s'
+    assert accounting.format_seconds(61.5) == '1m1.500s'
+
+
+if __name__ == '__main__':
+    pytest.main()
@@ -0,0 +1,98 @@
+import pytest
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import cancellation
+from src import parser
+from src.ubuntu_commands import timeout
+
+
+@pytest.fixture
+def work_dir(tmp_path, monkeypatch):
+    """Создает рабочую директорию с файлом для команд"""
+    (tmp_path / 'file.txt').write_text('content', encoding='utf-8')
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def test_timeout_runs_command(work_dir, capsys):
+    """Тест: команда, успевшая за срок, возвращает свой код"""
+    assert timeout.timeout(['5', 'cat', 'file.txt'], set()) == 0
+    assert timeout.timeout(['5', 'cd', 'missing'], set()) == 1
+
+    captured = capsys.readouterr()
+    assert captured.out.startswith('content\n')
+
+
+def test_timeout_expired(work_dir, capsys):
+    """Тест: истекший срок дает код 124"""
+    (work_dir / 'dir').mkdir()
+    (work_dir / 'dir' / 'file.txt').write_text('content')
+
+    result = timeout.timeout(['0.000001', 'cp', '-r', 'dir', 'copy'], set())
+
+    assert result == 124
+    assert not (work_dir / 'copy').exists()
+
+
+def test_timeout_zero_disables_deadline(work_dir, capsys):
+    """Тест: срок 0 отключает ограничение, как в GNU timeout"""
+    assert timeout.timeout(['0', 'cat', 'file.txt'], set()) == 0
+
+
+def test_timeout_usage(capsys):
+    """Тест: timeout без команды"""
+    assert timeout.timeout(['5'], set()) == 125
+
+    captured = capsys.readouterr()
+    assert captured.out == 'Usage: timeout DURATION COMMAND [ARG]...\n'
+
+
+def test_timeout_invalid_interval(capsys):
+    """Тест: неверный срок"""
+    assert timeout.timeout(['soon', 'ls'], set()) == 125
+    assert timeout.timeout(['-1', 'ls'], set()) == 125
+
+    captured = capsys.readouterr()
+    assert captured.out.splitlines() == [
+        "timeout: invalid time interval 'soon'",
+        "timeout: invalid time interval '-1'",
+    ]
+
+
+def test_timeout_unknown_command(capsys):
+    """Тест: неизвестная команда"""
+    assert timeout.timeout(['5', 'nope'], set()) == 125
+
+    captured = capsys.readouterr()
+    assert captured.out == 'timeout: nope: command not found\n'
+
+
+def test_timeout_interrupt_is_not_timeout(work_dir):
+    """Тест: Ctrl-C во время timeout отменяет команду, а не срок"""
+    (work_dir / 'dir').mkdir()
+    (work_dir / 'dir' / 'file.txt').write_text('content')
+
+    token = cancellation.CancelToken()
+    token.cancel()
+
+    with cancellation.scope(token):
+        with pytest.raises(cancellation.Cancelled) as error:
+            timeout.timeout(['5', 'cp', '-r', 'dir', 'copy'], set())
+
+    assert error.value.exit_code == 130
+
+
+def test_timeout_via_parser(work_dir, capsys):
+    """Тест: флаги команды не считаются флагами timeout"""
+    result = parser.parser('timeout 5 ls -a')
+
+    captured = capsys.readouterr()
+    assert result == 0
+    assert 'file.txt' in captured.out
+
+
+if __name__ == '__main__':
+    pytest.main()
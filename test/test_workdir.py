@@ -0,0 +1,54 @@
+import pytest
+import sys
+import threading
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import workdir
+
+
+def test_resolve_outside_scope():
+    """Тест: вне scope путь остается относительным"""
+    assert workdir.current() is None
+    assert workdir.resolve('a/b.txt') == Path('a/b.txt')
+
+
+def test_resolve_in_scope(tmp_path):
+    """Тест: в scope путь разрешается от директории scope"""
+    with workdir.scope(str(tmp_path)):
+        assert workdir.resolve('a/b.txt') == tmp_path / 'a' / 'b.txt'
+        assert workdir.resolve('/etc') == Path('/etc')
+        assert workdir.resolve('.') == tmp_path
+
+    assert workdir.current() is None
+
+
+def test_change_in_scope_keeps_process_directory(tmp_path):
+    """Тест: change в scope не меняет директорию процесса"""
+    before = Path.cwd()
+
+    with workdir.scope(str(tmp_path)):
+        workdir.change(str(tmp_path / 'sub'))
+        assert workdir.current() == str(tmp_path / 'sub')
+
+    assert Path.cwd() == before
+
+
+def test_bind_carries_directory_to_thread(tmp_path):
+    """Тест: bind передает директорию scope в другой поток"""
+    results = []
+
+    with workdir.scope(str(tmp_path)):
+        thread = threading.Thread(
+            target=workdir.bind(lambda: results.append(workdir.current()))
+        )
+    thread.start()
+    thread.join()
+
+    assert results == [str(tmp_path)]
+    assert workdir.current() is None
+
+
+if __name__ == '__main__':
+    pytest.main()